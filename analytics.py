@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Аналитика КОП и категорий
+=========================
+Расчёт блоков дашборда из разобранных отчётов вместо заданных вручную
+списков: КОП (доля в остатках / доля в продажах), ключевые категории,
+рост + дефицит, неликвиды, лучшие и худшие магазины, таблицы регионов
+компании и подразделений региона. Перекосы и план перемещений —
+transfer_plan.py.
+
+Всё считается операциями над колонками сразу по всем категориям ×
+подразделениям × магазинам (groupby, маски, nlargest) — без циклов по
+строкам, поэтому время почти не растёт с размером файла.
+
+Колонки ищутся по ключевым словам в названии: формат выгрузок меняется,
+номера колонок — ненадёжны.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Колонки по ключевым словам; порядок важен — уже занятая колонка
+# не достаётся следующему показателю ("Доля в остатках" ≠ "Остаток")
+COLUMN_KEYWORDS = {
+    'sales_share': ('доля в продаж', 'доля продаж'),
+    'stock_share': ('доля в остат', 'доля остат'),
+    'kop': ('коп',),
+    'weeks': ('оборач', 'недел'),
+    'growth': ('прирост', 'динамик'),
+    'stock': ('остат',),
+    'sales': ('продаж',),
+    'share': ('доля',),
+    'category': ('группа', 'категор'),
+    'division': ('подразд', 'дивизион', 'филиал'),
+    'store': ('магазин',),
+    'region': ('регион',),
+}
+
+# Числовые показатели
+METRICS = ('sales_share', 'stock_share', 'kop', 'weeks', 'growth', 'stock', 'sales', 'share')
+
+# Строки-итоги в выгрузках
+TOTAL_WORDS = ('итого', 'всего')
+
+
+def map_columns(df, keywords=COLUMN_KEYWORDS):
+    """{показатель: колонка} по названиям колонок"""
+    columns = {}
+    used = {'Лист'}
+    for key, words in keywords.items():
+        for col in df.columns:
+            if col not in used and any(word in str(col).lower() for word in words):
+                columns[key] = col
+                used.add(col)
+                break
+    return columns
+
+
+def _labels(series):
+    """Текстовые подписи: '10267' вместо 10267.0, пусто вместо NaN"""
+    labels = series.astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+    return labels.where(series.notna(), '')
+
+
+def metrics_frame(df, name='category'):
+    """
+    Нормализованная таблица показателей:
+    name, division, store + числовые METRICS (NaN, если колонки нет)
+    name — измерение, по которому строки подписаны ('category' или 'store')
+    """
+    columns = map_columns(df)
+    frame = pd.DataFrame(index=df.index)
+
+    frame['name'] = _labels(df[columns.get(name, df.columns[0])])
+    if 'Лист' in df.columns:
+        frame['division'] = _labels(df['Лист'])
+    else:
+        frame['division'] = _labels(df[columns['division']]) if 'division' in columns else ''
+    frame['store'] = _labels(df[columns['store']]) if 'store' in columns else ''
+
+    for key in METRICS:
+        if key not in columns:
+            frame[key] = np.nan
+            continue
+        # Узкие типы отчёта (int16 после dtype_normalizer) — обратно в 64 бита для расчётов
+        values = pd.to_numeric(df[columns[key]], errors='coerce')
+        frame[key] = values.astype(np.int64 if pd.api.types.is_integer_dtype(values) else np.float64)
+
+    # КОП = доля в остатках / доля в продажах (если нет готовой колонки)
+    computed = frame['stock_share'] / frame['sales_share'].where(frame['sales_share'] > 0)
+    frame['kop'] = frame['kop'].fillna(computed)
+
+    lower = frame['name'].str.lower()
+    totals = np.zeros(len(frame), dtype=bool)
+    for word in TOTAL_WORDS:
+        totals |= np.asarray(lower.str.contains(word, regex=False))
+    return frame[(frame['name'] != '') & ~totals]
+
+
+# Показатели категорий: усредняются по строкам / суммируются
+SUMMARY_MEANS = ['sales_share', 'stock_share', 'kop', 'growth', 'share']
+SUMMARY_SUMS = ['sales', 'stock']
+
+
+def category_totals(metrics):
+    """
+    Суммы и число заполненных значений по категориям (колонки <показатель>_n);
+    итоги частей таблицы складываются (stream_aggregates.py) — результат тот же
+    """
+    grouped = metrics.groupby('name', sort=False)
+    columns = SUMMARY_MEANS + SUMMARY_SUMS
+    return pd.concat([grouped[columns].sum(), grouped[columns].count().add_suffix('_n')], axis=1)
+
+
+def category_summary(metrics):
+    """
+    Показатели категорий по всем подразделениям:
+    доли — из сумм продаж/остатков, если они есть, иначе средние по листам
+    """
+    return summary_from_totals(category_totals(metrics))
+
+
+def summary_from_totals(totals):
+    """category_summary() из итогов category_totals()"""
+    summary = pd.DataFrame(index=totals.index)
+    for key in SUMMARY_MEANS:
+        summary[key] = totals[key] / totals[f'{key}_n'].where(totals[f'{key}_n'] > 0)
+
+    # sum(min_count=1): нет ни одного значения — NaN, а не 0
+    sales = totals['sales'].where(totals['sales_n'] > 0)
+    stock = totals['stock'].where(totals['stock_n'] > 0)
+    if sales.notna().any() and summary['sales_share'].isna().all():
+        summary['sales_share'] = sales / sales.sum() * 100
+    if stock.notna().any() and summary['stock_share'].isna().all():
+        summary['stock_share'] = stock / stock.sum() * 100
+    summary['share'] = summary['sales_share'].fillna(summary['share'])
+    summary['stock'] = stock
+
+    computed = summary['stock_share'] / summary['sales_share'].where(summary['sales_share'] > 0)
+    summary['kop'] = computed.fillna(summary['kop'])
+    return summary.reset_index()
+
+
+def _seasons(names, season):
+    """Сезонность по названиям; season(names) размечает весь список за один вызов"""
+    if season is None:
+        return [None] * len(names)
+    return list(season(names))
+
+
+def _category_records(rows, season=None, **extra):
+    """Строки summary → записи дашборда {name, share, growth, kop, season}"""
+    records = pd.DataFrame({
+        'name': rows['name'],
+        'share': rows['share'].round(1),
+        'growth': rows['growth'].round().astype('Int64'),
+        'kop': rows['kop'].round(1),
+    })
+    for key, values in extra.items():
+        records[key] = values
+    if season is not None:
+        records['season'] = _seasons(list(rows['name']), season)
+    records = records.astype(object).where(records.notna(), None)
+    return records.to_dict('records')
+
+
+def key_categories(summary, share_min, limit=5, season=None):
+    """Ключевые категории: доля в продажах > share_min, по убыванию доли"""
+    rows = summary[summary['share'] > share_min].nlargest(limit, 'share')
+    return _category_records(rows, season)
+
+
+def growth_deficit(summary, growth_min, kop_max=1.0, limit=5, season=None, high_kop=0.6):
+    """Рост > growth_min при КОП < kop_max (спрос есть, товара мало)"""
+    rows = summary[(summary['growth'] > growth_min) & (summary['kop'] < kop_max)].nlargest(limit, 'growth')
+    priority = np.where(rows['kop'] <= high_kop, 'Высокий', 'Средний')
+    return _category_records(rows, season, priority=priority)
+
+
+def illiquid_stock(metrics, weeks_min, limit=5, season=None, unit=''):
+    """Неликвиды: оборачиваемость > weeks_min недель"""
+    rows = metrics[metrics['weeks'] > weeks_min].nlargest(limit, 'weeks')
+    names = rows['name'].str[:35]
+    weeks = rows['weeks'].astype(int)
+    stock = rows['stock'].map(lambda value: f"{int(value):,}{unit}" if pd.notna(value) else "N/A")
+    action = np.where(weeks > 200, 'Распродажа -70%', 'Распродажа -50%')
+    seasons = _seasons(list(names), season)
+    return [{'name': n, 'weeks': int(w), 'stock': s, 'action': a, 'season': b}
+            for n, w, s, a, b in zip(names, weeks, stock, action, seasons)]
+
+
+def store_ranking(stores, kop_good, kop_bad, limit=3):
+    """
+    Лучшие и худшие магазины по приросту
+    stores — metrics_frame(..., name='store'); kop_good — (min, max)
+    """
+    rows = stores[stores['growth'].notna() & stores['kop'].notna()]
+    if rows.empty:
+        return [], []
+
+    top = rows.nlargest(limit, 'growth')
+    in_band = top['kop'].between(*kop_good)
+    note = np.select([in_band, top['growth'] < 0], ['Стабильный КОП', 'Минимальное падение'],
+                     'Рост продаж').astype(object)
+    note[0] = 'Лучший по росту'
+
+    worst = rows.nsmallest(limit, 'growth')
+    problem = np.select(
+        [worst['kop'] > kop_bad * 1.5, worst['kop'] > kop_bad, worst['kop'] > kop_good[1]],
+        ['Критичное затоваривание', 'Затоваривание + падение', 'Избыток остатков'],
+        'Падение продаж').astype(object)
+
+    def records(frame, key, labels):
+        return [{'id': name, 'division': division, 'growth': round(float(growth), 1),
+                 'kop': round(float(kop), 1), key: label}
+                for name, division, growth, kop, label
+                in zip(frame['name'], frame['division'], frame['growth'], frame['kop'], labels)]
+
+    return records(top, 'note', note), records(worst, 'problem', problem)
+
+
+def accessories_summary(stores):
+    """Общие показатели аксессуаров региона: доля, средний КОП, прирост"""
+    summary = {}
+    for key, column in (('share', 'share'), ('avg_kop', 'kop'), ('growth', 'growth')):
+        value = stores[column].mean()
+        if pd.notna(value):
+            summary[key] = round(float(value), 1)
+    return summary
+
+
+def region_table(df):
+    """
+    Регионы компании из отчёта по регионам:
+    ([{name, growth, share, rank}] по убыванию доли, прирост компании)
+    Прирост компании — из строки «Итого», без неё — средний по регионам с весом доли
+    """
+    frame = metrics_frame(df, name='region')
+    if frame['share'].isna().all() and frame['sales'].notna().any():
+        frame['share'] = frame['sales'] / frame['sales'].sum() * 100
+    frame = frame[frame['share'].notna()].sort_values('share', ascending=False, kind='stable')
+
+    records = [{'name': n, 'growth': None if pd.isna(g) else round(float(g), 1),
+                'share': round(float(s), 1), 'rank': rank}
+               for rank, (n, g, s) in enumerate(zip(frame['name'], frame['growth'], frame['share']), 1)]
+
+    growth = None
+    columns = map_columns(df)
+    if 'growth' in columns:
+        labels = _labels(df[columns.get('region', df.columns[0])]).str.lower()
+        totals = pd.to_numeric(df[columns['growth']], errors='coerce')[
+            labels.str.contains('|'.join(TOTAL_WORDS), regex=True)].dropna()
+        if len(totals):
+            growth = round(float(totals.iloc[0]), 1)
+    rated = frame[frame['growth'].notna()]
+    if growth is None and len(rated) and rated['share'].sum() > 0:
+        growth = round(float(np.average(rated['growth'], weights=rated['share'])), 1)
+    return records, growth
+
+
+def division_table(stores, counts=None):
+    """
+    Подразделения региона: [{name, stores, share, growth, kop}] по убыванию доли
+    stores — metrics_frame(..., name='store') строк региона или None; доля — от продаж
+    региона, прирост и КОП — средние по магазинам; counts — {подразделение: магазинов}
+    из структуры (иначе — магазины в stores)
+    """
+    if stores is None:
+        stores = pd.DataFrame({key: pd.Series(dtype=object if key in ('name', 'division') else np.float64)
+                               for key in ('name', 'division', 'sales', 'growth', 'kop')})
+    grouped = stores[stores['division'] != ''].groupby('division', sort=False)
+    table = pd.DataFrame({
+        'stores': grouped['name'].nunique(),
+        'sales': grouped['sales'].sum(min_count=1),
+        'growth': grouped['growth'].mean(),
+        'kop': grouped['kop'].mean(),
+    })
+    if counts:
+        counts = pd.Series(counts, dtype=np.int64)
+        table = table.reindex(table.index.union(counts.index, sort=False))
+        table['stores'] = counts.reindex(table.index).fillna(table['stores'])
+
+    total = table['sales'].sum()
+    table['share'] = table['sales'] / total * 100 if total > 0 else np.nan
+    table = table.sort_values(['share', 'stores'], ascending=False, kind='stable', na_position='last')
+
+    def value(number):
+        return None if pd.isna(number) else round(float(number), 1)
+
+    return [{'name': name, 'stores': int(row.stores), 'share': value(row.share),
+             'growth': value(row.growth), 'kop': value(row.kop)}
+            for name, row in zip(table.index, table.itertuples())]
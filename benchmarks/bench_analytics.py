@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк аналитики КОП и категорий
+==================================
+Полный расчёт блоков дашборда (analytics.py) на синтетической
+оборачиваемости "категории × подразделения" и отчёте по магазинам —
+от одного региона до всей компании (11 регионов).
+
+Запуск:
+    python benchmarks/bench_analytics.py [--categories 300] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import analytics
+
+REGIONS = ['МСК', 'СПБ', 'ННВ', 'ЮГ', 'УРЛ', 'СИБ', 'ДВ', 'ЦЧР', 'ПВЛ', 'СЗ', 'КАВ']
+
+
+def make_turnover_frame(regions, divisions, categories, seed=1):
+    """Оборачиваемость: лист на подразделение, строка на группу товара"""
+    rng = np.random.default_rng(seed)
+    sheets = [f"{region} {k}" for region in REGIONS[:regions] for k in range(1, divisions + 1)]
+    rows = len(sheets) * categories
+    return pd.DataFrame({
+        'Группа товара': np.tile([f"Группа {i}" for i in range(categories)], len(sheets)),
+        'Доля в продажах %': rng.uniform(0.1, 15, rows).round(1),
+        'Доля в остатках %': rng.uniform(0.1, 15, rows).round(1),
+        'Оборачиваемость, недель': rng.integers(1, 400, rows),
+        'Остаток': rng.integers(0, 2000, rows),
+        'Прирост %': rng.uniform(-60, 120, rows).round(1),
+        'Лист': np.repeat(sheets, categories),
+    })
+
+
+def make_stores_frame(stores, seed=1):
+    """Отчёт по магазинам: прирост и КОП"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Подразделение': [f"Подразделение {i % 40}" for i in range(stores)],
+        'Магазин': np.arange(10000, 10000 + stores),
+        'Прирост %': rng.uniform(-50, 50, stores).round(1),
+        'КОП': rng.uniform(0.3, 4, stores).round(2),
+    })
+
+
+def run_engine(turnover, stores):
+    """Все блоки дашборда, как в analyze_data()"""
+    metrics = analytics.metrics_frame(turnover)
+    summary = analytics.category_summary(metrics)
+    analytics.key_categories(summary, 3.0)
+    analytics.growth_deficit(summary, 50.0)
+    analytics.illiquid_stock(metrics, 50)
+    analytics.store_ranking(analytics.metrics_frame(stores, name='store'), (0.8, 1.2), 2.0)
+
+
+def timed(func, repeat):
+    """Лучшее время из repeat запусков"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--categories', type=int, default=300)
+    parser.add_argument('--divisions', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'регионов':<10}{'строк':>10}{'магазинов':>12}{'время, с':>12}")
+    for regions in (1, 3, 11):
+        turnover = make_turnover_frame(regions, args.divisions, args.categories)
+        stores = make_stores_frame(119 * regions)
+        elapsed = timed(lambda: run_engine(turnover, stores), args.repeat)
+        print(f"{regions:<10}{len(turnover):>10}{len(stores):>12}{elapsed:>12.4f}")
+
+
+if __name__ == '__main__':
+    main()
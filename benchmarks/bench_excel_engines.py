@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк движков разбора Excel (excel_loader: openpyxl / calamine)
+==================================================================
+Четыре входные книги в раскладке реальных отчётов (bench_pipeline.py),
+сохранённые как их сохраняет Excel — с размерами листов и общими
+строками, — читаются так же, как в extract_*_data(): тот же лист, та же
+строка заголовка. Для каждого файла — лучшее время каждого движка и
+проверка, что таблицы совпадают.
+
+calamine — пакет python-calamine (pip install python-calamine); без
+него выводится только openpyxl.
+
+Запуск:
+    python benchmarks/bench_excel_engines.py [--stores 119,1000,10000] [--categories 12] [--repeat 3]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+import excel_loader
+from excel_loader import load_sheet, load_sheets, configure_engines, engine_available, ENGINES
+from bench_pipeline import make_workbooks
+
+# Файл → чтение как в extract_*_data()
+READERS = {
+    'По регионам.xlsx': lambda path: load_sheet(path, sheet_name=0, header_keywords=('регион', 'группа'),
+                                                default_header=3),
+    'Отчет по оборачиваемости ТЗ регион ННВ.xlsx': lambda path: pd.concat(
+        [df.assign(**{'Лист': sheet}) for sheet, df in load_sheets(path, header=2).items()],
+        ignore_index=True),
+    'Рассылка аксессуары магазины.xlsx': lambda path: load_sheet(path, sheet_name=0, header=4),
+    'Структура розница 2026.xlsx': lambda path: load_sheet(path, sheet_name=0, header=1),
+}
+
+
+def timed(read, path, engine, repeat):
+    """Лучшее время из repeat чтений и последняя таблица"""
+    configure_engines(engine)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        df = read(path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--stores', default='119,1000,10000', help="размеры сети через запятую")
+    parser.add_argument('--categories', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    engines = [engine for engine in ENGINES if engine_available(engine)]
+    if len(engines) < len(ENGINES):
+        print("calamine не установлен (pip install python-calamine) — только openpyxl\n")
+
+    # Без кэша разбора: меряется сам разбор
+    excel_loader.configure_cache(None)
+    workroot = Path(tempfile.mkdtemp(prefix='kari_engines_'))
+    try:
+        for stores in [int(size) for size in args.stores.split(',') if size.strip()]:
+            input_dir = workroot / str(stores)
+            make_workbooks(input_dir, stores, args.categories, write_only=False)
+            print(f"Сеть {stores} магазинов")
+            print(f"  {'Файл':<46}{'KB':>8}" + ''.join(f"{engine + ', с':>14}" for engine in engines)
+                  + f"{'ускорение':>11}{'совпадает':>11}")
+            for name, read in READERS.items():
+                path = next(input_dir.rglob(name))
+                results = [timed(read, path, engine, args.repeat) for engine in engines]
+                cells = ''.join(f"{seconds:>14.3f}" for seconds, _ in results)
+                speedup = same = ''
+                if len(results) > 1:
+                    speedup = f"{results[0][0] / results[1][0]:.1f}x"
+                    same = 'да' if results[0][1].equals(results[1][1]) else 'НЕТ'
+                print(f"  {name:<46}{path.stat().st_size / 1024:>8.0f}{cells}{speedup:>11}{same:>11}")
+            print()
+    finally:
+        configure_engines()
+        shutil.rmtree(workroot, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк записи dashboard_data.json
+===================================
+analysis с магазинными строками и историей по неделям (numpy значения,
+как после analytics.*): прежняя запись json.dump(indent=2, default=str)
+против json_export.write_json() — orjson / json, компактно / с
+отступами, с копией .gz. Для каждого варианта — время записи, время
+разбора файла обратно и размер.
+
+Запуск:
+    python benchmarks/bench_json_export.py [--stores 10000] [--weeks 52] [--repeat 3]
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import json_export
+from json_export import write_json, read_json, encoder_available
+
+
+def make_analysis(stores, weeks, seed=1):
+    """analysis дашборда + строки магазинов и недельная история с numpy типами"""
+    rng = np.random.default_rng(seed)
+    store_rows = [{
+        'id': np.int64(10000 + i),
+        'division': f"ННВ {i % 7 + 1}",
+        'growth': np.round(rng.normal(-20, 15), 1),
+        'kop': np.round(rng.uniform(0.3, 3.5), 2),
+        'share': np.float64(rng.uniform(0, 2)),
+        'stock': np.int64(rng.integers(0, 5000)),
+        'season': np.str_('СЕЗОН' if i % 3 else 'НЕСЕЗОН'),
+    } for i in range(stores)]
+    history = {
+        'weeks': np.arange(weeks),
+        'growth': np.round(rng.normal(-20, 5, weeks), 1),
+        'kop': np.round(rng.uniform(0.8, 2.0, weeks), 2),
+    }
+    return {'region': 'ННВ', 'period': '12-18 января 2026', 'stores': store_rows, 'history': history}
+
+
+def legacy_write(analysis, path):
+    """Прежняя запись из generate_dashboard.main()"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(analysis, f, ensure_ascii=False, indent=2, default=str)
+    return [path]
+
+
+def timed(func, repeat):
+    """Лучшее время из repeat запусков и результат"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--stores', type=int, default=10000)
+    parser.add_argument('--weeks', type=int, default=52)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    analysis = make_analysis(args.stores, args.weeks)
+    variants = {'json.dump indent=2, default=str': lambda path: legacy_write(analysis, path)}
+    for encoder in json_export.ENCODERS:
+        if not encoder_available(encoder):
+            print(f"{encoder} не установлен — пропущен")
+            continue
+        variants[f"{encoder} компактный"] = lambda path, e=encoder: write_json(analysis, path, encoder=e)
+        variants[f"{encoder} отступы"] = lambda path, e=encoder: write_json(analysis, path, pretty=True, encoder=e)
+        variants[f"{encoder} компактный + .gz"] = lambda path, e=encoder: write_json(
+            analysis, path, gzip_copy=True, encoder=e)
+
+    workdir = Path(tempfile.mkdtemp(prefix='kari_json_'))
+    try:
+        print(f"Магазинов: {args.stores}, недель истории: {args.weeks}")
+        print(f"  {'Вариант':<34}{'запись, с':>11}{'чтение, с':>11}{'KB':>9}{'.gz KB':>9}")
+        for name, write in variants.items():
+            path = workdir / 'dashboard_data.json'
+            seconds, written = timed(lambda: write(path), args.repeat)
+            read_seconds, _ = timed(lambda: read_json(path), args.repeat)
+            gz = f"{written[-1].stat().st_size / 1024:.0f}" if len(written) > 1 else ''
+            print(f"  {name:<34}{seconds:>11.4f}{read_seconds:>11.4f}{path.stat().st_size / 1024:>9.0f}{gz:>9}")
+            for item in written:
+                item.unlink()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
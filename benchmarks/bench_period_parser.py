@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Микробенчмарк поиска периода в Excel (period_parser.parse_period_from_excel)
+===========================================================================
+Сравнивает прежний поиск через sheet.cell(row, col) в read_only режиме
+(каждое обращение заново читает XML листа) с потоковым iter_rows.
+
+Запуск:
+    python benchmarks/bench_period_parser.py [--rows 20000] [--repeat 3]
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import openpyxl
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'telegram_bot'))
+from period_parser import parse_period_from_excel
+
+
+def legacy_parse_period_from_excel(filepath):
+    """Прежняя реализация: случайный доступ к ячейкам 20×10"""
+    wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
+    sheet = wb.active
+    for row in range(1, min(21, sheet.max_row + 1)):
+        for col in range(1, min(11, sheet.max_column + 1)):
+            cell_value = sheet.cell(row, col).value
+            if cell_value and isinstance(cell_value, str):
+                patterns = [
+                    r'(\d{1,2})-(\d{1,2})\.(\d{1,2})\.(\d{4})',
+                    r'(\d{1,2})-(\d{1,2})\s+(января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря)\s+(\d{4})',
+                    r'(\d{1,2})\.(\d{1,2})\.(\d{4})\s*-\s*(\d{1,2})\.(\d{1,2})\.(\d{4})',
+                ]
+                for pattern in patterns:
+                    match = re.search(pattern, cell_value, re.IGNORECASE)
+                    if match:
+                        return match.group(0)
+    wb.close()
+    return None
+
+
+def make_workbook(path, rows, period_row):
+    """Большая книга: период в строке period_row, колонке 8 (0 — без периода)"""
+    # Обычный (не write_only) режим: записывает размеры листа, как Excel
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    for r in range(1, rows + 1):
+        values = [f'Магазин {r}', r, r * 1.5, 'ННВ 1', None, r % 7, 'текст', None, r, r * 2]
+        if r == period_row:
+            values[7] = 'Период: 12.01.2026 - 18.01.2026'
+        ws.append(values + [r] * 20)
+    wb.save(path)
+
+
+def timed(func, path, repeat):
+    """Лучшее время из repeat запусков"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Книга: {args.rows} строк × 30 колонок")
+        print(f"{'сценарий':<24}{'прежний, с':>12}{'потоковый, с':>14}{'ускорение':>12}")
+        for title, period_row in (('период в строке 15', 15), ('периода нет', 0)):
+            path = Path(tmp) / f'bench_{period_row}.xlsx'
+            make_workbook(path, args.rows, period_row)
+            old = timed(legacy_parse_period_from_excel, path, args.repeat)
+            new = timed(parse_period_from_excel, path, args.repeat)
+            print(f"{title:<24}{old:>12.3f}{new:>14.3f}{old / new:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
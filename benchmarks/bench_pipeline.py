@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк полного цикла generate_dashboard.py
+============================================
+Синтетические книги в точности с раскладкой, которую ждут экстракторы:
+
+- По регионам.xlsx — заголовок ищется по ключевым словам (строка 3)
+- оборачиваемость — лист на подразделение, header=2, строка на группу товара × магазин
+- аксессуары — header=4, строка на магазин
+- структура — header=1, строка на магазин
+
+Сеть масштабируется от 119 магазинов (ННВ сегодня) до 10 000. Для каждого
+размера generate_dashboard.run() выполняется на временном input/ без
+кэша разбора и истории, время этапов берётся из PipelineMetrics (те же
+этапы, что в logs/metrics_YYYYMMDD.jsonl). Извлечение — как в обычном
+запуске: от 2 MB входа четыре отчёта разбираются в пуле процессов
+(--extract-workers 1 — по очереди, для сравнения); --stream — потоковый
+разбор оборачиваемости и аксессуаров; --excel-engine — движок разбора
+(сравнение движков отдельно — bench_excel_engines.py).
+
+Результаты сохраняются в JSON (--save) и сравниваются с прошлым
+прогоном (--compare): регрессия видна по каждому этапу и размеру.
+
+Запуск:
+    python benchmarks/bench_pipeline.py [--stores 119,1000,10000] [--categories 12] [--repeat 1]
+    python benchmarks/bench_pipeline.py --save benchmarks/results/pipeline.json
+    python benchmarks/bench_pipeline.py --compare benchmarks/results/pipeline.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import generate_dashboard as gd
+from pipeline_metrics import PipelineMetrics
+
+REGIONS = ['МСК', 'СПБ', 'ННВ', 'ЮГ', 'УРЛ', 'СИБ', 'ДВ', 'ЦЧР', 'ПВЛ', 'СЗ', 'КАВ']
+CATEGORIES = ['Ботинки женские зимние', 'Кроссовки мужские', 'Сандалии детские', 'Полусапоги женские',
+              'Слипоны женские', 'Балетки детские', 'Угги женские', 'Кеды мужские', 'Туфли женские',
+              'Сапоги зимние мужские', 'Шлепанцы летние', 'Мокасины мужские', 'Валенки детские',
+              'Лоферы женские', 'Дутики детские', 'Босоножки женские']
+STORES_PER_DIVISION = 17
+PERIOD = '12-18 января 2026'
+
+# Этапы в таблице (в порядке выполнения)
+STAGES = ['find_excel_file', 'extract_plan', 'extract_parallel', 'extract_regions', 'extract_turnover', 'extract_accessories',
+          'extract_structure', 'analyze_data', 'generate_html', 'finalize_html', 'json_dump']
+
+EXTRACT_STAGES = set(gd.EXTRACTORS)
+
+
+def network(stores, seed=1):
+    """Магазины: номер, подразделение (по STORES_PER_DIVISION), случайный регион"""
+    rng = np.random.default_rng(seed)
+    divisions = max(1, -(-stores // STORES_PER_DIVISION))
+    return pd.DataFrame({
+        'store': np.arange(10000, 10000 + stores),
+        'division': [f"ННВ {i % divisions + 1}" for i in range(stores)],
+        'region': rng.choice(REGIONS, stores),
+    })
+
+
+def new_workbook(write_only=True):
+    """
+    Пустая книга: write_only — быстро, но без размеров листа и общих строк;
+    write_only=False — как сохраняет Excel (для сравнения движков разбора)
+    """
+    wb = openpyxl.Workbook(write_only=write_only)
+    if not write_only:
+        wb.remove(wb.active)
+    return wb
+
+
+def save(wb, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(path)
+
+
+def write_regions(path, seed=1, write_only=True):
+    rng = np.random.default_rng(seed)
+    wb = new_workbook(write_only)
+    ws = wb.create_sheet('Лист1')
+    ws.append(['Продажи обуви'])
+    ws.append(['12.01.2026 - 18.01.2026'])
+    ws.append([])
+    ws.append(['Регион', 'Продажи ТП', 'Продажи ПП', 'Прирост %', 'Доля %'])
+    for region in REGIONS:
+        ws.append([region, int(rng.integers(1000, 9000)), int(rng.integers(1000, 9000)),
+                   round(float(rng.uniform(-30, 5)), 1), round(float(rng.uniform(3, 20)), 1)])
+    ws.append(['Итого', 50000, 60000, -20.3, 100.0])
+    save(wb, path)
+
+
+def write_turnover(path, stores, categories, seed=1, write_only=True):
+    rng = np.random.default_rng(seed)
+    wb = new_workbook(write_only)
+    for division, group in stores.groupby('division', sort=False):
+        ws = wb.create_sheet(division)
+        ws.append(['Оборачиваемость ТЗ'])
+        ws.append(['12.01.2026 - 18.01.2026'])
+        ws.append(['Группа товара', 'Магазин', 'Доля в продажах %', 'Доля в остатках %', 'КОП',
+                   'Оборачиваемость, недель', 'Остаток', 'Прирост %'])
+        rows = len(group) * categories
+        sales = rng.uniform(1, 15, rows).round(1)
+        stock = rng.uniform(1, 15, rows).round(1)
+        for i, (category, store) in enumerate((c, s) for s in group['store'] for c in CATEGORIES[:categories]):
+            ws.append([category, int(store), float(sales[i]), float(stock[i]),
+                       round(float(stock[i] / sales[i]), 2), int(rng.integers(5, 400)),
+                       int(rng.integers(10, 500)), round(float(rng.uniform(-40, 90)), 1)])
+    save(wb, path)
+
+
+def write_accessories(path, stores, seed=1, write_only=True):
+    rng = np.random.default_rng(seed)
+    wb = new_workbook(write_only)
+    ws = wb.create_sheet('Лист1')
+    for _ in range(4):
+        ws.append(['Рассылка аксессуары'])
+    ws.append(['Регион', 'Подразделение', 'Магазин', 'Продажи ТП', 'Продажи ПП', 'Прирост %', 'КОП'])
+    for store in stores.itertuples():
+        ws.append([store.region, store.division, int(store.store), int(rng.integers(10, 900)),
+                   int(rng.integers(10, 900)), round(float(rng.uniform(-40, 40)), 1),
+                   round(float(rng.uniform(0.4, 3.5)), 2)])
+    save(wb, path)
+
+
+def write_structure(path, stores, write_only=True):
+    wb = new_workbook(write_only)
+    ws = wb.create_sheet('Лист1')
+    ws.append(['Структура розница'])
+    ws.append(['Регион', 'Подразделение', 'Магазин', 'Город'])
+    for store in stores.itertuples():
+        ws.append([store.region, store.division, int(store.store), 'Город'])
+    save(wb, path)
+
+
+def make_workbooks(input_dir, stores, categories, seed=1, write_only=True):
+    """Четыре входные книги сети из stores магазинов в input_dir"""
+    shops = network(stores, seed)
+    write_regions(input_dir / 'Отчет по приросту регионы' / 'По регионам.xlsx', seed, write_only)
+    write_turnover(input_dir / 'Обувь остатки и оборачиваемость по группам товара'
+                   / 'Отчет по оборачиваемости ТЗ регион ННВ.xlsx', shops, categories, seed, write_only)
+    write_accessories(input_dir / 'Отчет по приросту аксессуаров по магазинам'
+                      / 'Рассылка аксессуары магазины.xlsx', shops, seed, write_only)
+    write_structure(input_dir / 'Структура розница 2026.xlsx', shops, write_only)
+
+
+def run_pipeline(workdir, options=()):
+    """generate_dashboard.run() на workdir/input → записи PipelineMetrics (options — доп. аргументы)"""
+    gd.INPUT_DIR = workdir / 'input'
+    gd.OUTPUT_DIR = workdir / 'output'
+    gd._input_indexes.clear()
+    # Период — константа: его поиск по input/ репозитория меряет bench_period_parser.py
+    gd.parse_period_from_excel = lambda cache=None: PERIOD
+    gd.METRICS = PipelineMetrics('bench', directory=workdir)
+
+    args = gd.parse_args(['--no-cache', '--no-history', '--max-kb', '0', *options])
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        gd.run(args)
+    total = time.perf_counter() - started
+    return gd.METRICS.records, total
+
+
+def summarize(records, total):
+    """{этап: секунды} (повторяющиеся этапы суммируются) + строки и байты входа"""
+    seconds = {}
+    for record in records:
+        seconds[record['stage']] = seconds.get(record['stage'], 0.0) + record['seconds']
+    seconds['total'] = total
+    # Экстракторы — на верхнем уровне или внутри extract_parallel (пул)
+    extracts = [record for record in records if record['stage'] in EXTRACT_STAGES]
+    rows = sum(record.get('rows') or 0 for record in extracts)
+    size = sum(record.get('bytes') or 0 for record in extracts)
+    rss = max((record.get('rss_mb') or 0 for record in records), default=0)
+    return {'seconds': seconds, 'rows': rows, 'bytes': size, 'rss_mb': rss}
+
+
+def best_of(results):
+    """Лучшее время каждого этапа из нескольких повторов"""
+    best = dict(results[0])
+    best['seconds'] = {stage: min(r['seconds'].get(stage, 0.0) for r in results)
+                       for stage in results[0]['seconds']}
+    return best
+
+
+def print_table(results, baseline=None):
+    """Этапы × размеры сети; с baseline — отношение к прошлому прогону"""
+    sizes = list(results)
+    print(f"  {'Этап':<22}" + ''.join(f"{size + ' маг.':>20}" for size in sizes))
+    for stage in STAGES + ['total']:
+        cells = []
+        for size in sizes:
+            value = results[size]['seconds'].get(stage)
+            old = (baseline or {}).get(size, {}).get('seconds', {}).get(stage)
+            cell = '' if value is None else f"{value:.3f}"
+            if value is not None and old:
+                cell += f" ({value / old:.2f}x)"
+            cells.append(f"{cell:>20}")
+        print(f"  {stage:<22}" + ''.join(cells))
+    print(f"  {'строк входа':<22}" + ''.join(f"{results[s]['rows']:>20}" for s in sizes))
+    print(f"  {'входные файлы, KB':<22}" + ''.join(f"{results[s]['bytes'] / 1024:>20.0f}" for s in sizes))
+    print(f"  {'пиковый RSS, MB':<22}" + ''.join(f"{results[s]['rss_mb']:>20.0f}" for s in sizes))
+
+
+def environment():
+    """Версии, с которыми сделан прогон (для сравнения результатов)"""
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'openpyxl': openpyxl.__version__,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--stores', default='119,1000,10000',
+                        help="размеры сети через запятую")
+    parser.add_argument('--categories', type=int, default=12,
+                        help=f"групп товара на магазин в оборачиваемости (до {len(CATEGORIES)})")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--save', help="сохранить результаты в JSON")
+    parser.add_argument('--compare', help="JSON прошлого прогона для сравнения")
+    parser.add_argument('--extract-workers', type=int, default=gd.EXTRACT_WORKERS,
+                        help="как в generate_dashboard.py (1 = по очереди, 0 = авто)")
+    parser.add_argument('--stream', action='store_true',
+                        help="потоковый разбор (generate_dashboard.py --stream)")
+    parser.add_argument('--excel-engine', choices=('auto', 'openpyxl', 'calamine'), default='auto',
+                        help="движок разбора (generate_dashboard.py --excel-engine)")
+    parser.add_argument('--keep', action='store_true', help="не удалять сгенерированные книги")
+    args = parser.parse_args(argv)
+
+    options = ['--extract-workers', str(args.extract_workers), '--excel-engine', args.excel_engine]
+    if args.stream:
+        options.append('--stream')
+    sizes = [int(size) for size in args.stores.split(',') if size.strip()]
+    categories = max(1, min(args.categories, len(CATEGORIES)))
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding='utf-8'))['results']
+
+    results = {}
+    workroot = Path(tempfile.mkdtemp(prefix='kari_bench_'))
+    try:
+        for stores in sizes:
+            workdir = workroot / str(stores)
+            started = time.perf_counter()
+            make_workbooks(workdir / 'input', stores, categories)
+            print(f"Сеть {stores} магазинов: книги за {time.perf_counter() - started:.1f} с", flush=True)
+            runs = [summarize(*run_pipeline(workdir, options)) for _ in range(args.repeat)]
+            results[str(stores)] = best_of(runs)
+    finally:
+        if args.keep:
+            print(f"Книги: {workroot}")
+        else:
+            shutil.rmtree(workroot, ignore_errors=True)
+
+    print()
+    print_table(results, baseline)
+
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {'environment': environment(), 'categories': categories, 'results': results}
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"\nРезультаты: {path}")
+
+
+if __name__ == '__main__':
+    main()
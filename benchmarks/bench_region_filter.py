@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк отбора магазинов региона в отчёте по аксессуарам
+=========================================================
+Прежний способ — df.apply(lambda ...) по всем ячейкам каждой строки,
+новый — region_filter.filter_region() по колонкам региона/подразделения.
+
+Запуск:
+    python benchmarks/bench_region_filter.py [--stores 5000] [--repeat 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from region_filter import filter_region
+
+REGIONS = ['МСК', 'СПБ', 'ННВ', 'ЮГ', 'УРЛ', 'СИБ', 'ДВ', 'ЦЧР', 'ПВЛ', 'СЗ', 'КАВ']
+
+
+def make_accessories_frame(stores, seed=1):
+    """Отчёт по аксессуарам: магазины 11 регионов, по 7 подразделений в каждом"""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(stores):
+        region = REGIONS[i % len(REGIONS)]
+        rows.append({
+            'Регион': region,
+            'Подразделение': f"{region} {rng.randint(1, 7)}",
+            'Магазин': 10000 + i,
+            'Город': f"Город {rng.randint(1, 300)}",
+            **{f"Показатель {k}": rng.random() * 1000 for k in range(16)},
+        })
+    return pd.DataFrame(rows)
+
+
+def legacy_filter(df, region):
+    """Прежняя реализация из extract_accessories_data()"""
+    return df[df.apply(lambda r: any(region in str(v).lower() for v in r.values if pd.notna(v)), axis=1)]
+
+
+def timed(func, repeat):
+    """Лучшее время из repeat запусков и результат"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--stores', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = make_accessories_frame(args.stores)
+    print(f"Магазинов: {len(df)}, колонок: {len(df.columns)}")
+    print(f"{'регион':<8}{'lambda, с':>12}{'вектор, с':>12}{'ускорение':>12}{'строк':>8}")
+    for region in ('ннв', 'мск', 'кав'):
+        old, old_rows = timed(lambda: legacy_filter(df, region), args.repeat)
+        new, new_rows = timed(lambda: filter_region(df, region), args.repeat)
+        assert old_rows.index.equals(new_rows.index), f"Результаты различаются для {region}"
+        print(f"{region:<8}{old:>12.4f}{new:>12.4f}{old / new:>11.1f}x{len(new_rows):>8}")
+
+
+if __name__ == '__main__':
+    main()
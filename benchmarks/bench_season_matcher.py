@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк разметки сезонности
+============================
+Прежний get_season_badge() — цикл `in` по спискам для каждой строки,
+новый — SeasonMatcher.label(): скомпилированные альтернации и один
+векторный вызов по уникальным названиям.
+
+Запуск:
+    python benchmarks/bench_season_matcher.py [--rows 50000] [--unique 3000] [--repeat 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from season_matcher import SeasonMatcher
+
+SEASON_WINTER = ['зимн', 'утепл', 'дутик', 'мех', 'валенки', 'угги']
+SEASON_SUMMER = ['летн', 'сандал', 'шлёпанц', 'шлепанц', 'босонож', 'мокасин', 'сланц']
+
+WORDS = ['Ботинки', 'Сапоги', 'Кроссовки', 'Сандалии', 'Туфли', 'Угги', 'Валенки', 'Мокасины',
+         'Слипоны', 'Босоножки', 'Лоферы', 'Кеды', 'Балетки', 'Шлёпанцы', 'Полусапоги']
+ATTRIBUTES = ['женские', 'мужские', 'детские', 'зимние', 'летние', 'утепленные',
+              'демисезонные', 'на меху', 'кожаные', 'текстильные']
+
+
+def make_names(rows, unique, seed=1):
+    """Названия групп товара: unique вариантов, повторяются в rows строках"""
+    rng = random.Random(seed)
+    variants = [f"{rng.choice(WORDS)} {rng.choice(ATTRIBUTES)} {rng.choice(ATTRIBUTES)} {k}"
+                for k in range(unique)]
+    return [rng.choice(variants) for _ in range(rows)]
+
+
+def legacy_badge(category_name):
+    """Прежняя реализация get_season_badge() (январь = зима)"""
+    name_lower = category_name.lower()
+    for keyword in SEASON_WINTER:
+        if keyword in name_lower:
+            return 'СЕЗОН'
+    for keyword in SEASON_SUMMER:
+        if keyword in name_lower:
+            return 'НЕСЕЗОН'
+    return None
+
+
+def timed(func, repeat):
+    """Лучшее время из repeat запусков и результат"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--unique', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    names = make_names(args.rows, args.unique)
+    old, old_badges = timed(lambda: [legacy_badge(name) for name in names], args.repeat)
+    new, new_badges = timed(lambda: SeasonMatcher(SEASON_WINTER, SEASON_SUMMER).label(names, month=1),
+                            args.repeat)
+    assert old_badges == list(new_badges), "Разметка различается"
+
+    print(f"Строк: {len(names)}, уникальных названий: {args.unique}")
+    print(f"{'цикл, с':>10}{'вектор, с':>12}{'ускорение':>12}")
+    print(f"{old:>10.4f}{new:>12.4f}{old / new:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
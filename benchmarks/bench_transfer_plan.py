@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Бенчмарк плана перемещений
+==========================
+transfer_plan.py на синтетических сетях: магазины × категории со
+случайными остатками и КОП. Проверяет план (источник не уходит в
+дефицит, получатель — в затоваривание) и печатает время, число
+перемещений и долю узлов с КОП в норме до/после.
+
+Запуск:
+    python benchmarks/bench_transfer_plan.py [--categories 40] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import transfer_plan
+
+KOP_GOOD_MIN = 0.8
+KOP_GOOD_MAX = 1.2
+
+
+def make_network(stores, categories, seed=1):
+    """Таблица как analytics.metrics_frame(): магазин × категория, КОП ~ логнормальный"""
+    rng = np.random.default_rng(seed)
+    rows = stores * categories
+    return pd.DataFrame({
+        'name': np.repeat([f"Категория {c}" for c in range(categories)], stores),
+        'store': np.tile([str(10000 + s) for s in range(stores)], categories),
+        'division': np.tile([f"Подразделение {s % 40}" for s in range(stores)], categories),
+        'stock': rng.integers(0, 300, rows).astype(float),
+        'kop': rng.lognormal(0, 0.6, rows).round(2),
+    })
+
+
+def in_band(frame):
+    """Доля узлов с КОП в норме"""
+    return frame['kop'].between(KOP_GOOD_MIN, KOP_GOOD_MAX).mean()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--categories', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'магазинов':<11}{'узлов':>9}{'время, с':>10}{'перемещ.':>10}{'пар':>10}{'норма до':>10}{'после':>8}")
+    for stores in (119, 1000, 5000):
+        metrics = make_network(stores, args.categories)
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            balance = transfer_plan.node_balance(metrics, KOP_GOOD_MIN, KOP_GOOD_MAX)
+            plan = transfer_plan.plan_transfers(balance)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+
+        after = transfer_plan.apply_plan(balance, plan)
+        sources = balance['qty'] > 0
+        targets = balance['qty'] < 0
+        assert (after.loc[sources, 'kop'] >= KOP_GOOD_MIN).all(), "Источник ушёл в дефицит"
+        assert (after.loc[targets, 'kop'] <= KOP_GOOD_MAX).all(), "Получатель ушёл в затоваривание"
+        assert (plan['source'] != plan['target']).all()
+
+        print(f"{stores:<11}{len(balance):>9}{best:>10.4f}{len(plan):>10}{int(plan['qty'].sum()):>10}"
+              f"{in_band(balance):>10.1%}{in_band(after):>8.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,544 @@
+# -*- coding: utf-8 -*-
+"""
+Шаблон страницы дашборда
+========================
+Статическая оболочка: стили, заголовки и каркас секций. Поля в фигурных
+скобках ({actions_html}, {period}, ...) заполняет html_renderer.py;
+фигурные скобки CSS удвоены, как в str.format.
+"""
+
+PAGE_TEMPLATE = '''<!DOCTYPE html>
+<html lang="ru">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=5.0">
+    <title>KARI Dashboard {region} | {period}</title>
+    <style>
+        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
+
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
+            background: #f5f5f5;
+            color: #1a1a1a;
+            padding: 12px;
+            line-height: 1.5;
+        }}
+
+        .container {{ max-width: 1200px; margin: 0 auto; }}
+
+        .header {{
+            background: linear-gradient(135deg, #1e3a8a 0%, #3b82f6 100%);
+            color: white;
+            padding: 20px;
+            border-radius: 12px;
+            margin-bottom: 16px;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+        }}
+
+        .header h1 {{ font-size: 24px; margin-bottom: 8px; }}
+        .header .subtitle {{ opacity: 0.9; font-size: 14px; }}
+
+        .section {{
+            background: white;
+            border-radius: 12px;
+            padding: 16px;
+            margin-bottom: 16px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.08);
+        }}
+
+        .section-title {{
+            font-size: 18px;
+            font-weight: 700;
+            margin-bottom: 12px;
+            color: #1e3a8a;
+            display: flex;
+            align-items: center;
+            gap: 8px;
+        }}
+
+        .section-subtitle {{
+            font-size: 13px;
+            color: #6b7280;
+            margin-bottom: 12px;
+        }}
+
+        .action-card {{
+            background: #fef3c7;
+            border-left: 4px solid #f59e0b;
+            padding: 12px;
+            margin-bottom: 12px;
+            border-radius: 6px;
+        }}
+
+        .action-card.urgent {{ background: #fee2e2; border-color: #ef4444; }}
+        .action-card.success {{ background: #d1fae5; border-color: #10b981; }}
+
+        .action-title {{
+            font-weight: 700;
+            margin-bottom: 8px;
+            display: flex;
+            align-items: center;
+            gap: 6px;
+            flex-wrap: wrap;
+        }}
+
+        .action-desc {{ font-size: 13px; color: #4b5563; }}
+        .action-line {{ margin-bottom: 4px; }}
+        .action-label {{ font-weight: 600; color: #374151; }}
+
+        table {{
+            width: 100%;
+            border-collapse: collapse;
+            font-size: 13px;
+        }}
+
+        th {{
+            background: #f3f4f6;
+            padding: 8px 6px;
+            text-align: left;
+            font-weight: 600;
+            color: #374151;
+            border-bottom: 2px solid #e5e7eb;
+        }}
+
+        td {{
+            padding: 8px 6px;
+            border-bottom: 1px solid #f3f4f6;
+        }}
+
+        tr:hover {{ background: #f9fafb; }}
+        tr.highlight-row {{ background: #eff6ff; }}
+        tr.highlight-row:hover {{ background: #dbeafe; }}
+
+        .kop-good {{ color: #10b981; font-weight: 600; }}
+        .kop-warn {{ color: #f59e0b; font-weight: 600; }}
+        .kop-bad {{ color: #ef4444; font-weight: 600; }}
+
+        .growth-pos {{ color: #10b981; font-weight: 600; }}
+        .growth-neg {{ color: #ef4444; font-weight: 600; }}
+
+        .badge {{
+            display: inline-block;
+            padding: 2px 8px;
+            border-radius: 12px;
+            font-size: 11px;
+            font-weight: 600;
+            white-space: nowrap;
+        }}
+
+        .badge-urgent {{ background: #fee2e2; color: #991b1b; }}
+        .badge-important {{ background: #fef3c7; color: #92400e; }}
+        .badge-opportunity {{ background: #d1fae5; color: #065f46; }}
+        .badge-season {{ background: #dbeafe; color: #1e40af; }}
+        .badge-offseason {{ background: #f3f4f6; color: #6b7280; }}
+
+        .share-badge {{
+            background: #e5e7eb;
+            padding: 2px 8px;
+            border-radius: 4px;
+            font-size: 12px;
+            margin-left: 8px;
+        }}
+
+        .note-badge {{
+            background: #d1fae5;
+            color: #065f46;
+            padding: 2px 6px;
+            border-radius: 4px;
+            font-size: 11px;
+        }}
+
+        .problem-badge {{
+            background: #fee2e2;
+            color: #991b1b;
+            padding: 2px 6px;
+            border-radius: 4px;
+            font-size: 11px;
+        }}
+
+        .no-data {{
+            color: #94a3b8;
+            font-style: italic;
+            text-align: center;
+        }}
+
+        .metric-row {{
+            display: flex;
+            gap: 8px;
+            margin-bottom: 8px;
+            flex-wrap: wrap;
+        }}
+
+        .metric-box {{
+            flex: 1;
+            min-width: 100px;
+            background: #f9fafb;
+            padding: 10px;
+            border-radius: 6px;
+            text-align: center;
+        }}
+
+        .metric-label {{
+            font-size: 11px;
+            color: #6b7280;
+            margin-bottom: 4px;
+        }}
+
+        .metric-value {{
+            font-size: 20px;
+            font-weight: 700;
+            color: #1e3a8a;
+        }}
+
+        .note {{
+            background: #eff6ff;
+            border-left: 3px solid #3b82f6;
+            padding: 10px;
+            margin-top: 12px;
+            font-size: 13px;
+            border-radius: 4px;
+        }}
+
+        .imbalance-card {{
+            background: #fefce8;
+            border: 1px solid #fde047;
+            border-radius: 8px;
+            padding: 12px;
+            margin-bottom: 12px;
+        }}
+
+        .imbalance-header {{
+            font-size: 14px;
+            margin-bottom: 8px;
+            display: flex;
+            align-items: center;
+            flex-wrap: wrap;
+            gap: 8px;
+        }}
+
+        .imbalance-body {{ font-size: 13px; }}
+        .imbalance-row {{ margin-bottom: 4px; }}
+        .label-surplus {{ color: #dc2626; font-weight: 600; }}
+        .label-deficit {{ color: #16a34a; font-weight: 600; }}
+
+        .imbalance-action {{
+            margin-top: 8px;
+            padding-top: 8px;
+            border-top: 1px dashed #fde047;
+        }}
+
+        .deadline {{
+            display: inline-block;
+            background: #fef3c7;
+            padding: 2px 6px;
+            border-radius: 4px;
+            font-size: 12px;
+            margin-left: 8px;
+        }}
+
+        details {{
+            margin-top: 12px;
+        }}
+
+        summary {{
+            cursor: pointer;
+            font-weight: 600;
+            padding: 8px;
+            background: #f3f4f6;
+            border-radius: 6px;
+            margin-bottom: 8px;
+        }}
+
+        summary:hover {{ background: #e5e7eb; }}
+
+        @media (max-width: 768px) {{
+            body {{ padding: 8px; }}
+            .header {{ padding: 16px; }}
+            .header h1 {{ font-size: 20px; }}
+            .section {{ padding: 12px; }}
+            .section-title {{ font-size: 16px; }}
+            table {{ font-size: 12px; }}
+            th, td {{ padding: 6px 4px; }}
+            .metric-box {{ min-width: 80px; }}
+            .metric-value {{ font-size: 18px; }}
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <!-- Header -->
+        <div class="header">
+            <h1>KARI Недельный Отчёт {region}</h1>
+            <div class="subtitle">Неделя {period} | Регион {region_name} | {stores_count} магазинов</div>
+        </div>
+        {notes_html}
+
+        <!-- Executive Summary -->
+        <div class="section">
+            <div class="section-title">ТОП-3 ДЕЙСТВИЯ НА НЕДЕЛЮ</div>
+            {actions_html}
+        </div>
+
+        <!-- Компания и регионы -->
+        <div class="section">
+            <div class="section-title">КОМПАНИЯ И РЕГИОНЫ</div>
+            <p class="section-subtitle">Позиция {region} среди {total_regions} регионов компании</p>
+
+            <div class="metric-row">
+                <div class="metric-box">
+                    <div class="metric-label">Компания</div>
+                    <div class="metric-value growth-neg">{company_growth}</div>
+                </div>
+                <div class="metric-box">
+                    <div class="metric-label">Регион {region}</div>
+                    <div class="metric-value growth-neg">{nnv_growth}</div>
+                </div>
+                <div class="metric-box">
+                    <div class="metric-label">Место {region}</div>
+                    <div class="metric-value">{nnv_rank} из {total_regions}</div>
+                </div>
+            </div>
+
+            <details>
+                <summary>Показать ТОП-5 регионов</summary>
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Место</th>
+                            <th>Регион</th>
+                            <th>Доля</th>
+                            <th>Рост</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {regions_rows}
+                    </tbody>
+                </table>
+            </details>
+
+            {regions_note}
+        </div>
+
+        <!-- Подразделения ННВ -->
+        <div class="section">
+            <div class="section-title">ПОДРАЗДЕЛЕНИЯ {region}</div>
+            <p class="section-subtitle">{divisions_count} подразделений, {stores_count} магазинов</p>
+
+            <table>
+                <thead>
+                    <tr>
+                        <th>Подразделение</th>
+                        <th>Маг.</th>
+                        <th>Доля</th>
+                        <th>Рост</th>
+                        <th>КОП</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {divisions_rows}
+                </tbody>
+            </table>
+
+            {divisions_note}
+        </div>
+
+        <!-- Ключевые категории обуви -->
+        <div class="section">
+            <div class="section-title">КЛЮЧЕВЫЕ КАТЕГОРИИ ОБУВИ (ТОП-5)</div>
+            <p class="section-subtitle">Категории с долей >3% в продажах — основа оборота региона</p>
+
+            <table>
+                <thead>
+                    <tr>
+                        <th>№</th>
+                        <th>Группа</th>
+                        <th>Доля</th>
+                        <th>Рост</th>
+                        <th>КОП</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {key_categories_rows}
+                </tbody>
+            </table>
+
+            {key_categories_note}
+        </div>
+
+        <!-- Категории с ростом и дефицитом -->
+        <div class="section">
+            <div class="section-title">КАТЕГОРИИ С РОСТОМ И ДЕФИЦИТОМ</div>
+            <p class="section-subtitle">Рост >50% при КОП &lt;1.0 — упущенная выгода, нужно пополнить</p>
+
+            <table>
+                <thead>
+                    <tr>
+                        <th>Группа</th>
+                        <th>Доля</th>
+                        <th>Рост</th>
+                        <th>КОП</th>
+                        <th>Приоритет</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {growth_rows}
+                </tbody>
+            </table>
+
+            <div class="note">
+                <strong>Действие:</strong> Срочно пополнить эти категории. Высокий спрос + дефицит = теряем продажи каждый день.
+            </div>
+        </div>
+
+        <!-- Неликвидные остатки -->
+        <div class="section">
+            <div class="section-title">НЕЛИКВИДНЫЕ ОСТАТКИ</div>
+            <p class="section-subtitle">Товар с оборачиваемостью >50 недель — заморожен капитал</p>
+
+            <table>
+                <thead>
+                    <tr>
+                        <th>Группа</th>
+                        <th>Оборач.</th>
+                        <th>Остаток</th>
+                        <th>Действие</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {illiquid_rows}
+                </tbody>
+            </table>
+
+            <div class="note">
+                <strong>Эффект от распродажи:</strong> Освобождение капитала + место под новую коллекцию.
+            </div>
+        </div>
+
+        <!-- Дисбалансы -->
+        <div class="section">
+            <div class="section-title">ДИСБАЛАНСЫ ПО ПОДРАЗДЕЛЕНИЯМ</div>
+            <p class="section-subtitle">Где затовар (КОП >2.0) vs где дефицит (КОП &lt;1.0) для ключевых категорий</p>
+
+            {imbalances_html}
+
+            <div class="note">
+                <strong>Приоритет перемещений:</strong> внутри города (бесплатно) → между городами подразделения → между подразделениями.
+            </div>
+        </div>
+
+        <!-- Магазины -->
+        <div class="section">
+            <div class="section-title">МАГАЗИНЫ</div>
+
+            <h4 style="font-size:14px; margin:12px 0 8px;">ТОП-3 (лучшие практики)</h4>
+            <table>
+                <thead>
+                    <tr>
+                        <th>№</th>
+                        <th>Магазин</th>
+                        <th>Подразд.</th>
+                        <th>Рост</th>
+                        <th>КОП</th>
+                        <th>Примечание</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {top_stores_rows}
+                </tbody>
+            </table>
+
+            <h4 style="font-size:14px; margin:16px 0 8px;">ХУДШИЕ-3 (требуют внимания)</h4>
+            <table>
+                <thead>
+                    <tr>
+                        <th>№</th>
+                        <th>Магазин</th>
+                        <th>Подразд.</th>
+                        <th>Падение</th>
+                        <th>КОП</th>
+                        <th>Проблема</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {worst_stores_rows}
+                </tbody>
+            </table>
+
+            <div class="note">
+                <strong>Анализ:</strong> Худшие магазины показывают затоваривание (КОП 2-3+).
+                Нужна ревизия ассортимента и перемещение излишков в магазины с дефицитом.
+            </div>
+        </div>
+
+        <!-- Аксессуары -->
+        <div class="section">
+            <div class="section-title">АКСЕССУАРЫ (без ювелирных)</div>
+            <p class="section-subtitle">Сумки, рюкзаки, ремни, кошельки, перчатки и др.</p>
+
+            <div class="metric-row">
+                <div class="metric-box">
+                    <div class="metric-label">Доля в обороте</div>
+                    <div class="metric-value">{acc_share}</div>
+                </div>
+                <div class="metric-box">
+                    <div class="metric-label">Средний КОП</div>
+                    <div class="metric-value kop-warn">{acc_avg_kop}</div>
+                </div>
+                <div class="metric-box">
+                    <div class="metric-label">Рост</div>
+                    <div class="metric-value growth-neg">{acc_growth}</div>
+                </div>
+            </div>
+
+            <details>
+                <summary>Ключевые категории аксессуаров</summary>
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Категория</th>
+                            <th>Доля</th>
+                            <th>Рост</th>
+                            <th>КОП</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {acc_key_rows}
+                    </tbody>
+                </table>
+            </details>
+
+            <details>
+                <summary>Категории с ростом и дефицитом</summary>
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Категория</th>
+                            <th>Доля</th>
+                            <th>Рост</th>
+                            <th>КОП</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        {acc_growth_rows}
+                    </tbody>
+                </table>
+            </details>
+
+            {acc_note}
+        </div>
+
+        <!-- План действий -->
+        <div class="section">
+            <div class="section-title">ПЛАН ДЕЙСТВИЙ НА НЕДЕЛЮ</div>
+
+            {plan_html}
+        </div>
+
+        <!-- Footer -->
+        <div style="text-align:center; padding:16px; color:#9ca3af; font-size:12px;">
+            <div>Источник: отчёты за {period}</div>
+            <div style="margin-top:4px;">generate_dashboard.py v2.0 | {generated_at}</div>
+        </div>
+    </div>
+</body>
+</html>'''
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""
+Граф зависимостей этапов: пересчёт только изменившегося
+=======================================================
+Узел графа — этап генерации (извлечение отчёта, часть анализа, секция
+HTML) с явными зависимостями. Ключ узла — хэш его имени, параметров и
+ключей зависимостей; у входного файла ключ — SHA-256 содержимого. Если
+в середине недели заново прислан только отчёт по аксессуарам, меняются
+ключи лишь тех узлов, что от него зависят: остальные результаты берутся
+из хранилища (ParseCache — тот же cache/ и LRU), а оборачиваемость даже
+не открывается.
+
+- persist=False — результат не сохраняется (извлечённые таблицы уже
+  лежат в кэше разбора; хранить их второй раз незачем)
+- by_value=True — дешёвый узел, который считается всегда, а ключом
+  служит хэш значения: период меняется раз в неделю, и без отсечки по
+  значению новый файл аксессуаров пересчитывал бы анализ оборачиваемости
+- may_fail=True — узел, который при сбое возвращает None (извлечение
+  отчёта): если его входной файл есть, а значение None, зависящие от него
+  узлы считаются, но не сохраняются — следующий запуск посчитает их
+  заново, а не покажет примеры вместо данных до --full
+
+В ключ каждого узла входит отпечаток кода (code_fingerprint() исходников
+анализа и секций): после правки кода результаты, сохранённые старым
+кодом, не подходят — менять версию вручную не нужно.
+
+plan() — какие узлы будут пересчитаны для заданных целей, без
+вычислений (кроме by_value узлов); на нём построен --dry-run.
+"""
+
+import hashlib
+import pickle
+from pathlib import Path
+
+from parse_cache import file_hash
+
+
+# Ключ отсутствующего входного файла
+MISSING = 'missing'
+
+# Статусы узлов в plan()
+RUN = 'run'
+CACHED = 'cached'
+SKIP = 'skip'
+INPUT = 'input'
+
+_MISS = object()
+
+
+def code_fingerprint(paths):
+    """
+    Хэш исходников, от которых зависят результаты узлов: изменился код анализа
+    или секций — меняются ключи, сохранённые старым кодом результаты не берутся
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).name.encode('utf-8'))
+        digest.update(file_hash(path).encode('ascii'))
+    return digest.hexdigest()
+
+
+def value_hash(value):
+    """Хэш значения (pickle — как у кэша секций html_renderer)"""
+    return hashlib.sha256(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+class DependencyGraph:
+    """Этапы генерации с зависимостями и хранилищем результатов, адресуемым ключами узлов"""
+
+    def __init__(self, store=None, code=''):
+        """code — отпечаток кода (code_fingerprint()), входит в ключи всех узлов"""
+        self.store = store
+        self.code = code
+        self.nodes = {}
+        self.ran = []
+        self.reused = []
+        self.failed = set()
+        self._keys = {}
+        self._values = {}
+
+    def add_file(self, name, file_path):
+        """Входной файл (None — не найден): значение — путь, ключ — SHA-256 содержимого"""
+        self.nodes[name] = {'compute': lambda: file_path, 'deps': (), 'params': None,
+                            'persist': False, 'by_value': False, 'may_fail': False, 'file': True}
+        if file_path is None:
+            self._keys[name] = MISSING
+        elif self.store is not None:
+            self._keys[name] = self.store.content_hash(file_path)
+        else:
+            self._keys[name] = file_hash(file_path)
+
+    def add(self, name, compute, deps=(), params=None, persist=True, by_value=False, may_fail=False):
+        """Этап: compute(*значения deps); params — всё, кроме зависимостей, от чего зависит результат"""
+        for dep in deps:
+            if dep not in self.nodes:
+                raise ValueError(f"Узел {name}: неизвестная зависимость {dep}")
+        # by_value узел считается всегда — хранить его незачем
+        self.nodes[name] = {'compute': compute, 'deps': tuple(deps), 'params': params,
+                            'persist': persist and not by_value, 'by_value': by_value,
+                            'may_fail': may_fail, 'file': False}
+
+    def provide(self, name, value):
+        """Значение узла, посчитанное снаружи (например, extract_all() в пуле процессов)"""
+        self._values[name] = value
+        self.ran.append(name)
+        self._check_failure(name, value)
+
+    def _check_failure(self, name, value):
+        """may_fail узел вернул None, хотя входной файл есть, — сбой"""
+        node = self.nodes[name]
+        if not node['may_fail'] or value is not None:
+            return
+        files = [dep for dep in node['deps'] if self.nodes[dep]['file']]
+        if not files or any(self.key(dep) != MISSING for dep in files):
+            self.failed.add(name)
+
+    def key(self, name):
+        """Ключ узла: хэш файла, хэш значения или хэш имени, параметров и ключей зависимостей"""
+        if name not in self._keys:
+            node = self.nodes[name]
+            if node['by_value']:
+                self._keys[name] = value_hash(self.value(name))
+            else:
+                parts = [self.code, name, repr(node['params'])]
+                parts += [self.key(dep) for dep in node['deps']]
+                self._keys[name] = hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+        return self._keys[name]
+
+    def cached(self, name):
+        """Результат узла уже лежит в хранилище"""
+        node = self.nodes[name]
+        return bool(node['persist'] and self.store is not None and self.store.has(self.key(name)))
+
+    def plan(self, targets):
+        """
+        {узел: статус} в порядке добавления: RUN — будет посчитан (by_value — уже посчитан),
+        CACHED — из хранилища, SKIP — не нужен для targets, INPUT — входной файл
+        Зависимости узла из хранилища не нужны — от них план дальше не идёт
+        """
+        status = {}
+
+        def visit(name):
+            if name in status:
+                return
+            node = self.nodes[name]
+            if node['file']:
+                status[name] = INPUT
+                return
+            if self.cached(name):
+                status[name] = CACHED
+                return
+            status[name] = RUN
+            for dep in node['deps']:
+                visit(dep)
+
+        for target in targets:
+            visit(target)
+        for name, node in self.nodes.items():
+            if node['file']:
+                status[name] = INPUT
+            elif node['by_value'] and name in self._values:
+                # Посчитан ради ключа — при запуске повторно не считается
+                status.setdefault(name, RUN)
+        return {name: status.get(name, SKIP) for name in self.nodes}
+
+    def value(self, name):
+        """Значение узла: уже посчитанное, из хранилища или compute() по значениям зависимостей"""
+        if name in self._values:
+            return self._values[name]
+
+        node = self.nodes[name]
+        value = _MISS
+        if self.cached(name):
+            value = self.store.get(self.key(name), _MISS)
+            if value is not _MISS:
+                self.reused.append(name)
+        if value is _MISS:
+            value = node['compute'](*[self.value(dep) for dep in node['deps']])
+            if not node['file']:
+                self.ran.append(name)
+            # Посчитано по сбойной зависимости — в хранилище не кладётся
+            if any(dep in self.failed for dep in node['deps']):
+                self.failed.add(name)
+            else:
+                self._check_failure(name, value)
+            if node['persist'] and self.store is not None and name not in self.failed:
+                self.store.put(self.key(name), value)
+        self._values[name] = value
+        return value
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Компактные типы колонок разобранных отчётов
+===========================================
+Сразу после загрузки Excel (extract_*_data) таблица приводится к
+экономным типам — один раз, дальше анализ, история и пакетная генерация
+работают с уже нормализованными колонками:
+
+- пустые колонки (все значения пропущены) удаляются
+- текстовые колонки, где почти все значения — числа ('1 234,5', '12%'),
+  становятся числовыми
+- повторяющиеся названия (регион, подразделение, группа товара, лист) и
+  номера магазинов → category: строка хранится один раз, в ячейке — код
+- целые → самый узкий int; дробные, где все значения целые, — тоже int
+- остальные дробные остаются float64: float32 превращает 12.3 в
+  12.300000190734863 в анализе и истории (downcast_floats=True — для
+  разовых расчётов, где это не важно)
+
+Способ приведения каждой колонки (план) можно взять у другой таблицы:
+при потоковом разборе план первой части применяется ко всем остальным.
+Сколько непустых значений не разобралось как числа, normalize_columns()
+возвращает вместе с таблицей — для лога.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Доля непустых значений, которые должны разобраться как числа
+NUMERIC_SHARE = 0.95
+
+# category, если уникальных значений не больше этой доли строк
+CATEGORY_MAX_RATIO = 0.5
+
+# Целочисленные колонки-идентификаторы (номера магазинов, коды)
+ID_KEYWORDS = ('магазин', 'код')
+
+
+def frame_memory(df):
+    """Память таблицы в байтах (со строками)"""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def _is_text(series):
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+
+def _text_values(series):
+    """
+    Разбор текстовой колонки по уникальным значениям (pd.factorize):
+    маска заполненных ячеек (пустая строка — пропуск) и те же ячейки как числа
+    """
+    codes, uniques = pd.factorize(series)
+    labels = pd.Index(uniques, dtype=object).astype(str).str.strip()
+    filled_unique = np.asarray(labels != '', dtype=bool)
+    numbers_unique = _to_number(labels)
+
+    valid = codes >= 0
+    filled = np.zeros(len(series), dtype=bool)
+    filled[valid] = filled_unique[codes[valid]]
+    numbers = np.full(len(series), np.nan)
+    numbers[valid] = numbers_unique[codes[valid]]
+    return pd.Series(filled, index=series.index), pd.Series(numbers, index=series.index)
+
+
+def _to_number(labels):
+    """Числа из текста: пробелы-разделители тысяч, запятая, знак %"""
+    text = labels.str.replace(r'[\s%]', '', regex=True).str.replace(',', '.', regex=False)
+    return np.asarray(pd.to_numeric(text, errors='coerce'), dtype=float)
+
+
+def _downcast(series, downcast_floats=False):
+    """Самый узкий числовой тип без потери значений"""
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy()
+        if series.notna().all() and np.array_equal(values, np.round(values)):
+            return pd.to_numeric(series.astype(np.int64), downcast='integer')
+        if downcast_floats:
+            return pd.to_numeric(series, downcast='float')
+    return series
+
+
+def _as_category(series, filled):
+    """category, если значения повторяются"""
+    if not _repeats(series, filled):
+        return series
+    return series.astype('category')
+
+
+def _repeats(series, filled):
+    count = int(filled.sum())
+    return count > 0 and series.nunique() <= CATEGORY_MAX_RATIO * count
+
+
+def _plan_column(series, filled, numbers):
+    """Способ приведения колонки по её значениям (см. normalize_columns())"""
+    if not filled.any():
+        return 'drop'
+    if not _is_text(series) or numbers[filled].notna().mean() >= NUMERIC_SHARE:
+        return 'number'
+    return 'category' if _repeats(series, filled) else 'text'
+
+
+def normalize_columns(df, plan=None, downcast_floats=False):
+    """
+    Компактные типы колонок: (таблица, план, {колонка: потеряно значений})
+    План — {колонка: способ}: 'drop' (пустая), 'number' (число, текст разбирается),
+    'text' или 'category'. Переданный план (например, первой части листа при потоковом
+    разборе) применяется как есть — все части приводятся одинаково; колонки вне плана
+    и пустые в плане, но заполненные здесь, планируются по своим значениям.
+    Потеряны — непустые значения колонки 'number', которые не разобрались как числа
+    """
+    plan = dict(plan or {})
+    columns = {}
+    coerced = {}
+    for col in df.columns:
+        series = df[col]
+        text = _is_text(series)
+        if text:
+            filled, numbers = _text_values(series)
+        else:
+            filled, numbers = series.notna(), series
+        way = plan.get(col)
+        if way is None or (way == 'drop' and filled.any()):
+            way = plan[col] = _plan_column(series, filled, numbers)
+        if way == 'drop':
+            continue
+
+        if way == 'number':
+            lost = int((filled & numbers.isna()).sum())
+            if lost:
+                coerced[col] = lost
+            series = numbers
+        elif text:
+            series = series.where(filled)
+
+        if way == 'category':
+            series = series.astype('category')
+        elif pd.api.types.is_numeric_dtype(series):
+            is_id = any(keyword in str(col).lower() for keyword in ID_KEYWORDS)
+            series = _downcast(series, downcast_floats)
+            if is_id and pd.api.types.is_integer_dtype(series):
+                series = _as_category(series, filled)
+        columns[col] = series
+
+    return pd.DataFrame(columns, index=df.index), plan, coerced
+
+
+def normalize_frame(df, downcast_floats=False):
+    """Таблица с компактными типами колонок (исходная не меняется)"""
+    return normalize_columns(df, downcast_floats=downcast_floats)[0]
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Загрузка Excel листов за один проход
+====================================
+Разбор XML через openpyxl — самый дорогой шаг генерации, поэтому каждый
+лист читается ровно один раз: сырые строки остаются в памяти, строка
+заголовка ищется по ним, а итоговый DataFrame строится из тех же строк
+тем же парсером, что и в pd.read_excel(header=N).
+
+Многолистовые книги читаются через load_sheets(): один открытый файл на
+процесс, листы при желании раскладываются по пулу процессов.
+
+Если подключён кэш (configure_cache), повторное чтение неизменного файла
+берётся из parse_cache.ParseCache без разбора XML.
+
+Время разбора каждого файла копится в PARSE_TIMINGS (reset_parse_stats()
+в начале запуска).
+
+Движок разбора XML выбирается для каждого файла (configure_engines):
+calamine (python-calamine, Rust) в разы быстрее openpyxl и даёт те же
+таблицы; если он не установлен, файлы читаются через openpyxl.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+# Время разбора по файлам: {имя файла: секунды}
+PARSE_TIMINGS = {}
+
+# Файлы, взятые из кэша в этом запуске
+CACHED_FILES = set()
+
+_cache = None
+
+# Движки pd.read_excel; 'auto' — calamine, если установлен, иначе openpyxl
+ENGINES = ('openpyxl', 'calamine')
+DEFAULT_ENGINE = 'auto'
+
+_engine = DEFAULT_ENGINE
+_file_engines = {}
+
+
+def configure_engines(default=DEFAULT_ENGINE, files=None):
+    """
+    Движок разбора: default — для всех файлов, files — {подстрока имени файла: движок}
+    Движки: 'auto', 'openpyxl', 'calamine'
+    """
+    global _engine, _file_engines
+    for engine in [default, *(files or {}).values()]:
+        if engine != 'auto' and engine not in ENGINES:
+            raise ValueError(f"Неизвестный движок Excel: {engine} (есть: auto, {', '.join(ENGINES)})")
+    _engine = default
+    _file_engines = dict(files or {})
+
+
+def engine_config():
+    """Текущая настройка движков: (default, files) — для передачи в воркеры"""
+    return _engine, dict(_file_engines)
+
+
+def engine_available(engine):
+    """Установлен ли движок"""
+    return engine == 'openpyxl' or (engine == 'calamine' and python_calamine is not None)
+
+
+def resolve_engine(file_path):
+    """Движок для файла: по настройке, без calamine — openpyxl"""
+    name = Path(file_path).name.casefold()
+    engine = next((engine for pattern, engine in _file_engines.items() if pattern.casefold() in name),
+                  _engine)
+    if engine == 'auto' or not engine_available(engine):
+        engine = 'calamine' if engine_available('calamine') else 'openpyxl'
+    return engine
+
+
+def configure_cache(cache):
+    """Подключить кэш разбора (None — читать всегда заново)"""
+    global _cache
+    _cache = cache
+
+
+def get_cache():
+    """Подключённый кэш разбора (или None)"""
+    return _cache
+
+
+def reset_parse_stats():
+    """Забыть время разбора и файлы из кэша прошлого запуска (новый запуск в том же процессе)"""
+    PARSE_TIMINGS.clear()
+    CACHED_FILES.clear()
+
+
+def _cached(file_path, loader, **params):
+    """
+    Результат loader() через кэш, если он подключён
+    params — всё, от чего зависит результат, включая движок: после смены --excel-engine
+    файл разбирается новым движком, а не берётся разобранным прежним
+    """
+    if _cache is None or not _cache.enabled:
+        return loader()
+    hits = _cache.hits
+    value = _cache.get_or_load(file_path, loader, **params)
+    if _cache.hits > hits:
+        CACHED_FILES.add(Path(file_path).name)
+    return value
+
+
+def _record_timing(file_path, seconds):
+    """Учёт времени разбора файла (листы одного файла суммируются)"""
+    name = Path(file_path).name
+    PARSE_TIMINGS[name] = PARSE_TIMINGS.get(name, 0.0) + seconds
+
+
+def _read_raw(source, sheet_name, engine=None):
+    """
+    Сырые строки листа без заголовка и без обработки пропусков
+    source — путь или открытый pd.ExcelFile (engine — для пути)
+    Пустые ячейки остаются '', числа — как в Excel (int/float)
+    """
+    raw = pd.read_excel(source, sheet_name=sheet_name, header=None,
+                        dtype=object, na_filter=False, engine=engine)
+    return raw.values.tolist()
+
+
+def find_header_row(rows, keywords):
+    """Первая строка, в которой встречается одно из ключевых слов"""
+    for idx, row in enumerate(rows):
+        row_str = ' '.join([str(v).lower() for v in row if v != ''])
+        if any(keyword in row_str for keyword in keywords):
+            return idx
+    return None
+
+
+def build_frame(rows, header=None):
+    """
+    DataFrame из сырых строк — результат совпадает с pd.read_excel(header=header)
+    header=None — без заголовка, иначе номер строки заголовка
+    """
+    if not rows:
+        return pd.DataFrame()
+    if header is None:
+        return TextParser(rows, header=None, skip_blank_lines=False).read()
+    return TextParser(rows[header:], header=0, skip_blank_lines=False).read()
+
+
+def load_sheet(file_path, sheet_name=0, header=None, header_keywords=None, default_header=None):
+    """
+    Загрузка листа за один разбор файла
+
+    header           — фиксированная строка заголовка (как в pd.read_excel)
+    header_keywords  — искать строку заголовка по ключевым словам
+    default_header   — строка заголовка, если ключевые слова не найдены
+    """
+    def load():
+        rows = _read_raw(file_path, sheet_name, resolve_engine(file_path))
+        row = header
+        if header_keywords:
+            row = find_header_row(rows, header_keywords)
+            if row is None:
+                row = default_header
+        return build_frame(rows, row)
+
+    started = time.perf_counter()
+    df = _cached(file_path, load, kind='sheet', sheet_name=sheet_name, header=header,
+                 header_keywords=tuple(header_keywords or ()), default_header=default_header,
+                 engine=resolve_engine(file_path))
+    _record_timing(file_path, time.perf_counter() - started)
+    return df
+
+
+def _load_sheet_group(file_path, sheet_names, header, engine=None):
+    """Разбор группы листов через один открытый файл (выполняется и в воркере)"""
+    with pd.ExcelFile(file_path, engine=engine) as xls:
+        return [(sheet, build_frame(_read_raw(xls, sheet), header)) for sheet in sheet_names]
+
+
+def load_sheets(file_path, header=None, max_workers=1):
+    """
+    Загрузка всех листов книги: {имя листа: DataFrame} в порядке книги
+
+    max_workers=1 — все листы в текущем процессе через один открытый файл
+    max_workers>1 — листы делятся между процессами (не больше числа листов),
+                    каждый воркер открывает файл один раз
+    """
+    started = time.perf_counter()
+    frames = _cached(file_path, lambda: _load_all_sheets(file_path, header, max_workers),
+                     kind='sheets', header=header, engine=resolve_engine(file_path))
+    _record_timing(file_path, time.perf_counter() - started)
+    return frames
+
+
+def _load_all_sheets(file_path, header, max_workers):
+    """Разбор всех листов книги (без кэша)"""
+    engine = resolve_engine(file_path)
+    with pd.ExcelFile(file_path, engine=engine) as xls:
+        sheet_names = list(xls.sheet_names)
+        workers = max(1, min(max_workers or 1, len(sheet_names)))
+        if workers == 1:
+            frames = [(sheet, build_frame(_read_raw(xls, sheet), header)) for sheet in sheet_names]
+
+    if workers > 1:
+        groups = [sheet_names[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_load_sheet_group, [file_path] * workers, groups,
+                               [header] * workers, [engine] * workers)
+            loaded = dict(pair for group in results for pair in group)
+        frames = [(sheet, loaded[sheet]) for sheet in sheet_names]
+
+    return dict(frames)
+
+
+def parse_time(file_path):
+    """Суммарное время разбора файла в секундах"""
+    return PARSE_TIMINGS.get(Path(file_path).name, 0.0)
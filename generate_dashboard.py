@@ -32,10 +32,16 @@ KARI Dashboard Generator v2.1
 """
 
 import pandas as pd
-import json
+import argparse
+import contextlib
+import io
+import multiprocessing
+import multiprocessing.connection
 import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime, timedelta
 import warnings
@@ -43,11 +49,28 @@ warnings.filterwarnings('ignore')
 
 # Импорт парсера периода из telegram_bot
 sys.path.insert(0, str(Path(__file__).parent / 'telegram_bot'))
-from period_parser import get_report_period as parse_period_from_excel
+from period_parser import get_report_period as parse_period_from_excel, save_period_manifest
+from excel_loader import (load_sheet, load_sheets, parse_time, reset_parse_stats, configure_cache, get_cache,
+                          CACHED_FILES, configure_engines, engine_config, engine_available, resolve_engine,
+                          DEFAULT_ENGINE)
+from parse_cache import ParseCache
+from input_index import InputIndex
+from region_filter import filter_region, find_region_columns, member_mask, region_columns
+import history_store
+import analytics
+import transfer_plan
+from season_matcher import SeasonMatcher
+from html_renderer import DashboardRenderer
+from html_minifier import minify_html, check_budget, SizeBudgetError, MAX_HTML_BYTES
+from pipeline_metrics import PipelineMetrics
+from dtype_normalizer import normalize_columns, frame_memory
+from stream_reader import iter_sheet_chunks, iter_book_chunks, CHUNK_ROWS
+from stream_aggregates import TurnoverTotals
+from dependency_graph import DependencyGraph, code_fingerprint, MISSING, RUN, CACHED, SKIP, INPUT
+from json_export import write_json, default_encoder
 
 # Настройка кодировки для Windows
 if sys.platform == 'win32':
-    import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
 # Пути
@@ -64,19 +87,74 @@ SHARE_KEY_CATEGORY = 3.0   # Ключевая категория: доля >3%
 GROWTH_POTENTIAL = 50.0     # Высокий потенциал: рост >50%
 TURNOVER_DEAD = 50          # Неликвид: >50 недель
 
-# Сезонные категории (январь = зима)
+# Рендерер HTML: оболочка разбирается один раз, секции кэшируются
+RENDERER = DashboardRenderer(KOP_GOOD_MAX, KOP_WARN_MAX)
+
+# Метрики этапов запуска (logs/metrics_YYYYMMDD.jsonl), пересоздаются в main()
+METRICS = PipelineMetrics('generate')
+
+# Процессов для разбора листов многолистовых книг (1 = без пула)
+SHEET_WORKERS = 1
+
+# Движок разбора для отдельных файлов: {подстрока имени файла: 'openpyxl' | 'calamine'}
+# (остальные — по --excel-engine, по умолчанию calamine, если установлен)
+EXCEL_ENGINES = {}
+
+# Сезонные категории (что сейчас в сезоне — по месяцу отчёта, season_matcher.SEASON_CALENDAR)
 SEASON_WINTER = ['зимн', 'утепл', 'дутик', 'мех', 'валенки', 'угги']
 SEASON_SUMMER = ['летн', 'сандал', 'шлёпанц', 'шлепанц', 'босонож', 'мокасин', 'сланц']
+SEASONS = SeasonMatcher(SEASON_WINTER, SEASON_SUMMER)
+
+# Регион одиночного запуска
+DEFAULT_REGION = 'ННВ'
+
+# Полные названия регионов для заголовка дашборда
+REGION_NAMES = {
+    'МСК': 'Москва',
+    'СПБ': 'Санкт-Петербург',
+    'ННВ': 'Нижний Новгород',
+    'ЮГ': 'Юг',
+    'УРЛ': 'Урал',
+    'СИБ': 'Сибирь',
+    'ДВ': 'Дальний Восток',
+    'ЦЧР': 'Центральное Черноземье',
+    'ПВЛ': 'Поволжье',
+    'СЗ': 'Северо-Запад',
+    'КАВ': 'Кавказ',
+}
+
+# Варианты написания региона в отчётах (подстроки в нижнем регистре;
+# ищутся в колонке «Регион», если она есть — см. region_filter.region_columns)
+REGION_ALIASES = {
+    'МСК': ('мск', 'москв'),
+    'СПБ': ('спб', 'петербург'),
+    'ННВ': ('ннв', 'нижний'),
+    'ЮГ': ('юг',),
+    'УРЛ': ('урл', 'урал'),
+    'СИБ': ('сиб',),
+    'ДВ': ('дв', 'дальн'),
+    'ЦЧР': ('цчр', 'чернозем'),
+    'ПВЛ': ('пвл', 'поволж'),
+    'СЗ': ('сз', 'северо-запад'),
+    'КАВ': ('кав',),
+}
+
+# Процессов для пакетной генерации по регионам (--batch)
+BATCH_WORKERS = 4
+
+# Процессов для извлечения четырёх отчётов (1 = по очереди, 0 = авто по размеру входных файлов)
+EXTRACT_WORKERS = 0
 
-# Подразделения ННВ
-DIVISIONS_NNV = {
-    'ННВ 1': 28,
-    'Казань 1': 23,
-    'Владимир': 18,
-    'Ярославское': 15,
-    'Наб.Челны': 14,
-    'ННВ Север': 12,
-    'Ижевское': 9
+# Авто: пул, если входные файлы вместе не меньше — иначе запуск пула дольше самого разбора
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024   # 2 MB
+
+# Лимит времени экстрактора при параллельном извлечении, с (от запуска его процесса);
+# не уложился — процесс завершается, отчёт None
+EXTRACT_TIMEOUTS = {
+    'extract_regions': 120,
+    'extract_turnover': 600,
+    'extract_accessories': 300,
+    'extract_structure': 300,
 }
 
 
@@ -85,12 +163,86 @@ def log(msg):
     print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}")
 
 
-def find_excel_file(pattern, directory=INPUT_DIR):
-    """Поиск Excel файла по паттерну"""
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.endswith(('.xlsx', '.xls')) and pattern.lower() in file.lower():
-                return Path(root) / file
+def log_parse_time(file_path):
+    """Время разбора файла (или отметка, что он взят из кэша)"""
+    source = "из кэша" if file_path.name in CACHED_FILES else resolve_engine(file_path)
+    log(f"  Разбор файла: {parse_time(file_path):.2f} с ({source})")
+
+
+def log_coerced(coerced):
+    """Непустые значения, потерянные при приведении типов: {колонка: сколько}"""
+    if coerced:
+        log("  ВНИМАНИЕ: не разобраны как числа (стали пустыми): "
+            + ', '.join(f"{col} — {count}" for col, count in coerced.items()))
+
+
+def normalize_loaded(df):
+    """Компактные типы колонок сразу после загрузки; в лог — сэкономленная память и потерянные значения"""
+    before = frame_memory(df)
+    df, _, coerced = normalize_columns(df)
+    after = frame_memory(df)
+    saved = (1 - after / before) * 100 if before else 0.0
+    log(f"  Память таблицы: {before / 1024:.0f} → {after / 1024:.0f} KB (−{saved:.0f}%)")
+    log_coerced(coerced)
+    return df
+
+
+# Индексы входных каталогов: сканируются один раз за запуск (reset_input_indexes() в run())
+_input_indexes = {}
+
+
+def get_input_index(directory=None, rescan=False):
+    """Индекс Excel файлов каталога (строится при первом обращении; по умолчанию — INPUT_DIR)"""
+    directory = Path(directory or INPUT_DIR)
+    if rescan or directory not in _input_indexes:
+        _input_indexes[directory] = InputIndex(directory)
+    return _input_indexes[directory]
+
+
+def reset_input_indexes():
+    """Забыть индексы: следующий поиск сканирует input/ заново (новый запуск в том же процессе)"""
+    _input_indexes.clear()
+
+
+def find_excel_file(pattern, directory=None, exclude=()):
+    """
+    Поиск самого свежего Excel файла по паттерну (по индексу input/)
+    exclude — (паттерн, каталог) файлов других отчётов, которые не подходят
+    """
+    directory = directory or INPUT_DIR
+    with METRICS.stage('find_excel_file', pattern=pattern) as stage:
+        index = get_input_index()
+        if not index.covers(directory):
+            index = get_input_index(directory)
+        file_path = index.find(pattern, directory, exclude)
+        stage['file'] = file_path.name if file_path else None
+    return file_path
+
+
+# Входные отчёты: (паттерн имени, подкаталог input/) в порядке поиска;
+# первая пара — основная, остальные — запасные паттерны по всему input/
+REPORT_SOURCES = {
+    'regions': (("По регионам", "Отчет по приросту регионы"), ("регион", None)),
+    'turnover': (("оборачиваемост", "Обувь остатки и оборачиваемость по группам товара"), ("оборач", None)),
+    'accessories': (("аксессуар", "Отчет по приросту аксессуаров по магазинам"), ("аксессуар", None)),
+    'structure': (("Структура", None),),
+}
+
+
+def other_reports(kind):
+    """Основные (паттерн, каталог) остальных отчётов — их файлы запасной паттерн kind не берёт"""
+    return tuple((pattern, INPUT_DIR / subdir if subdir else None)
+                 for other, ((pattern, subdir), *_) in REPORT_SOURCES.items() if other != kind)
+
+
+def find_report_file(kind):
+    """Самый свежий файл отчёта kind (ключ REPORT_SOURCES) или None"""
+    for number, (pattern, subdir) in enumerate(REPORT_SOURCES[kind]):
+        # Запасной паттерн ("регион") не должен взять, например, "...ТЗ регион ННВ" оборачиваемости
+        exclude = other_reports(kind) if number else ()
+        file_path = find_excel_file(pattern, INPUT_DIR / subdir if subdir else None, exclude)
+        if file_path:
+            return file_path
     return None
 
 
@@ -102,7 +254,7 @@ def parse_period_from_filename(filename):
     # НОВЫЙ ПОДХОД: Используем функцию из telegram_bot/period_parser.py
     # Она читает период из Excel файлов, а не вычисляет математически
     try:
-        period = parse_period_from_excel()
+        period = parse_period_from_excel(cache=get_cache())
         log(f"  ✓ Период извлечён из Excel: {period}")
         return period
     except Exception as e:
@@ -128,28 +280,36 @@ def parse_period_from_filename(filename):
         return f"{week_start.day}-{week_end.day} {months_ru[week_start.month-1]} {week_start.year}"
 
 
-def get_season_badge(category_name):
-    """Определяет сезонность категории"""
-    name_lower = category_name.lower()
+def get_season_badge(category_name, month=None):
+    """Определяет сезонность категории (month — месяц отчёта, по умолчанию текущий)"""
+    return SEASONS.badge(category_name, month)
 
-    for keyword in SEASON_WINTER:
-        if keyword in name_lower:
-            return 'СЕЗОН'
 
-    for keyword in SEASON_SUMMER:
-        if keyword in name_lower:
-            return 'НЕСЕЗОН'
+def report_month(period):
+    """Месяц отчёта из периода ("12-18 января 2026" → 1), None если не распознан"""
+    start = history_store.period_start(period)
+    return int(start[5:7]) if start else None
 
-    return None
+
+def season_month(period):
+    """Месяц, по которому ставятся бейджи сезона: месяц отчёта, не распознан — текущий"""
+    return report_month(period) or datetime.now().month
+
+
+def resolve_period():
+    """
+    Период отчёта — один раз за запуск, в основном процессе; экстракторы получают
+    его параметром period (None — файла регионов нет, экстрактор определит сам)
+    """
+    regions_path = find_report_file('regions')
+    return parse_period_from_filename(regions_path) if regions_path else None
 
 
-def extract_regions_data():
-    """Извлечение данных по регионам"""
+def extract_regions_data(period=None):
+    """Извлечение данных по регионам (period — уже определённый период отчёта)"""
     log("Извлекаю данные по регионам...")
 
-    file_path = find_excel_file("По регионам", INPUT_DIR / "Отчет по приросту регионы")
-    if not file_path:
-        file_path = find_excel_file("регион")
+    file_path = find_report_file('regions')
 
     if not file_path or not file_path.exists():
         log("  ВНИМАНИЕ: Файл регионов не найден")
@@ -158,21 +318,13 @@ def extract_regions_data():
     log(f"  Файл: {file_path.name}")
 
     try:
-        df = pd.read_excel(file_path, sheet_name=0, header=None)
-
-        header_row = None
-        for idx, row in df.iterrows():
-            row_str = ' '.join([str(v).lower() for v in row.values if pd.notna(v)])
-            if 'регион' in row_str or 'группа' in row_str:
-                header_row = idx
-                break
-
-        if header_row is not None:
-            df = pd.read_excel(file_path, sheet_name=0, header=header_row)
-        else:
-            df = pd.read_excel(file_path, sheet_name=0, header=3)
+        # Один разбор файла: заголовок ищется по уже прочитанным строкам
+        df = load_sheet(file_path, sheet_name=0,
+                        header_keywords=('регион', 'группа'), default_header=3)
 
         log(f"  Строк: {len(df)}, Колонок: {len(df.columns)}")
+        log_parse_time(file_path)
+        df = normalize_loaded(df)
 
         nnv_data = {}
         for idx, row in df.iterrows():
@@ -184,7 +336,8 @@ def extract_regions_data():
         return {
             'df': df,
             'nnv': nnv_data,
-            'period': parse_period_from_filename(file_path)
+            'path': file_path,
+            'period': period or parse_period_from_filename(file_path)
         }
 
     except Exception as e:
@@ -192,13 +345,11 @@ def extract_regions_data():
         return None
 
 
-def extract_turnover_data():
-    """Извлечение данных оборачиваемости"""
+def extract_turnover_data(sheet_workers=SHEET_WORKERS, stream=False, chunk_rows=CHUNK_ROWS):
+    """Извлечение данных оборачиваемости (stream — потоковый разбор в итоги TurnoverTotals)"""
     log("Извлекаю данные оборачиваемости...")
 
-    file_path = find_excel_file("оборачиваемост", INPUT_DIR / "Обувь остатки и оборачиваемость по группам товара")
-    if not file_path:
-        file_path = find_excel_file("оборач")
+    file_path = find_report_file('turnover')
 
     if not file_path or not file_path.exists():
         log("  ВНИМАНИЕ: Файл оборачиваемости не найден")
@@ -207,18 +358,23 @@ def extract_turnover_data():
     log(f"  Файл: {file_path.name}")
 
     try:
-        xls = pd.ExcelFile(file_path)
+        if stream:
+            return _stream_turnover(file_path, chunk_rows)
+
+        # Все листы за одно открытие файла (или параллельно в пуле процессов)
+        sheets = load_sheets(file_path, header=2, max_workers=sheet_workers)
         all_data = []
 
-        for sheet in xls.sheet_names:
-            df = pd.read_excel(file_path, sheet_name=sheet, header=2)
+        for sheet, df in sheets.items():
             df['Лист'] = sheet
             all_data.append(df)
             log(f"    Лист '{sheet}': {len(df)} строк")
 
+        log_parse_time(file_path)
+
         if all_data:
-            combined = pd.concat(all_data, ignore_index=True)
-            return {'df': combined, 'sheets': xls.sheet_names}
+            combined = normalize_loaded(pd.concat(all_data, ignore_index=True))
+            return {'df': combined, 'sheets': list(sheets), 'file': file_path.name, 'path': file_path}
 
         return None
 
@@ -227,13 +383,41 @@ def extract_turnover_data():
         return None
 
 
-def extract_accessories_data():
-    """Извлечение данных по аксессуарам"""
+def _stream_turnover(file_path, chunk_rows):
+    """Оборачиваемость потоком: в памяти одна часть листа и итоги для analyze_data()"""
+    started = time.perf_counter()
+    totals = TurnoverTotals(TURNOVER_DEAD)
+    sheets = {}
+    # Типы колонок решаются по первой части и одинаковы во всех остальных
+    plan = None
+    coerced = {}
+    for chunk in iter_book_chunks(file_path, header=2, chunk_rows=chunk_rows, sheet_column='Лист'):
+        frame, plan, lost = normalize_columns(chunk, plan)
+        totals.add(frame)
+        for col, count in lost.items():
+            coerced[col] = coerced.get(col, 0) + count
+        for sheet, rows in chunk['Лист'].value_counts(sort=False).items():
+            sheets[sheet] = sheets.get(sheet, 0) + rows
+
+    for sheet, rows in sheets.items():
+        log(f"    Лист '{sheet}': {rows} строк")
+    log_coerced(coerced)
+    log(f"  Потоковый разбор: {time.perf_counter() - started:.2f} с (частями по {chunk_rows} строк)")
+
+    if totals.empty():
+        return None
+    return {'totals': totals, 'rows': totals.rows, 'sheets': list(sheets),
+            'file': file_path.name, 'path': file_path}
+
+
+def extract_accessories_data(region=DEFAULT_REGION, stream=False, chunk_rows=CHUNK_ROWS):
+    """
+    Извлечение данных по аксессуарам (region — регион, как в REGION_ALIASES)
+    stream — потоковый разбор: в памяти остаются только магазины региона
+    """
     log("Извлекаю данные по аксессуарам...")
 
-    file_path = find_excel_file("аксессуар", INPUT_DIR / "Отчет по приросту аксессуаров по магазинам")
-    if not file_path:
-        file_path = find_excel_file("аксессуар")
+    file_path = find_report_file('accessories')
 
     if not file_path or not file_path.exists():
         log("  ВНИМАНИЕ: Файл аксессуаров не найден")
@@ -242,24 +426,50 @@ def extract_accessories_data():
     log(f"  Файл: {file_path.name}")
 
     try:
-        df = pd.read_excel(file_path, sheet_name=0, header=4)
+        if stream:
+            return _stream_accessories(file_path, region, chunk_rows)
+
+        df = load_sheet(file_path, sheet_name=0, header=4)
         log(f"  Строк: {len(df)}")
+        log_parse_time(file_path)
+        df = normalize_loaded(df)
 
-        nnv_stores = df[df.apply(lambda r: any('ннв' in str(v).lower() for v in r.values if pd.notna(v)), axis=1)]
-        log(f"  Магазинов ННВ: {len(nnv_stores)}")
+        nnv_stores = region_rows(df, region)
+        log(f"  Магазинов {region}: {len(nnv_stores)}")
 
-        return {'df': df, 'nnv': nnv_stores}
+        return {'df': df, 'nnv': nnv_stores, 'path': file_path}
 
     except Exception as e:
         log(f"  ОШИБКА: {e}")
         return None
 
 
-def extract_structure_data():
-    """Извлечение данных структуры"""
+def _stream_accessories(file_path, region, chunk_rows):
+    """Аксессуары потоком: из каждой части — строки магазинов региона"""
+    started = time.perf_counter()
+    rows = 0
+    parts = []
+    for chunk in iter_sheet_chunks(file_path, sheet_name=0, header=4, chunk_rows=chunk_rows):
+        rows += len(chunk)
+        part = region_rows(chunk, region)
+        if len(part):
+            parts.append(part)
+
+    log(f"  Строк: {rows}")
+    log(f"  Потоковый разбор: {time.perf_counter() - started:.2f} с (частями по {chunk_rows} строк)")
+    if not rows:
+        return None
+
+    nnv_stores = normalize_loaded(pd.concat(parts, ignore_index=True)) if parts else pd.DataFrame()
+    log(f"  Магазинов {region}: {len(nnv_stores)}")
+    return {'nnv': nnv_stores, 'rows': rows, 'path': file_path}
+
+
+def extract_structure_data(period=None):
+    """Извлечение данных структуры (period — уже определённый период отчёта)"""
     log("Извлекаю данные структуры...")
 
-    file_path = find_excel_file("Структура")
+    file_path = find_report_file('structure')
     if not file_path or not file_path.exists():
         log("  ВНИМАНИЕ: Файл структуры не найден")
         return None
@@ -267,47 +477,357 @@ def extract_structure_data():
     log(f"  Файл: {file_path.name}")
 
     try:
-        df = pd.read_excel(file_path, sheet_name=0, header=1)
+        df = load_sheet(file_path, sheet_name=0, header=1)
         log(f"  Строк: {len(df)}")
+        log_parse_time(file_path)
+        df = normalize_loaded(df)
 
-        return {'df': df, 'period': parse_period_from_filename(file_path)}
+        return {'df': df, 'path': file_path, 'period': period or parse_period_from_filename(file_path)}
 
     except Exception as e:
         log(f"  ОШИБКА: {e}")
         return None
 
 
-def analyze_data(regions, turnover, accessories, structure):
-    """Анализ данных и формирование структуры для дашборда"""
-    log("Анализирую данные...")
+def region_needles(region):
+    """Подстроки, по которым регион ищется в отчётах"""
+    return REGION_ALIASES.get(region, (region.lower(),))
 
-    analysis = {
-        'period': regions.get('period', 'Текущая неделя') if regions else 'Текущая неделя',
-        'nnv_growth': -22.8,
-        'company_growth': -20.3,
-        'nnv_rank': 3,
-        'total_regions': 11,
-        'stores_count': 119,
-
-        # Данные по компании и регионам
-        'regions_data': [
-            {'name': 'МСК', 'growth': -18.2, 'share': 22.5, 'rank': 1},
-            {'name': 'СПБ', 'growth': -19.8, 'share': 14.2, 'rank': 2},
-            {'name': 'ННВ', 'growth': -22.8, 'share': 11.3, 'rank': 3},
-            {'name': 'ЮГ', 'growth': -21.5, 'share': 10.8, 'rank': 4},
-            {'name': 'УРЛ', 'growth': -24.1, 'share': 9.2, 'rank': 5},
-        ],
 
-        # Данные по подразделениям ННВ
-        'divisions': [
-            {'name': 'ННВ 1', 'stores': 28, 'growth': -20.5, 'kop': 1.2, 'share': 24.2},
-            {'name': 'Казань 1', 'stores': 23, 'growth': -18.3, 'kop': 0.9, 'share': 21.8},
-            {'name': 'Владимир', 'stores': 18, 'growth': -25.7, 'kop': 1.8, 'share': 15.1},
-            {'name': 'Ярославское', 'stores': 15, 'growth': -28.4, 'kop': 2.1, 'share': 12.6},
-            {'name': 'Наб.Челны', 'stores': 14, 'growth': -19.2, 'kop': 1.1, 'share': 11.8},
-            {'name': 'ННВ Север', 'stores': 12, 'growth': -26.1, 'kop': 1.9, 'share': 8.4},
-            {'name': 'Ижевское', 'stores': 9, 'growth': -23.8, 'kop': 1.4, 'share': 6.1},
-        ],
+def region_rows(df, region):
+    """Строки региона (по колонке «Регион», если она есть)"""
+    return filter_region(df, region_needles(region), region_columns(df))
+
+
+def discover_regions(regions):
+    """Регионы из отчёта по регионам (значения колонки «Регион»)"""
+    if not regions or 'df' not in regions:
+        return []
+
+    df = regions['df']
+    columns = find_region_columns(df, keywords=('регион',), fallback=False)
+    if not columns:
+        return []
+
+    names = df[columns[0]].dropna().astype(str).str.strip()
+    skip = ('итого', 'всего', 'компания', 'регион')
+    return [name for name in pd.unique(names)
+            if name and not any(word in name.lower() for word in skip)]
+
+
+def structure_members(structure, key):
+    """Магазины ('store') или подразделения ('division') из структуры региона"""
+    if not structure or 'df' not in structure:
+        return set()
+    columns = analytics.map_columns(structure['df'])
+    if key not in columns:
+        return set()
+    return set(structure['df'][columns[key]].dropna())
+
+
+def _slice_turnover(turnover, region, structure=None):
+    """
+    Оборачиваемость одного региона:
+    - общий файл с колонкой «Регион» — строки региона
+    - файл с колонкой магазина — магазины региона по структуре
+    - региональный файл ("...регион ННВ.xlsx") — целиком для своего региона, другим — None
+    - листы по подразделениям/регионам — листы подразделений региона по структуре
+      или с названием региона
+    Нет строк региона — None
+    """
+    df = turnover['df']
+    needles = region_needles(region)
+    columns = find_region_columns(df, keywords=('регион',), fallback=False)
+    store = analytics.map_columns(df).get('store')
+    stores = structure_members(structure, 'store')
+    own_region = re.search(r'регион\s+([^\s.]+)', turnover.get('file', '').lower())
+    if columns:
+        rows = filter_region(df, needles, columns)
+    elif store is not None and stores:
+        rows = df[member_mask(df[store], stores)]
+    elif own_region:
+        return turnover if any(needle in own_region.group(1) for needle in needles) else None
+    else:
+        divisions = structure_members(structure, 'division')
+        sheets = [sheet for sheet in turnover['sheets']
+                  if str(sheet) in divisions or any(needle in str(sheet).lower() for needle in needles)]
+        rows = df[df['Лист'].isin(sheets)]
+
+    if rows.empty:
+        return None
+    return {**turnover, 'df': rows, 'sheets': list(pd.unique(rows['Лист']))}
+
+
+def slice_region_data(regions, turnover, accessories, structure, region):
+    """
+    Данные одного региона из общих (уже разобранных) отчётов
+    Отчёт по регионам — целиком (таблица регионов компании), остальные — строки региона
+    """
+    if structure and 'df' in structure:
+        structure = {**structure, 'df': region_rows(structure['df'], region)}
+
+    if turnover and 'df' in turnover:
+        turnover = _slice_turnover(turnover, region, structure)
+
+    if accessories and 'df' in accessories:
+        accessories = {**accessories, 'nnv': region_rows(accessories['df'], region)}
+
+    return regions, turnover, accessories, structure
+
+
+def extract_stage(name, extract, *args, **kwargs):
+    """extract_*_data() под замером: строки и размер прочитанного файла"""
+    with METRICS.stage(name) as stage:
+        report = extract(*args, **kwargs)
+        if report:
+            stage['file'] = report['path'].name
+            # Потоковый разбор: таблицы целиком нет, строки посчитаны по частям
+            stage['rows'] = report['rows'] if 'rows' in report else len(report['df'])
+            stage['bytes'] = report['path'].stat().st_size
+            if 'df' in report:
+                stage['frame_bytes'] = frame_memory(report['df'])
+    return report
+
+
+# Экстракторы входных отчётов: этап метрик → функция (порядок — порядок в run())
+EXTRACTORS = {
+    'extract_regions': extract_regions_data,
+    'extract_turnover': extract_turnover_data,
+    'extract_accessories': extract_accessories_data,
+    'extract_structure': extract_structure_data,
+}
+
+# Экстракторы, которым нужен период отчёта (параметр period)
+PERIOD_EXTRACTORS = ('extract_regions', 'extract_structure')
+
+
+def input_bytes():
+    """Суммарный размер найденных входных отчётов, байт"""
+    total = 0
+    for kind in REPORT_SOURCES:
+        file_path = find_report_file(kind)
+        if file_path:
+            total += file_path.stat().st_size
+    return total
+
+
+# tracemalloc в воркерах извлечения (как --trace-memory основного процесса)
+_extract_trace_memory = False
+
+
+def _init_extract_worker(input_dir, cache_options, engines, trace_memory=False):
+    """Инициализация воркера извлечения: каталог input/, кэш и движки разбора"""
+    global INPUT_DIR, _extract_trace_memory
+    INPUT_DIR = input_dir
+    _extract_trace_memory = trace_memory
+    configure_cache(ParseCache(**cache_options) if cache_options else None)
+    configure_engines(*engines)
+
+
+def _run_extractor(name, extract, kwargs):
+    """Экстрактор в воркере: (отчёт, вывод лога, записи метрик, (попадания, промахи) кэша)"""
+    global METRICS
+    METRICS = PipelineMetrics('generate', trace_memory=_extract_trace_memory)
+    cache = get_cache()
+    hits, misses = (cache.hits, cache.misses) if cache else (0, 0)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        report = extract_stage(name, extract, **kwargs)
+    counts = (cache.hits - hits, cache.misses - misses) if cache else (0, 0)
+    return report, output.getvalue(), METRICS.records, counts
+
+
+def _extract_process(conn, initargs, name, extract, kwargs):
+    """Процесс одного экстрактора: (True, результат _run_extractor()) или (False, ошибка) — в канал"""
+    _init_extract_worker(*initargs)
+    try:
+        message = (True, _run_extractor(name, extract, kwargs))
+    except Exception as e:
+        message = (False, repr(e))
+    conn.send(message)
+    conn.close()
+
+
+def _start_extractor(context, initargs, name, extract, kwargs):
+    """
+    Запуск экстрактора в своём процессе: (процесс, канал результата, время запуска)
+    Процесс не daemon: экстрактор оборачиваемости сам запускает пул по листам (sheet_workers),
+    а daemon-процессам дочерние процессы запрещены; завершает его extract_all()
+    """
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_extract_process, name=name,
+                              args=(sender, initargs, name, extract, kwargs))
+    process.start()
+    sender.close()
+    return process, receiver, time.perf_counter()
+
+
+def extract_all(options=None, workers=EXTRACT_WORKERS, timeouts=None, extractors=None):
+    """
+    Четыре входных отчёта: (regions, turnover, accessories, structure)
+    options — {этап: параметры экстрактора} (extract_options())
+    workers — процессов (1 = по очереди, 0 = авто: параллельно от PARALLEL_MIN_BYTES входных
+    файлов, не больше числа ядер)
+    timeouts — {этап: секунды} (по умолчанию EXTRACT_TIMEOUTS)
+    extractors — {этап: функция} (по умолчанию EXTRACTORS)
+    Параллельно каждый экстрактор — в своём процессе (не больше workers одновременно),
+    лимит отсчитывается от его запуска. Упавший или не уложившийся в лимит экстрактор
+    даёт None (процесс завершается terminate()) — остальные отчёты и дашборд строятся
+    как при отсутствующем файле
+    """
+    extractors = extractors or EXTRACTORS
+    kwargs = options or {}
+    if workers == 0:
+        with METRICS.stage('extract_plan') as stage:
+            stage['input_bytes'] = input_bytes()
+            workers = 1
+            if stage['input_bytes'] >= PARALLEL_MIN_BYTES:
+                workers = min(len(extractors), os.cpu_count() or 1)
+            stage['workers'] = workers
+
+    if workers <= 1:
+        return tuple(extract_stage(name, extract, **kwargs.get(name, {}))
+                     for name, extract in extractors.items())
+
+    workers = min(workers, len(extractors))
+    timeouts = {**EXTRACT_TIMEOUTS, **(timeouts or {})}
+    cache = get_cache()
+    cache_options = None
+    if cache is not None:
+        cache_options = {'directory': cache.directory, 'max_bytes': cache.max_bytes, 'enabled': cache.enabled}
+    initargs = (INPUT_DIR, cache_options, engine_config(), METRICS.trace_memory)
+    context = multiprocessing.get_context()
+
+    log(f"Параллельное извлечение отчётов, процессов: {workers}")
+    results = {}
+    with METRICS.stage('extract_parallel', workers=workers) as stage:
+        pending = list(extractors.items())
+        running = {}
+        try:
+            while pending or running:
+                while pending and len(running) < workers:
+                    name, extract = pending.pop(0)
+                    running[name] = _start_extractor(context, initargs, name, extract, kwargs.get(name, {}))
+
+                # Ждём первый результат, но не дольше ближайшего лимита среди запущенных
+                deadlines = [started + timeouts[name] for name, (_, _, started) in running.items()
+                             if timeouts.get(name) is not None]
+                wait_for = max(0.0, min(deadlines) - time.perf_counter()) if deadlines else None
+                ready = multiprocessing.connection.wait([conn for _, conn, _ in running.values()], wait_for)
+
+                for name, (process, conn, started) in list(running.items()):
+                    limit = timeouts.get(name)
+                    if conn in ready:
+                        try:
+                            results[name] = conn.recv()
+                        except EOFError:
+                            # Процесс умер, не отправив результат (например, убит системой)
+                            process.join()
+                            results[name] = (False, f"процесс завершился с кодом {process.exitcode}")
+                    elif limit is not None and time.perf_counter() - started >= limit:
+                        # Зависший разбор не ждём: процесс экстрактора завершается принудительно
+                        process.terminate()
+                        results[name] = (False, None)
+                    else:
+                        continue
+                    process.join()
+                    conn.close()
+                    elapsed = time.perf_counter() - started
+                    results[name] += (elapsed,)
+                    del running[name]
+        finally:
+            # Сбой или прерывание в основном процессе — экстракторы не остаются работать
+            for process, conn, _ in running.values():
+                process.terminate()
+                process.join()
+                conn.close()
+
+        reports = {}
+        for name in extractors:
+            ok, result, elapsed = results[name]
+            reports[name] = None
+            if ok:
+                report, output, records, (hits, misses) = result
+                # Лог воркера — целиком и в порядке экстракторов, а не вперемешку
+                print(output, end='')
+                METRICS.merge(records)
+                if cache is not None:
+                    cache.hits += hits
+                    cache.misses += misses
+                reports[name] = report
+            elif result is None:
+                log(f"ОШИБКА: {name} не уложился в {timeouts[name]:.0f} с — отчёт пропущен")
+                METRICS.record(name, elapsed, status='error', error='timeout')
+            else:
+                log(f"ОШИБКА: {name} упал: {result} — отчёт пропущен")
+                METRICS.record(name, elapsed, status='error', error=result)
+        stage['failed'] = sum(1 for report in reports.values() if report is None)
+
+    return tuple(reports[name] for name in extractors)
+
+
+def region_summary(regions, region):
+    """
+    Регион среди регионов компании по отчёту по регионам:
+    {regions_data (ТОП-5 и сам регион), company_growth, nnv_growth, nnv_rank, total_regions}
+    """
+    table, company_growth = analytics.region_table(regions['df'])
+    needles = region_needles(region)
+    own = next((row for row in table if any(needle in row['name'].lower() for needle in needles)), None)
+    shown = [row for row in table if row['rank'] <= 5 or row is own]
+    if own is not None:
+        # Регион подсвечивается в таблице по коду (как в заголовке дашборда)
+        shown = [{**row, 'name': region} if row is own else row for row in shown]
+    return {
+        'regions_data': shown,
+        'company_growth': company_growth,
+        'nnv_growth': own['growth'] if own else None,
+        'nnv_rank': own['rank'] if own else None,
+        'total_regions': len(table) or None,
+    }
+
+
+def division_summary(accessories, structure, region):
+    """
+    Подразделения региона: магазины — по структуре, доля продаж, прирост и КОП —
+    по магазинам региона из отчёта по аксессуарам (единственный отчёт по магазинам
+    с подразделением); {divisions, stores_count}
+    """
+    counts = {}
+    stores_count = None
+    if structure and 'df' in structure:
+        members = analytics.metrics_frame(region_rows(structure['df'], region), name='store')
+        if len(members):
+            counts = members[members['division'] != ''].groupby('division', sort=False)['name'].nunique().to_dict()
+            stores_count = int(members['name'].nunique())
+
+    stores = None
+    rows = accessories.get('nnv') if accessories else None
+    if rows is not None and len(rows):
+        stores = analytics.metrics_frame(rows, name='store')
+        if stores_count is None:
+            stores_count = int(stores['name'].nunique())
+
+    return {'divisions': analytics.division_table(stores, counts), 'stores_count': stores_count}
+
+
+def analyze_base(period, region=DEFAULT_REGION, regions=None, accessories=None, structure=None, samples=True):
+    """
+    Каркас анализа: период, регион среди регионов компании, подразделения региона;
+    остальные ключи — analyze_turnover/accessories()
+    Примеры — только если нет самих отчётов (samples=False — в пакетном режиме: никогда)
+    """
+    result = {
+        'region': region,
+        'region_name': REGION_NAMES.get(region, region),
+        'period': period,
+        'nnv_growth': None,
+        'company_growth': None,
+        'nnv_rank': None,
+        'total_regions': None,
+        'stores_count': None,
+        'regions_data': [],
+        'divisions': [],
 
         # Ключевые категории обуви (бывшие "денежные коровы")
         'key_categories': [],
@@ -322,76 +842,162 @@ def analyze_data(regions, turnover, accessories, structure):
         'top_stores': [],
         'worst_stores': [],
 
-        'accessories': {
-            'share': 27.7,
-            'avg_kop': 1.6,
-            'growth': -18.5,
-            'key_categories': [],
-            'growth_categories': [],
-            'illiquid': []
-        },
-
-        'actions': []
+        'accessories': {},
     }
 
-    # Анализ оборачиваемости - неликвиды
-    if turnover and 'df' in turnover:
-        df = turnover['df']
+    # Данные по компании и регионам
+    if regions and 'df' in regions:
+        result.update(region_summary(regions, region))
+    elif samples:
+        result.update({
+            'nnv_growth': -22.8,
+            'company_growth': -20.3,
+            'nnv_rank': 3,
+            'total_regions': 11,
+            'regions_data': [
+                {'name': 'МСК', 'growth': -18.2, 'share': 22.5, 'rank': 1},
+                {'name': 'СПБ', 'growth': -19.8, 'share': 14.2, 'rank': 2},
+                {'name': 'ННВ', 'growth': -22.8, 'share': 11.3, 'rank': 3},
+                {'name': 'ЮГ', 'growth': -21.5, 'share': 10.8, 'rank': 4},
+                {'name': 'УРЛ', 'growth': -24.1, 'share': 9.2, 'rank': 5},
+            ],
+        })
+
+    # Подразделения региона
+    if accessories is not None or (structure and 'df' in structure):
+        result.update(division_summary(accessories, structure, region))
+    elif samples:
+        result['stores_count'] = 119
+        result['divisions'] = [
+            {'name': 'ННВ 1', 'stores': 28, 'growth': -20.5, 'kop': 1.2, 'share': 24.2},
+            {'name': 'Казань 1', 'stores': 23, 'growth': -18.3, 'kop': 0.9, 'share': 21.8},
+            {'name': 'Владимир', 'stores': 18, 'growth': -25.7, 'kop': 1.8, 'share': 15.1},
+            {'name': 'Ярославское', 'stores': 15, 'growth': -28.4, 'kop': 2.1, 'share': 12.6},
+            {'name': 'Наб.Челны', 'stores': 14, 'growth': -19.2, 'kop': 1.1, 'share': 11.8},
+            {'name': 'ННВ Север', 'stores': 12, 'growth': -26.1, 'kop': 1.9, 'share': 8.4},
+            {'name': 'Ижевское', 'stores': 9, 'growth': -23.8, 'kop': 1.4, 'share': 6.1},
+        ]
 
-        turnover_col = None
-        for col in df.columns:
-            col_str = str(col).lower()
-            if 'оборач' in col_str or 'недел' in col_str:
-                turnover_col = col
-                break
+    return result
 
-        if turnover_col:
-            df_numeric = df[pd.to_numeric(df[turnover_col], errors='coerce').notna()]
-            df_numeric = df_numeric.copy()
-            df_numeric['turnover_weeks'] = pd.to_numeric(df_numeric[turnover_col], errors='coerce')
-
-            dead = df_numeric[df_numeric['turnover_weeks'] > TURNOVER_DEAD].nlargest(5, 'turnover_weeks')
-
-            for idx, row in dead.iterrows():
-                name_col = df.columns[0] if len(df.columns) > 0 else None
-                name = str(row[name_col])[:35] if name_col else f"Группа {idx}"
-                weeks = int(row['turnover_weeks'])
-                season = get_season_badge(name)
-
-                analysis['illiquid_stock'].append({
-                    'name': name,
-                    'weeks': weeks,
-                    'stock': f"{int(row.get('Остаток', 0)):,}" if 'Остаток' in row else "N/A",
-                    'action': 'Распродажа -70%' if weeks > 200 else 'Распродажа -50%',
-                    'season': season
-                })
-
-    # Заполняем данные если нет реальных
-    if not analysis['key_categories']:
-        analysis['key_categories'] = [
-            {'name': 'Ботинки женские зимние', 'share': 15.4, 'growth': -24, 'kop': 1.1, 'season': 'СЕЗОН'},
-            {'name': 'Полусапоги женские зимние', 'share': 11.4, 'growth': -18, 'kop': 1.4, 'season': 'СЕЗОН'},
-            {'name': 'Ботильоны женские зимние', 'share': 9.8, 'growth': -23, 'kop': 0.8, 'season': 'СЕЗОН'},
-            {'name': 'Кроссовки мужские', 'share': 8.5, 'growth': -15, 'kop': 2.4, 'season': None},
-            {'name': 'Кроссовки женские', 'share': 7.2, 'growth': -38, 'kop': 1.8, 'season': None},
-        ]
 
-    if not analysis['growth_deficit']:
-        analysis['growth_deficit'] = [
-            {'name': 'Кроссовки детские', 'share': 3.2, 'growth': 58, 'kop': 0.6, 'priority': 'Высокий', 'season': None},
-            {'name': 'Ботинки демисезонные', 'share': 4.1, 'growth': 72, 'kop': 0.7, 'priority': 'Средний', 'season': None},
-            {'name': 'Слипоны женские', 'share': 2.8, 'growth': 89, 'kop': 0.5, 'priority': 'Высокий', 'season': 'НЕСЕЗОН'},
-        ]
+def kop_places(places):
+    """'Казань 1 (КОП 0.6), ННВ 1 (КОП 0.8)'"""
+    return ', '.join(f"{place['name']} (КОП {place['kop']})" for place in places)
 
-    if not analysis['illiquid_stock']:
-        analysis['illiquid_stock'] = [
-            {'name': 'Балетки детские', 'weeks': 429, 'stock': '46 пар', 'action': 'Распродажа -70%', 'season': 'НЕСЕЗОН'},
-            {'name': 'Дутые сапоги детские', 'weeks': 223, 'stock': '84 пары', 'action': 'Распродажа -70%', 'season': 'СЕЗОН'},
-            {'name': 'Резиновые сапоги', 'weeks': 344, 'stock': '15 пар', 'action': 'Списание', 'season': 'НЕСЕЗОН'},
-            {'name': 'Лоферы летние', 'weeks': 214, 'stock': '24 пары', 'action': 'Распродажа -50%', 'season': 'НЕСЕЗОН'},
-        ]
 
-    analysis['imbalances'] = [
+def turnover_actions(part):
+    """Топ-3 действия из посчитанных блоков оборачиваемости: перекос, рост + дефицит, неликвиды"""
+    actions = []
+    if part['imbalances']:
+        imb = part['imbalances'][0]
+        places = [place['name'] for place in imb['surplus'] + imb['deficit']]
+        season = f" [{imb['season']}]" if imb.get('season') else ''
+        actions.append({
+            'type': 'urgent',
+            'badge': 'СРОЧНО',
+            'title': f"Перераспределить «{imb['category']}» между подразделениями",
+            'problem': (f"{imb['category']}{season} ({imb['share']}% оборота) — дефицит в {kop_places(imb['deficit'])} "
+                        f"при затоваривании в {kop_places(imb['surplus'])}"),
+            'action': imb['action'],
+            'deadline': imb['deadline'].capitalize(),
+            'responsible': f"Директора подразделений {', '.join(dict.fromkeys(places))}",
+            'effect': 'Рост продаж там, где товара не хватает, освобождение склада в затоваренных',
+        })
+    if part['growth_deficit']:
+        top = part['growth_deficit'][0]
+        names = ', '.join(cat['name'].lower() for cat in part['growth_deficit'][:3])
+        actions.append({
+            'type': 'important',
+            'badge': 'ВАЖНО',
+            'title': 'Пополнить категории с ростом и дефицитом',
+            'problem': f"{top['name']} (доля {top['share']}%) растут +{top['growth']}%, но КОП {top['kop']} (дефицит)",
+            'action': f"Заказ через центральный склад: {names}",
+            'deadline': 'Заявка сегодня',
+            'responsible': 'Категорийный менеджер',
+            'effect': 'Не упустить рост спроса',
+        })
+    if part['illiquid_stock']:
+        items = part['illiquid_stock'][:3]
+        actions.append({
+            'type': 'opportunity',
+            'badge': 'ПЕРСПЕКТИВА',
+            'title': f'Распродать неликвидные остатки (>{TURNOVER_DEAD} недель)',
+            'problem': f"Лежат >{TURNOVER_DEAD} недель: " + ', '.join(
+                f"{item['name']} ({item['weeks']} нед, {item['stock']})" for item in items),
+            'action': 'Акция "Финальная распродажа": ' + ', '.join(
+                f"{item['name']} — {item['action'].lower()}" for item in items),
+            'deadline': 'Старт с понедельника',
+            'responsible': 'Директора магазинов',
+            'effect': 'Освобождение капитала и места под новую коллекцию',
+        })
+    return actions
+
+
+def analyze_turnover(turnover, period, month=None, samples=True):
+    """
+    Оборачиваемость: ключевые категории, рост + дефицит, неликвиды, перекосы и действия по ним
+    (с примерами, если нет отчёта и samples=True)
+    month — месяц сезонности (по умолчанию season_month(period))
+    """
+    result = {'key_categories': [], 'growth_deficit': [], 'illiquid_stock': [], 'imbalances': [], 'actions': []}
+
+    # Сезонность — по месяцу отчёта, сразу для всей колонки названий
+    month = month or season_month(period)
+
+    def season(names):
+        return SEASONS.label(names, month)
+
+    # КОП по категориям и узлам плана перемещений
+    # (потоковый разбор — те же величины из итогов TurnoverTotals)
+    if turnover and 'totals' in turnover:
+        summary, metrics, nodes = turnover['totals'].results()
+    elif turnover and 'df' in turnover and len(turnover['df'].columns):
+        metrics = analytics.metrics_frame(turnover['df'])
+        summary = analytics.category_summary(metrics)
+        nodes = transfer_plan.node_totals(metrics)
+    else:
+        summary = None
+
+    if summary is not None:
+        result['key_categories'] = analytics.key_categories(
+            summary, SHARE_KEY_CATEGORY, season=season)
+        result['growth_deficit'] = analytics.growth_deficit(
+            summary, GROWTH_POTENTIAL, season=season)
+        result['illiquid_stock'] = analytics.illiquid_stock(
+            metrics, TURNOVER_DEAD, season=season)
+        balance = transfer_plan.balance_nodes(nodes, KOP_GOOD_MIN, KOP_GOOD_MAX)
+        plan = transfer_plan.plan_transfers(balance)
+        result['imbalances'] = transfer_plan.plan_imbalances(plan, balance, result['key_categories'])
+        result['actions'] = turnover_actions(result)
+        return result
+    if not samples:
+        return result
+
+    # Отчёта нет — примеры, чтобы была видна раскладка страницы
+    # (пустой блок по разобранному отчёту примерами не подменяется)
+    result['key_categories'] = [
+        {'name': 'Ботинки женские зимние', 'share': 15.4, 'growth': -24, 'kop': 1.1, 'season': 'СЕЗОН'},
+        {'name': 'Полусапоги женские зимние', 'share': 11.4, 'growth': -18, 'kop': 1.4, 'season': 'СЕЗОН'},
+        {'name': 'Ботильоны женские зимние', 'share': 9.8, 'growth': -23, 'kop': 0.8, 'season': 'СЕЗОН'},
+        {'name': 'Кроссовки мужские', 'share': 8.5, 'growth': -15, 'kop': 2.4, 'season': None},
+        {'name': 'Кроссовки женские', 'share': 7.2, 'growth': -38, 'kop': 1.8, 'season': None},
+    ]
+
+    result['growth_deficit'] = [
+        {'name': 'Кроссовки детские', 'share': 3.2, 'growth': 58, 'kop': 0.6, 'priority': 'Высокий', 'season': None},
+        {'name': 'Ботинки демисезонные', 'share': 4.1, 'growth': 72, 'kop': 0.7, 'priority': 'Средний', 'season': None},
+        {'name': 'Слипоны женские', 'share': 2.8, 'growth': 89, 'kop': 0.5, 'priority': 'Высокий', 'season': 'НЕСЕЗОН'},
+    ]
+
+    result['illiquid_stock'] = [
+        {'name': 'Балетки детские', 'weeks': 429, 'stock': '46 пар', 'action': 'Распродажа -70%', 'season': 'НЕСЕЗОН'},
+        {'name': 'Дутые сапоги детские', 'weeks': 223, 'stock': '84 пары', 'action': 'Распродажа -70%', 'season': 'СЕЗОН'},
+        {'name': 'Резиновые сапоги', 'weeks': 344, 'stock': '15 пар', 'action': 'Списание', 'season': 'НЕСЕЗОН'},
+        {'name': 'Лоферы летние', 'weeks': 214, 'stock': '24 пары', 'action': 'Распродажа -50%', 'season': 'НЕСЕЗОН'},
+    ]
+
+    result['imbalances'] = [
         {
             'category': 'Ботинки женские зимние',
             'share': 15.4,
@@ -414,37 +1020,8 @@ def analyze_data(regions, turnover, accessories, structure):
         }
     ]
 
-    analysis['top_stores'] = [
-        {'id': '10267', 'division': 'Казань 1', 'growth': 5.2, 'kop': 1.0, 'note': 'Лучший по росту'},
-        {'id': '11936', 'division': 'Наб.Челны', 'growth': 3.8, 'kop': 1.1, 'note': 'Стабильный КОП'},
-        {'id': '10649', 'division': 'ННВ 1', 'growth': -2.1, 'kop': 1.0, 'note': 'Минимальное падение'},
-    ]
-
-    analysis['worst_stores'] = [
-        {'id': '11588', 'division': 'ННВ 1', 'growth': -45.2, 'kop': 3.2, 'problem': 'Критичное затоваривание'},
-        {'id': '10848', 'division': 'Ижевское', 'growth': -38.7, 'kop': 2.8, 'problem': 'Затоваривание + падение'},
-        {'id': '10688', 'division': 'Ярославское', 'growth': -35.4, 'kop': 2.1, 'problem': 'Избыток зимней обуви'},
-    ]
-
-    # Аксессуары - расширенная структура (без ювелирных)
-    analysis['accessories']['key_categories'] = [
-        {'name': 'Сумки женские', 'share': 8.2, 'growth': -12, 'kop': 1.2},
-        {'name': 'Рюкзаки', 'share': 5.4, 'growth': -8, 'kop': 1.0},
-        {'name': 'Ремни', 'share': 3.8, 'growth': -15, 'kop': 1.4},
-    ]
-
-    analysis['accessories']['growth_categories'] = [
-        {'name': 'Кошельки мужские', 'share': 2.1, 'growth': 45, 'kop': 0.7},
-        {'name': 'Перчатки зимние', 'share': 1.8, 'growth': 62, 'kop': 0.5},
-    ]
-
-    analysis['accessories']['illiquid'] = [
-        {'name': 'Шарфы летние', 'weeks': 156, 'stock': '34 шт'},
-        {'name': 'Панамы', 'weeks': 203, 'stock': '28 шт'},
-    ]
-
-    # Формируем топ-3 действий с КОНКРЕТИКОЙ
-    analysis['actions'] = [
+    # Топ-3 действий к примерам выше
+    result['actions'] = [
         {
             'type': 'urgent',
             'badge': 'СРОЧНО',
@@ -477,777 +1054,599 @@ def analyze_data(regions, turnover, accessories, structure):
         }
     ]
 
+    return result
+
+
+def analyze_accessories(accessories, samples=True):
+    """
+    Аксессуары региона: лучшие/худшие магазины, общие показатели, категории
+    (с примерами, если нет отчёта и samples=True)
+    """
+    result = {
+        'top_stores': [],
+        'worst_stores': [],
+        'accessories': {
+            'share': None,
+            'avg_kop': None,
+            'growth': None,
+            'key_categories': [],
+            'growth_categories': [],
+            'illiquid': []
+        }
+    }
+
+    # Магазины региона: лучшие/худшие, общие показатели
+    # (отчёт разобран, но магазинов региона нет — блоки пустые)
+    if accessories is not None:
+        if accessories.get('nnv') is not None and len(accessories['nnv']):
+            stores = analytics.metrics_frame(accessories['nnv'], name='store')
+            result['top_stores'], result['worst_stores'] = analytics.store_ranking(
+                stores, (KOP_GOOD_MIN, KOP_GOOD_MAX), KOP_BAD)
+            result['accessories'].update(analytics.accessories_summary(stores))
+
+            # Категории аксессуаров — если в выгрузке есть группа товара
+            if 'category' in analytics.map_columns(accessories['nnv']):
+                acc_metrics = analytics.metrics_frame(accessories['nnv'])
+                acc_summary = analytics.category_summary(acc_metrics)
+                result['accessories']['key_categories'] = analytics.key_categories(
+                    acc_summary, SHARE_KEY_CATEGORY, limit=3)
+                result['accessories']['growth_categories'] = analytics.growth_deficit(
+                    acc_summary, GROWTH_POTENTIAL, limit=3)
+                result['accessories']['illiquid'] = [
+                    {'name': item['name'], 'weeks': item['weeks'], 'stock': item['stock']}
+                    for item in analytics.illiquid_stock(acc_metrics, TURNOVER_DEAD, limit=3, unit=' шт')]
+        return result
+    if not samples:
+        return result
+
+    # Отчёта нет — примеры, чтобы была видна раскладка страницы
+    result['top_stores'] = [
+        {'id': '10267', 'division': 'Казань 1', 'growth': 5.2, 'kop': 1.0, 'note': 'Лучший по росту'},
+        {'id': '11936', 'division': 'Наб.Челны', 'growth': 3.8, 'kop': 1.1, 'note': 'Стабильный КОП'},
+        {'id': '10649', 'division': 'ННВ 1', 'growth': -2.1, 'kop': 1.0, 'note': 'Минимальное падение'},
+    ]
+
+    result['worst_stores'] = [
+        {'id': '11588', 'division': 'ННВ 1', 'growth': -45.2, 'kop': 3.2, 'problem': 'Критичное затоваривание'},
+        {'id': '10848', 'division': 'Ижевское', 'growth': -38.7, 'kop': 2.8, 'problem': 'Затоваривание + падение'},
+        {'id': '10688', 'division': 'Ярославское', 'growth': -35.4, 'kop': 2.1, 'problem': 'Избыток зимней обуви'},
+    ]
+
+    # Аксессуары - расширенная структура (без ювелирных)
+    result['accessories'].update({
+        'share': 27.7,
+        'avg_kop': 1.6,
+        'growth': -18.5,
+        'key_categories': [
+            {'name': 'Сумки женские', 'share': 8.2, 'growth': -12, 'kop': 1.2},
+            {'name': 'Рюкзаки', 'share': 5.4, 'growth': -8, 'kop': 1.0},
+            {'name': 'Ремни', 'share': 3.8, 'growth': -15, 'kop': 1.4},
+        ],
+        'growth_categories': [
+            {'name': 'Кошельки мужские', 'share': 2.1, 'growth': 45, 'kop': 0.7},
+            {'name': 'Перчатки зимние', 'share': 1.8, 'growth': 62, 'kop': 0.5},
+        ],
+        'illiquid': [
+            {'name': 'Шарфы летние', 'weeks': 156, 'stock': '34 шт'},
+            {'name': 'Панамы', 'weeks': 203, 'stock': '28 шт'},
+        ],
+    })
+
+    return result
+
+
+def log_analysis(analysis):
+    """Итоги анализа в лог"""
     log(f"  Период: {analysis['period']}")
     log(f"  Ключевых категорий: {len(analysis['key_categories'])}")
     log(f"  С ростом и дефицитом: {len(analysis['growth_deficit'])}")
     log(f"  Неликвидов: {len(analysis['illiquid_stock'])}")
 
+
+def missing_notes(analysis, turnover, accessories):
+    """Строки «нет данных» над дашбордом региона: каких отчётов по нему нет"""
+    region = analysis['region']
+    notes = []
+    if analysis['nnv_rank'] is None:
+        notes.append(f"Нет данных по региону {region} в отчёте по регионам")
+    if not turnover or ('df' in turnover and turnover['df'].empty):
+        notes.append(f"Нет данных оборачиваемости по региону {region}")
+    if not accessories or accessories.get('nnv') is None or accessories['nnv'].empty:
+        notes.append(f"Нет данных по магазинам региона {region} в отчёте по аксессуарам")
+    return notes
+
+
+def analyze_data(regions, turnover, accessories, structure, region=DEFAULT_REGION, samples=True):
+    """
+    Анализ данных и формирование структуры для дашборда
+    samples=False (пакетный режим) — без примеров: чего нет по региону, то пусто и указано в notes
+    """
+    log("Анализирую данные...")
+
+    period = regions.get('period', 'Текущая неделя') if regions else 'Текущая неделя'
+    analysis = analyze_base(period, region, regions, accessories, structure, samples)
+    analysis.update(analyze_turnover(turnover, period, samples=samples))
+    analysis.update(analyze_accessories(accessories, samples))
+    if not samples:
+        analysis['notes'] = missing_notes(analysis, turnover, accessories)
+    log_analysis(analysis)
+
     return analysis
 
 
-def generate_html(analysis):
-    """Генерация HTML дашборда v2.0"""
+# Секция HTML → части анализа, из которых она строится (узлы графа зависимостей)
+SECTION_SOURCES = {
+    'actions_html': ('analyze_turnover',),
+    'regions_rows': ('analyze_base',),
+    'regions_note': ('analyze_base',),
+    'divisions_rows': ('analyze_base',),
+    'divisions_note': ('analyze_base',),
+    'key_categories_rows': ('analyze_turnover',),
+    'key_categories_note': ('analyze_turnover',),
+    'growth_rows': ('analyze_turnover',),
+    'illiquid_rows': ('analyze_turnover',),
+    'imbalances_html': ('analyze_turnover',),
+    'top_stores_rows': ('analyze_accessories',),
+    'worst_stores_rows': ('analyze_accessories',),
+    'acc_key_rows': ('analyze_accessories',),
+    'acc_growth_rows': ('analyze_accessories',),
+    'acc_note': ('analyze_accessories',),
+    'plan_html': ('analyze_turnover', 'analyze_accessories'),
+}
+
+# Узлы, нужные одному дашборду: части анализа (JSON, шапка страницы) и секции HTML
+DASHBOARD_TARGETS = ['analyze_base', 'analyze_turnover', 'analyze_accessories'] + \
+                    [f'html_{section}' for section in SECTION_SOURCES]
+
+# Статус этапа в --dry-run
+PLAN_LABELS = {RUN: 'пересчёт', CACHED: 'из кэша', SKIP: 'не нужен'}
+
+
+def analysis_params():
+    """Пороги и справочники анализа — входят в ключи графа: изменились — части анализа пересчитываются"""
+    return {
+        'kop': (KOP_GOOD_MIN, KOP_GOOD_MAX, KOP_WARN_MAX, KOP_BAD),
+        'share': SHARE_KEY_CATEGORY,
+        'growth': GROWTH_POTENTIAL,
+        'dead': TURNOVER_DEAD,
+        'seasons': (SEASON_WINTER, SEASON_SUMMER),
+    }
+
+
+def report_period(regions_path, *_):
+    """Период дашборда, как в extract_regions_data() (нет файла регионов — 'Текущая неделя')"""
+    return parse_period_from_filename(regions_path) if regions_path else 'Текущая неделя'
+
+
+def render_section(name, parts, region=DEFAULT_REGION):
+    """HTML секции из её частей анализа (SECTION_SOURCES)"""
+    select, _ = RENDERER.sections[name]
+    analysis = {}
+    for part in parts:
+        analysis.update(part)
+    return RENDERER.section(name, select(analysis, region))
+
+
+# Исходники, от которых зависят результаты графа: их отпечаток входит в ключи этапов
+GRAPH_SOURCES = ('generate_dashboard.py', 'analytics.py', 'transfer_plan.py', 'html_renderer.py',
+                 'dashboard_template.py', 'season_matcher.py', 'region_filter.py', 'stream_aggregates.py',
+                 'dtype_normalizer.py', 'dependency_graph.py')
+
+_graph_code = None
+
+
+def graph_code():
+    """Отпечаток GRAPH_SOURCES (считается один раз за процесс)"""
+    global _graph_code
+    if _graph_code is None:
+        base = Path(__file__).parent
+        _graph_code = code_fingerprint(base / name for name in GRAPH_SOURCES)
+    return _graph_code
+
+
+def build_graph(options=None, region=DEFAULT_REGION, store=None):
+    """
+    Граф одного дашборда: входные файлы → extract_* → части анализа → секции HTML
+    options — параметры экстракторов (extract_options()), store — хранилище результатов (ParseCache)
+    """
+    options = options or {}
+    graph = DependencyGraph(store, code=graph_code())
+    for kind in REPORT_SOURCES:
+        graph.add_file(f'input_{kind}', find_report_file(kind))
+    # Период читается из файлов регионов / аксессуаров / оборачиваемости; ключ — сам период
+    graph.add('period', report_period, deps=('input_regions', 'input_accessories', 'input_turnover'),
+              by_value=True)
+
+    for name, extract in EXTRACTORS.items():
+        deps = (f"input_{name[len('extract_'):]}",)
+        if name in PERIOD_EXTRACTORS:
+            deps += ('period',)
+        graph.add(name, lambda path, period=None, name=name, extract=extract: extract_stage(
+                      name, extract, **with_period(options, period).get(name, {})),
+                  deps=deps, params=options.get(name), persist=False, may_fail=True)
+    graph.add('analyze_base', lambda period, regions, accessories, structure: analyze_base(
+                  period, region, regions, accessories, structure),
+              deps=('period', 'extract_regions', 'extract_accessories', 'extract_structure'),
+              params=(region, REGION_NAMES.get(region, region)))
+    # Месяц сезонности — узел по значению: без распознанного периода бейджи зависят от текущего месяца
+    graph.add('season_month', season_month, deps=('period',), by_value=True)
+    graph.add('analyze_turnover', analyze_turnover, deps=('extract_turnover', 'period', 'season_month'),
+              params=analysis_params())
+    graph.add('analyze_accessories', analyze_accessories, deps=('extract_accessories',), params=analysis_params())
+    for section, sources in SECTION_SOURCES.items():
+        graph.add(f'html_{section}', lambda *parts, section=section: render_section(section, parts, region),
+                  deps=sources, params=(region, KOP_GOOD_MAX, KOP_WARN_MAX))
+    return graph
+
+
+def history_targets(graph, options=None):
+    """
+    Извлечения для истории: отчёты, файлов которых ещё нет в history.sqlite
+    options — параметры экстракторов: разбираемые потоком (stream) не нужны — таблица
+    целиком не собирается и в историю не пишется, их допишет обычный запуск
+    """
+    if graph.value('period') == 'Текущая неделя':
+        return []
+    streamed = {name for name, kwargs in (options or {}).items() if kwargs.get('stream')}
+    keys = {kind: graph.key(f'input_{kind}') for kind in REPORT_SOURCES
+            if f'extract_{kind}' not in streamed}
+    loaded = history_store.ingested(key for key in keys.values() if key != MISSING)
+    return [f'extract_{kind}' for kind, key in keys.items() if key != MISSING and key not in loaded]
+
+
+def plan_stages(args, store):
+    """Граф и план запуска: {этап: статус} (RUN / CACHED / SKIP / INPUT)"""
+    with METRICS.stage('plan_stages') as stage:
+        options = extract_options(args)
+        graph = build_graph(options, store=store)
+        targets = list(DASHBOARD_TARGETS)
+        if not args.no_history:
+            targets += history_targets(graph, options)
+        plan = graph.plan(targets)
+        stage['run'] = sum(1 for status in plan.values() if status == RUN)
+        stage['cached'] = sum(1 for status in plan.values() if status == CACHED)
+    return graph, plan
+
+
+def print_plan(graph, plan):
+    """--dry-run: какие этапы будут пересчитаны, какие возьмутся из кэша"""
+    print()
+    print(f"  {'Этап':<28}Статус")
+    for name, status in plan.items():
+        if status == INPUT:
+            key = graph.key(name)
+            label = 'нет файла' if key == MISSING else f"файл {graph.value(name).name} ({key[:12]})"
+        else:
+            label = PLAN_LABELS[status]
+        print(f"  {name:<28}{label}")
+    print()
+    log(f"Будет пересчитано этапов: {sum(1 for status in plan.values() if status == RUN)}, "
+        f"из кэша: {sum(1 for status in plan.values() if status == CACHED)}")
+
+
+def run_incremental(graph, plan, args, timeouts):
+    """Извлечение, анализ и история по плану: только этапы RUN, остальное — из хранилища графа"""
+    needed = {name: extract for name, extract in EXTRACTORS.items() if plan[name] == RUN}
+    extracted = {}
+    if needed:
+        options = with_period(extract_options(args), graph.value('period'))
+        extracted = dict(zip(needed, extract_all(options, args.extract_workers, timeouts, needed)))
+        for name, report in extracted.items():
+            graph.provide(name, report)
+    skipped = [name for name in EXTRACTORS if name not in needed]
+    if skipped:
+        log(f"Не извлекаются (не нужны или анализ в кэше): {', '.join(skipped)}")
+
+    with METRICS.stage('analyze_data'):
+        log("Анализирую данные...")
+        analysis = dict(graph.value('analyze_base'))
+        analysis.update(graph.value('analyze_turnover'))
+        analysis.update(graph.value('analyze_accessories'))
+        log_analysis(analysis)
+
+    if not args.no_history:
+        with METRICS.stage('record_history'):
+            record_history(analysis['period'], *(extracted.get(name) for name in EXTRACTORS))
+
+    return analysis
+
+
+def generate_html(analysis, generated_at=None, sections=None):
+    """Генерация HTML дашборда v2.0 (sections — секции из графа зависимостей)"""
     log("Генерирую HTML...")
 
-    def kop_class(kop):
-        if kop < KOP_GOOD_MAX:
-            return 'kop-good'
-        elif kop < KOP_WARN_MAX:
-            return 'kop-warn'
-        return 'kop-bad'
-
-    def growth_class(growth):
-        return 'growth-pos' if growth > 0 else 'growth-neg'
-
-    def format_growth(growth):
-        sign = '+' if growth > 0 else ''
-        return f"{sign}{growth}%"
-
-    def season_badge(season):
-        if season == 'СЕЗОН':
-            return '<span class="badge badge-season">СЕЗОН</span>'
-        elif season == 'НЕСЕЗОН':
-            return '<span class="badge badge-offseason">НЕСЕЗОН</span>'
-        return ''
-
-    # Генерация секций
-
-    # Регионы
-    regions_rows = '\n'.join([
-        f'''<tr class="{'highlight-row' if r['name'] == 'ННВ' else ''}">
-            <td>{r['rank']}</td>
-            <td><strong>{r['name']}</strong></td>
-            <td>{r['share']}%</td>
-            <td class="{growth_class(r['growth'])}">{format_growth(r['growth'])}</td>
-        </tr>''' for r in analysis['regions_data']
-    ])
-
-    # Подразделения ННВ
-    divisions_rows = '\n'.join([
-        f'''<tr>
-            <td><strong>{d['name']}</strong></td>
-            <td>{d['stores']}</td>
-            <td>{d['share']}%</td>
-            <td class="{growth_class(d['growth'])}">{format_growth(d['growth'])}</td>
-            <td class="{kop_class(d['kop'])}">{d['kop']}</td>
-        </tr>''' for d in analysis['divisions']
-    ])
-
-    # Ключевые категории обуви
-    key_categories_rows = '\n'.join([
-        f'''<tr>
-            <td>{i+1}</td>
-            <td>{cat['name']} {season_badge(cat.get('season'))}</td>
-            <td>{cat['share']}%</td>
-            <td class="{growth_class(cat['growth'])}">{format_growth(cat['growth'])}</td>
-            <td class="{kop_class(cat['kop'])}">{cat['kop']}</td>
-        </tr>''' for i, cat in enumerate(analysis['key_categories'])
-    ])
-
-    # Категории с ростом и дефицитом
-    growth_rows = '\n'.join([
-        f'''<tr>
-            <td>{cat['name']} {season_badge(cat.get('season'))}</td>
-            <td>{cat['share']}%</td>
-            <td class="growth-pos">+{cat['growth']}%</td>
-            <td class="kop-bad">{cat['kop']}</td>
-            <td><span class="badge {'badge-urgent' if cat['priority'] == 'Высокий' else 'badge-important'}">{cat['priority']}</span></td>
-        </tr>''' for cat in analysis['growth_deficit']
-    ])
-
-    # Неликвидные остатки
-    illiquid_rows = '\n'.join([
-        f'''<tr>
-            <td>{item['name']} {season_badge(item.get('season'))}</td>
-            <td class="kop-bad">{item['weeks']} нед</td>
-            <td>{item['stock']}</td>
-            <td>{item['action']}</td>
-        </tr>''' for item in analysis['illiquid_stock']
-    ])
-
-    # Дисбалансы
-    imbalances_html = ''
-    for imb in analysis['imbalances']:
-        surplus_info = ', '.join([f"{s['name']} (КОП {s['kop']})" for s in imb['surplus']])
-        deficit_info = ', '.join([f"{d['name']} (КОП {d['kop']})" for d in imb['deficit']])
-
-        imbalances_html += f'''
-        <div class="imbalance-card">
-            <div class="imbalance-header">
-                <strong>{imb['category']}</strong> {season_badge(imb.get('season'))}
-                <span class="share-badge">Доля: {imb['share']}%</span>
-            </div>
-            <div class="imbalance-body">
-                <div class="imbalance-row">
-                    <span class="label-surplus">Затовар:</span> {surplus_info}
-                </div>
-                <div class="imbalance-row">
-                    <span class="label-deficit">Дефицит:</span> {deficit_info}
-                </div>
-                <div class="imbalance-action">
-                    <strong>Действие:</strong> {imb['action']}
-                    <span class="deadline">Срок: {imb['deadline']}</span>
-                </div>
-            </div>
-        </div>
-        '''
-
-    # Магазины - ТОП
-    top_stores_rows = '\n'.join([
-        f'''<tr>
-            <td>{i+1}</td>
-            <td><strong>{store['id']}</strong></td>
-            <td>{store['division']}</td>
-            <td class="{growth_class(store['growth'])}">{format_growth(store['growth'])}</td>
-            <td class="{kop_class(store['kop'])}">{store['kop']}</td>
-            <td><span class="note-badge">{store['note']}</span></td>
-        </tr>''' for i, store in enumerate(analysis['top_stores'])
-    ])
-
-    # Магазины - ХУДШИЕ
-    worst_stores_rows = '\n'.join([
-        f'''<tr>
-            <td>{i+1}</td>
-            <td><strong>{store['id']}</strong></td>
-            <td>{store['division']}</td>
-            <td class="growth-neg">{store['growth']}%</td>
-            <td class="{kop_class(store['kop'])}">{store['kop']}</td>
-            <td><span class="problem-badge">{store['problem']}</span></td>
-        </tr>''' for i, store in enumerate(analysis['worst_stores'])
-    ])
-
-    # Аксессуары - ключевые
-    acc_key_rows = '\n'.join([
-        f'''<tr>
-            <td>{cat['name']}</td>
-            <td>{cat['share']}%</td>
-            <td class="{growth_class(cat['growth'])}">{format_growth(cat['growth'])}</td>
-            <td class="{kop_class(cat['kop'])}">{cat['kop']}</td>
-        </tr>''' for cat in analysis['accessories']['key_categories']
-    ])
-
-    # Аксессуары - с ростом
-    acc_growth_rows = '\n'.join([
-        f'''<tr>
-            <td>{cat['name']}</td>
-            <td>{cat['share']}%</td>
-            <td class="growth-pos">+{cat['growth']}%</td>
-            <td class="kop-bad">{cat['kop']}</td>
-        </tr>''' for cat in analysis['accessories']['growth_categories']
-    ])
-
-    # Действия
-    def action_card(action):
-        type_class = {
-            'urgent': 'urgent',
-            'important': '',
-            'opportunity': 'success'
-        }.get(action['type'], '')
-
-        badge_class = {
-            'urgent': 'badge-urgent',
-            'important': 'badge-important',
-            'opportunity': 'badge-opportunity'
-        }.get(action['type'], '')
-
-        return f'''
-        <div class="action-card {type_class}">
-            <div class="action-title">
-                <span class="badge {badge_class}">{action['badge']}</span>
-                {action['title']}
-            </div>
-            <div class="action-desc">
-                <div class="action-line"><span class="action-label">Проблема:</span> {action['problem']}</div>
-                <div class="action-line"><span class="action-label">Действие:</span> {action['action']}</div>
-                <div class="action-line"><span class="action-label">Срок:</span> <strong>{action['deadline']}</strong></div>
-                <div class="action-line"><span class="action-label">Ответственный:</span> {action['responsible']}</div>
-                <div class="action-line"><span class="action-label">Эффект:</span> {action['effect']}</div>
-            </div>
-        </div>
-        '''
-
-    actions_html = '\n'.join([action_card(a) for a in analysis['actions']])
-
-    # Финальный HTML
-    html = f'''<!DOCTYPE html>
-<html lang="ru">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=5.0">
-    <title>KARI Dashboard ННВ | {analysis['period']}</title>
-    <style>
-        * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: #f5f5f5;
-            color: #1a1a1a;
-            padding: 12px;
-            line-height: 1.5;
-        }}
-
-        .container {{ max-width: 1200px; margin: 0 auto; }}
-
-        .header {{
-            background: linear-gradient(135deg, #1e3a8a 0%, #3b82f6 100%);
-            color: white;
-            padding: 20px;
-            border-radius: 12px;
-            margin-bottom: 16px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-
-        .header h1 {{ font-size: 24px; margin-bottom: 8px; }}
-        .header .subtitle {{ opacity: 0.9; font-size: 14px; }}
-
-        .section {{
-            background: white;
-            border-radius: 12px;
-            padding: 16px;
-            margin-bottom: 16px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.08);
-        }}
-
-        .section-title {{
-            font-size: 18px;
-            font-weight: 700;
-            margin-bottom: 12px;
-            color: #1e3a8a;
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-
-        .section-subtitle {{
-            font-size: 13px;
-            color: #6b7280;
-            margin-bottom: 12px;
-        }}
-
-        .action-card {{
-            background: #fef3c7;
-            border-left: 4px solid #f59e0b;
-            padding: 12px;
-            margin-bottom: 12px;
-            border-radius: 6px;
-        }}
-
-        .action-card.urgent {{ background: #fee2e2; border-color: #ef4444; }}
-        .action-card.success {{ background: #d1fae5; border-color: #10b981; }}
-
-        .action-title {{
-            font-weight: 700;
-            margin-bottom: 8px;
-            display: flex;
-            align-items: center;
-            gap: 6px;
-            flex-wrap: wrap;
-        }}
-
-        .action-desc {{ font-size: 13px; color: #4b5563; }}
-        .action-line {{ margin-bottom: 4px; }}
-        .action-label {{ font-weight: 600; color: #374151; }}
-
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            font-size: 13px;
-        }}
-
-        th {{
-            background: #f3f4f6;
-            padding: 8px 6px;
-            text-align: left;
-            font-weight: 600;
-            color: #374151;
-            border-bottom: 2px solid #e5e7eb;
-        }}
-
-        td {{
-            padding: 8px 6px;
-            border-bottom: 1px solid #f3f4f6;
-        }}
-
-        tr:hover {{ background: #f9fafb; }}
-        tr.highlight-row {{ background: #eff6ff; }}
-        tr.highlight-row:hover {{ background: #dbeafe; }}
-
-        .kop-good {{ color: #10b981; font-weight: 600; }}
-        .kop-warn {{ color: #f59e0b; font-weight: 600; }}
-        .kop-bad {{ color: #ef4444; font-weight: 600; }}
-
-        .growth-pos {{ color: #10b981; font-weight: 600; }}
-        .growth-neg {{ color: #ef4444; font-weight: 600; }}
-
-        .badge {{
-            display: inline-block;
-            padding: 2px 8px;
-            border-radius: 12px;
-            font-size: 11px;
-            font-weight: 600;
-            white-space: nowrap;
-        }}
-
-        .badge-urgent {{ background: #fee2e2; color: #991b1b; }}
-        .badge-important {{ background: #fef3c7; color: #92400e; }}
-        .badge-opportunity {{ background: #d1fae5; color: #065f46; }}
-        .badge-season {{ background: #dbeafe; color: #1e40af; }}
-        .badge-offseason {{ background: #f3f4f6; color: #6b7280; }}
-
-        .share-badge {{
-            background: #e5e7eb;
-            padding: 2px 8px;
-            border-radius: 4px;
-            font-size: 12px;
-            margin-left: 8px;
-        }}
-
-        .note-badge {{
-            background: #d1fae5;
-            color: #065f46;
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-size: 11px;
-        }}
-
-        .problem-badge {{
-            background: #fee2e2;
-            color: #991b1b;
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-size: 11px;
-        }}
-
-        .metric-row {{
-            display: flex;
-            gap: 8px;
-            margin-bottom: 8px;
-            flex-wrap: wrap;
-        }}
-
-        .metric-box {{
-            flex: 1;
-            min-width: 100px;
-            background: #f9fafb;
-            padding: 10px;
-            border-radius: 6px;
-            text-align: center;
-        }}
-
-        .metric-label {{
-            font-size: 11px;
-            color: #6b7280;
-            margin-bottom: 4px;
-        }}
-
-        .metric-value {{
-            font-size: 20px;
-            font-weight: 700;
-            color: #1e3a8a;
-        }}
-
-        .note {{
-            background: #eff6ff;
-            border-left: 3px solid #3b82f6;
-            padding: 10px;
-            margin-top: 12px;
-            font-size: 13px;
-            border-radius: 4px;
-        }}
-
-        .imbalance-card {{
-            background: #fefce8;
-            border: 1px solid #fde047;
-            border-radius: 8px;
-            padding: 12px;
-            margin-bottom: 12px;
-        }}
-
-        .imbalance-header {{
-            font-size: 14px;
-            margin-bottom: 8px;
-            display: flex;
-            align-items: center;
-            flex-wrap: wrap;
-            gap: 8px;
-        }}
-
-        .imbalance-body {{ font-size: 13px; }}
-        .imbalance-row {{ margin-bottom: 4px; }}
-        .label-surplus {{ color: #dc2626; font-weight: 600; }}
-        .label-deficit {{ color: #16a34a; font-weight: 600; }}
-
-        .imbalance-action {{
-            margin-top: 8px;
-            padding-top: 8px;
-            border-top: 1px dashed #fde047;
-        }}
-
-        .deadline {{
-            display: inline-block;
-            background: #fef3c7;
-            padding: 2px 6px;
-            border-radius: 4px;
-            font-size: 12px;
-            margin-left: 8px;
-        }}
-
-        details {{
-            margin-top: 12px;
-        }}
-
-        summary {{
-            cursor: pointer;
-            font-weight: 600;
-            padding: 8px;
-            background: #f3f4f6;
-            border-radius: 6px;
-            margin-bottom: 8px;
-        }}
-
-        summary:hover {{ background: #e5e7eb; }}
-
-        @media (max-width: 768px) {{
-            body {{ padding: 8px; }}
-            .header {{ padding: 16px; }}
-            .header h1 {{ font-size: 20px; }}
-            .section {{ padding: 12px; }}
-            .section-title {{ font-size: 16px; }}
-            table {{ font-size: 12px; }}
-            th, td {{ padding: 6px 4px; }}
-            .metric-box {{ min-width: 80px; }}
-            .metric-value {{ font-size: 18px; }}
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <!-- Header -->
-        <div class="header">
-            <h1>KARI Недельный Отчёт ННВ</h1>
-            <div class="subtitle">Неделя {analysis['period']} | Регион Нижний Новгород | 119 магазинов</div>
-        </div>
-
-        <!-- Executive Summary -->
-        <div class="section">
-            <div class="section-title">ТОП-3 ДЕЙСТВИЯ НА НЕДЕЛЮ</div>
-            {actions_html}
-        </div>
-
-        <!-- Компания и регионы -->
-        <div class="section">
-            <div class="section-title">КОМПАНИЯ И РЕГИОНЫ</div>
-            <p class="section-subtitle">Позиция ННВ среди 11 регионов компании</p>
-
-            <div class="metric-row">
-                <div class="metric-box">
-                    <div class="metric-label">Компания</div>
-                    <div class="metric-value growth-neg">{analysis['company_growth']}%</div>
-                </div>
-                <div class="metric-box">
-                    <div class="metric-label">Регион ННВ</div>
-                    <div class="metric-value growth-neg">{analysis['nnv_growth']}%</div>
-                </div>
-                <div class="metric-box">
-                    <div class="metric-label">Место ННВ</div>
-                    <div class="metric-value">{analysis['nnv_rank']} из {analysis['total_regions']}</div>
-                </div>
-            </div>
-
-            <details>
-                <summary>Показать ТОП-5 регионов</summary>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Место</th>
-                            <th>Регион</th>
-                            <th>Доля</th>
-                            <th>Рост</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {regions_rows}
-                    </tbody>
-                </table>
-            </details>
-
-            <div class="note">
-                ННВ занимает <strong>3 место</strong> по доле в обороте (11.3%) и показывает падение на уровне компании (-22.8% vs -20.3%).
-            </div>
-        </div>
-
-        <!-- Подразделения ННВ -->
-        <div class="section">
-            <div class="section-title">ПОДРАЗДЕЛЕНИЯ ННВ</div>
-            <p class="section-subtitle">7 подразделений, 119 магазинов</p>
-
-            <table>
-                <thead>
-                    <tr>
-                        <th>Подразделение</th>
-                        <th>Маг.</th>
-                        <th>Доля</th>
-                        <th>Рост</th>
-                        <th>КОП</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {divisions_rows}
-                </tbody>
-            </table>
-
-            <div class="note">
-                <strong>Лидеры:</strong> Казань 1 (КОП 0.9, падение -18.3%)<br>
-                <strong>Проблемные:</strong> Ярославское (КОП 2.1, падение -28.4%), ННВ Север (КОП 1.9, падение -26.1%)
-            </div>
-        </div>
-
-        <!-- Ключевые категории обуви -->
-        <div class="section">
-            <div class="section-title">КЛЮЧЕВЫЕ КАТЕГОРИИ ОБУВИ (ТОП-5)</div>
-            <p class="section-subtitle">Категории с долей >3% в продажах — основа оборота региона</p>
-
-            <table>
-                <thead>
-                    <tr>
-                        <th>№</th>
-                        <th>Группа</th>
-                        <th>Доля</th>
-                        <th>Рост</th>
-                        <th>КОП</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {key_categories_rows}
-                </tbody>
-            </table>
-
-            <div class="note">
-                <strong>Вывод:</strong> ТОП-5 дают ~52% оборота. Сезонные категории (зимняя обувь) в приоритете.
-                Затоваривание кроссовок мужских (КОП 2.4) — нужна акция или перемещение.
-            </div>
-        </div>
-
-        <!-- Категории с ростом и дефицитом -->
-        <div class="section">
-            <div class="section-title">КАТЕГОРИИ С РОСТОМ И ДЕФИЦИТОМ</div>
-            <p class="section-subtitle">Рост >50% при КОП &lt;1.0 — упущенная выгода, нужно пополнить</p>
-
-            <table>
-                <thead>
-                    <tr>
-                        <th>Группа</th>
-                        <th>Доля</th>
-                        <th>Рост</th>
-                        <th>КОП</th>
-                        <th>Приоритет</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {growth_rows}
-                </tbody>
-            </table>
-
-            <div class="note">
-                <strong>Действие:</strong> Срочно пополнить эти категории. Высокий спрос + дефицит = теряем продажи каждый день.
-            </div>
-        </div>
-
-        <!-- Неликвидные остатки -->
-        <div class="section">
-            <div class="section-title">НЕЛИКВИДНЫЕ ОСТАТКИ</div>
-            <p class="section-subtitle">Товар с оборачиваемостью >50 недель — заморожен капитал</p>
-
-            <table>
-                <thead>
-                    <tr>
-                        <th>Группа</th>
-                        <th>Оборач.</th>
-                        <th>Остаток</th>
-                        <th>Действие</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {illiquid_rows}
-                </tbody>
-            </table>
-
-            <div class="note">
-                <strong>Эффект от распродажи:</strong> Освобождение ~200-300 тыс. руб. капитала + место под весеннюю коллекцию.
-            </div>
-        </div>
-
-        <!-- Дисбалансы -->
-        <div class="section">
-            <div class="section-title">ДИСБАЛАНСЫ ПО ПОДРАЗДЕЛЕНИЯМ</div>
-            <p class="section-subtitle">Где затовар (КОП >2.0) vs где дефицит (КОП &lt;1.0) для ключевых категорий</p>
-
-            {imbalances_html}
-
-            <div class="note">
-                <strong>Приоритет перемещений:</strong> внутри города (бесплатно) → между городами подразделения → между подразделениями.
-            </div>
-        </div>
-
-        <!-- Магазины -->
-        <div class="section">
-            <div class="section-title">МАГАЗИНЫ</div>
-
-            <h4 style="font-size:14px; margin:12px 0 8px;">ТОП-3 (лучшие практики)</h4>
-            <table>
-                <thead>
-                    <tr>
-                        <th>№</th>
-                        <th>Магазин</th>
-                        <th>Подразд.</th>
-                        <th>Рост</th>
-                        <th>КОП</th>
-                        <th>Примечание</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {top_stores_rows}
-                </tbody>
-            </table>
-
-            <h4 style="font-size:14px; margin:16px 0 8px;">ХУДШИЕ-3 (требуют внимания)</h4>
-            <table>
-                <thead>
-                    <tr>
-                        <th>№</th>
-                        <th>Магазин</th>
-                        <th>Подразд.</th>
-                        <th>Падение</th>
-                        <th>КОП</th>
-                        <th>Проблема</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {worst_stores_rows}
-                </tbody>
-            </table>
-
-            <div class="note">
-                <strong>Анализ:</strong> Худшие магазины показывают затоваривание (КОП 2-3+).
-                Нужна ревизия ассортимента и перемещение излишков в магазины с дефицитом.
-            </div>
-        </div>
-
-        <!-- Аксессуары -->
-        <div class="section">
-            <div class="section-title">АКСЕССУАРЫ (без ювелирных)</div>
-            <p class="section-subtitle">Сумки, рюкзаки, ремни, кошельки, перчатки и др.</p>
-
-            <div class="metric-row">
-                <div class="metric-box">
-                    <div class="metric-label">Доля в обороте</div>
-                    <div class="metric-value">{analysis['accessories']['share']}%</div>
-                </div>
-                <div class="metric-box">
-                    <div class="metric-label">Средний КОП</div>
-                    <div class="metric-value kop-warn">{analysis['accessories']['avg_kop']}</div>
-                </div>
-                <div class="metric-box">
-                    <div class="metric-label">Рост</div>
-                    <div class="metric-value growth-neg">{analysis['accessories']['growth']}%</div>
-                </div>
-            </div>
-
-            <details>
-                <summary>Ключевые категории аксессуаров</summary>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Категория</th>
-                            <th>Доля</th>
-                            <th>Рост</th>
-                            <th>КОП</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {acc_key_rows}
-                    </tbody>
-                </table>
-            </details>
-
-            <details>
-                <summary>Категории с ростом и дефицитом</summary>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Категория</th>
-                            <th>Доля</th>
-                            <th>Рост</th>
-                            <th>КОП</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {acc_growth_rows}
-                    </tbody>
-                </table>
-            </details>
-
-            <div class="note">
-                <strong>Вывод:</strong> Перчатки зимние (+62%) и кошельки мужские (+45%) — пополнить.
-                Сумки женские — основа категории, нужен акцент на промо.
-            </div>
-        </div>
-
-        <!-- План действий -->
-        <div class="section">
-            <div class="section-title">ПЛАН ДЕЙСТВИЙ НА НЕДЕЛЮ</div>
-
-            <h4 style="font-size:14px; margin-bottom:8px;">Сегодня-завтра (срочно):</h4>
-            <ul style="margin-left:20px; margin-bottom:12px;">
-                <li>Перераспределить зимнюю обувь: Ярославское → Казань 1, ННВ Север → ННВ 1</li>
-                <li>Заявка на кроссовки детские и перчатки зимние (дефицит при росте)</li>
-            </ul>
-
-            <h4 style="font-size:14px; margin-bottom:8px;">Эта неделя:</h4>
-            <ul style="margin-left:20px; margin-bottom:12px;">
-                <li>Запустить распродажу неликвидов -50-70% в магазинах 11588, 10848, 10688</li>
-                <li>Ревизия ассортимента в худших магазинах</li>
-                <li>Промо-акция на аксессуары (сумки, кошельки)</li>
-            </ul>
-
-            <h4 style="font-size:14px; margin-bottom:8px;">Планирование (следующая неделя):</h4>
-            <ul style="margin-left:20px;">
-                <li>Подготовка к весенней коллекции — освободить склады</li>
-                <li>Анализ лучших практик магазина 10267 (Казань 1) для тиражирования</li>
-            </ul>
-        </div>
-
-        <!-- Footer -->
-        <div style="text-align:center; padding:16px; color:#9ca3af; font-size:12px;">
-            <div>Источник: отчёты за {analysis['period']}</div>
-            <div style="margin-top:4px;">generate_dashboard.py v2.0 | {datetime.now().strftime('%d.%m.%Y %H:%M')}</div>
-        </div>
-    </div>
-</body>
-</html>'''
+    region = analysis.get('region', DEFAULT_REGION)
+    region_name = analysis.get('region_name', REGION_NAMES.get(region, region))
+    return RENDERER.render(analysis, region, region_name, generated_at, sections)
+
 
+def finalize_html(html, minify=True, max_bytes=MAX_HTML_BYTES, name='Дашборд'):
+    """
+    Сжатие HTML и проверка лимита размера (Telegram iOS)
+    SizeBudgetError, если страница больше max_bytes (0 — без проверки)
+    """
+    if minify:
+        html = minify_html(html)
+    check_budget(html, max_bytes, name)
     return html
 
 
-def main():
+def record_history(period, regions, turnover, accessories, structure):
+    """Дописать отчёты недели в историю (уже загруженные файлы пропускаются)"""
+    if not period or period == 'Текущая неделя':
+        log("История: период не определён, неделя не записана")
+        return
+
+    reports = {'regions': regions, 'turnover': turnover,
+               'accessories': accessories, 'structure': structure}
+    sources = {kind: (report['path'], report['df'])
+               for kind, report in reports.items() if report and 'df' in report}
+    streamed = [kind for kind, report in reports.items() if report and 'df' not in report]
+    if streamed:
+        # Потоковый разбор не держит таблицу целиком — эти отчёты допишет обычный запуск
+        log(f"История: {', '.join(streamed)} разобраны потоком и не записаны")
+    try:
+        added = history_store.ingest_week(period, sources)
+    except Exception as e:
+        log(f"История: ОШИБКА записи: {e}")
+        return
+
+    new = [kind for kind, was_added in added.items() if was_added]
+    log(f"История ({period}): добавлено {len(new)} из {len(added)} отчётов"
+        + (f" — {', '.join(new)}" if new else " (все уже загружены)"))
+
+
+# Разобранные отчёты и параметры HTML для воркеров пакетной генерации
+# (передаются один раз на процесс)
+_batch_data = None
+_batch_html_options = {}
+
+
+def _init_batch_worker(data, html_options=None):
+    """Инициализация воркера: общие разобранные отчёты, параметры finalize_html()"""
+    global _batch_data, _batch_html_options
+    _batch_data = data
+    _batch_html_options = html_options or {}
+
+
+def region_output_dir(region):
+    """Каталог дашборда региона: output/<регион>/"""
+    return OUTPUT_DIR / re.sub(r'[\\/:*?"<>|]+', '_', region).strip()
+
+
+def render_region(region):
+    """Анализ и HTML одного региона из общих отчётов (выполняется в воркере)"""
+    started = time.perf_counter()
+    data = slice_region_data(*_batch_data, region)
+    analysis = analyze_data(*data, region=region, samples=False)
+    try:
+        html = finalize_html(generate_html(analysis), name=f"Дашборд {region}", **_batch_html_options)
+    except SizeBudgetError as e:
+        return {'region': region, 'file': None, 'size_kb': 0.0, 'error': str(e),
+                'seconds': time.perf_counter() - started}
+
+    output_dir = region_output_dir(region)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_file = output_dir / "dashboard_current.html"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+    save_period_manifest(output_file, analysis['period'])
+
+    return {
+        'region': region,
+        'file': output_file,
+        'size_kb': output_file.stat().st_size / 1024,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_batch(data, regions, workers=BATCH_WORKERS, html_options=None):
+    """
+    Дашборды всех регионов из одного разбора входных файлов
+    data — (regions, turnover, accessories, structure)
+    html_options — параметры finalize_html() (minify, max_bytes)
+    """
+    workers = max(1, min(workers, len(regions)))
+    if workers == 1:
+        _init_batch_worker(data, html_options)
+        return [render_region(region) for region in regions]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(data, html_options)) as pool:
+        return list(pool.map(render_region, regions))
+
+
+def main_batch(data, args):
+    """Пакетный режим: output/<регион>/dashboard_current.html для каждого региона"""
+    if args.regions:
+        batch_regions = [r.strip() for r in args.regions.split(',') if r.strip()]
+    else:
+        batch_regions = discover_regions(data[0])
+
+    if not batch_regions:
+        log("ОШИБКА: список регионов пуст (нет --regions и не найдены в отчёте по регионам)")
+        return []
+
+    log(f"Пакетная генерация: {len(batch_regions)} регионов, процессов: {args.batch_workers}")
+    started = time.perf_counter()
+    with METRICS.stage('batch', regions=len(batch_regions), workers=args.batch_workers):
+        results = run_batch(data, batch_regions, args.batch_workers, html_options(args))
+        for result in results:
+            METRICS.record('render_region', result['seconds'], region=result['region'],
+                           html_bytes=int(result['size_kb'] * 1024),
+                           status='error' if result.get('error') else 'ok')
+
+    print()
+    print(f"  {'Регион':<16}{'Время, с':>10}{'Размер, KB':>12}  Файл")
+    for result in results:
+        print(f"  {result['region']:<16}{result['seconds']:>10.2f}{result['size_kb']:>12.1f}  "
+              f"{result['file'] or 'НЕ СОХРАНЁН'}")
+    print(f"  Всего: {time.perf_counter() - started:.2f} с")
+
+    failed = [result for result in results if result.get('error')]
+    for result in failed:
+        log(f"ОШИБКА: {result['error']}")
+    if failed:
+        raise SystemExit(1)
+
+    return [result['file'] for result in results]
+
+
+def parse_args(argv=None):
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="KARI Dashboard Generator")
+    parser.add_argument('--sheet-workers', type=int, default=SHEET_WORKERS,
+                        help="процессов для разбора листов оборачиваемости (1 = без пула)")
+    parser.add_argument('--extract-workers', type=int, default=EXTRACT_WORKERS,
+                        help="процессов для извлечения четырёх отчётов (1 = по очереди, 0 = авто)")
+    parser.add_argument('--extract-timeout', type=float,
+                        help="лимит времени одного экстрактора в пуле, с (по умолчанию — EXTRACT_TIMEOUTS)")
+    parser.add_argument('--stream', action='store_true',
+                        help="потоковый разбор оборачиваемости и аксессуаров (память — по частям)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help="строк в части при --stream")
+    parser.add_argument('--excel-engine', choices=('auto', 'openpyxl', 'calamine'), default=DEFAULT_ENGINE,
+                        help="движок разбора Excel (auto — calamine, если установлен python-calamine)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="не использовать кэш разобранных Excel файлов (и результатов этапов)")
+    parser.add_argument('--full', action='store_true',
+                        help="пересчитать все этапы, не беря результаты из кэша графа зависимостей")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="показать, какие этапы будут пересчитаны, и выйти")
+    parser.add_argument('--no-history', action='store_true',
+                        help="не записывать неделю в историю (history/history.sqlite)")
+    parser.add_argument('--batch', action='store_true',
+                        help="дашборды всех регионов: output/<регион>/dashboard_current.html")
+    parser.add_argument('--regions',
+                        help="регионы для --batch через запятую (по умолчанию — из отчёта по регионам)")
+    parser.add_argument('--batch-workers', type=int, default=BATCH_WORKERS,
+                        help="процессов для --batch (1 = без пула)")
+    parser.add_argument('--no-minify', action='store_true',
+                        help="не сжимать HTML (для отладки вёрстки)")
+    parser.add_argument('--max-kb', type=float, default=MAX_HTML_BYTES / 1024,
+                        help="лимит размера дашборда, KB (0 = без проверки)")
+    parser.add_argument('--json-pretty', action='store_true',
+                        help="dashboard_data.json с отступами (по умолчанию — компактный)")
+    parser.add_argument('--json-gzip', action='store_true',
+                        help="рядом — сжатая копия dashboard_data.json.gz")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="пик памяти по этапам через tracemalloc (медленнее в несколько раз)")
+    args = parser.parse_args(argv)
+    if args.stream and args.batch:
+        # Регионы пакета нарезаются из полных таблиц (slice_region_data)
+        parser.error("--stream не сочетается с --batch")
+    if args.dry_run and args.batch:
+        parser.error("--dry-run — только для одного дашборда (без --batch)")
+    return args
+
+
+def extract_options(args):
+    """Параметры extract_*_data() из аргументов командной строки: {этап: kwargs}"""
+    stream = {'stream': args.stream, 'chunk_rows': args.chunk_rows}
+    return {'extract_turnover': {'sheet_workers': args.sheet_workers, **stream},
+            'extract_accessories': stream}
+
+
+def with_period(options, period):
+    """Параметры экстракторов + период отчёта для PERIOD_EXTRACTORS (None — не передаётся)"""
+    if period is None:
+        return options
+    return {**options, **{name: {**options.get(name, {}), 'period': period} for name in PERIOD_EXTRACTORS}}
+
+
+def html_options(args):
+    """Параметры finalize_html() из аргументов командной строки"""
+    return {'minify': not args.no_minify, 'max_bytes': int(args.max_kb * 1024)}
+
+
+def print_metrics():
+    """Метрики запуска: logs/metrics_YYYYMMDD.jsonl + таблица по этапам"""
+    try:
+        metrics_file = METRICS.write()
+    except OSError as e:
+        log(f"Метрики: ОШИБКА записи: {e}")
+        metrics_file = None
+
+    print()
+    print(METRICS.summary_table())
+    if metrics_file:
+        log(f"Метрики сохранены: {metrics_file}")
+
+
+def main(argv=None):
     """Главная функция"""
+    global METRICS
+    args = parse_args(argv)
+    METRICS = PipelineMetrics('generate', trace_memory=args.trace_memory)
+    try:
+        return run(args)
+    finally:
+        print_metrics()
+
+
+def run(args):
+    """Полный цикл: извлечение, анализ, HTML, JSON"""
+    cache = ParseCache(enabled=not args.no_cache)
+    configure_cache(cache)
+    reset_input_indexes()
+    reset_parse_stats()
+    configure_engines(args.excel_engine, EXCEL_ENGINES)
+
     print("=" * 60)
     print("  KARI DASHBOARD GENERATOR v2.0")
     print("  Улучшенный дашборд с новой терминологией")
     print("=" * 60)
     print()
 
-    # Извлечение данных
-    regions = extract_regions_data()
-    turnover = extract_turnover_data()
-    accessories = extract_accessories_data()
-    structure = extract_structure_data()
-
-    # Анализ
-    analysis = analyze_data(regions, turnover, accessories, structure)
-
-    # Генерация HTML
-    html = generate_html(analysis)
+    if 'calamine' in (args.excel_engine, *EXCEL_ENGINES.values()) and not engine_available('calamine'):
+        log("⚠ calamine не установлен (pip install python-calamine) — файлы читаются через openpyxl")
+
+    timeouts = {name: args.extract_timeout for name in EXTRACTORS} if args.extract_timeout else None
+
+    # Граф зависимостей: пересчитываются только этапы, зависящие от изменившихся файлов
+    graph = None
+    if args.dry_run or (not args.full and not args.batch and cache.enabled):
+        graph, plan = plan_stages(args, None if args.full else cache)
+        if args.dry_run:
+            print_plan(graph, plan)
+            return None
+        analysis = run_incremental(graph, plan, args, timeouts)
+    else:
+        # Извлечение данных (период — один раз здесь, а не в каждом воркере)
+        with METRICS.stage('resolve_period'):
+            options = with_period(extract_options(args), resolve_period())
+        regions, turnover, accessories, structure = extract_all(options, args.extract_workers, timeouts)
+
+        if args.batch:
+            if not args.no_history:
+                with METRICS.stage('record_history'):
+                    record_history(regions.get('period') if regions else None,
+                                   regions, turnover, accessories, structure)
+            return main_batch((regions, turnover, accessories, structure), args)
+
+        # Анализ
+        with METRICS.stage('analyze_data'):
+            analysis = analyze_data(regions, turnover, accessories, structure)
+
+        # История недель (только новые файлы)
+        if not args.no_history:
+            with METRICS.stage('record_history'):
+                record_history(analysis['period'], regions, turnover, accessories, structure)
+
+    # Генерация HTML (сжатие и лимит размера для Telegram iOS)
+    try:
+        with METRICS.stage('generate_html') as stage:
+            sections = None
+            if graph is not None:
+                sections = {section: graph.value(f'html_{section}') for section in SECTION_SOURCES}
+            html = generate_html(analysis, sections=sections)
+            stage['html_bytes'] = len(html.encode('utf-8'))
+        with METRICS.stage('finalize_html') as stage:
+            html = finalize_html(html, **html_options(args))
+            stage['html_bytes'] = len(html.encode('utf-8'))
+    except SizeBudgetError as e:
+        log(f"ОШИБКА: {e}")
+        raise SystemExit(1)
 
     # Сохранение
     OUTPUT_DIR.mkdir(exist_ok=True)
@@ -1262,11 +1661,29 @@ def main():
 
     # Сохраняем также JSON с данными
     json_file = OUTPUT_DIR / "dashboard_data.json"
-    with open(json_file, 'w', encoding='utf-8') as f:
-        analysis_json = {k: v for k, v in analysis.items()}
-        json.dump(analysis_json, f, ensure_ascii=False, indent=2, default=str)
-
-    log(f"Данные сохранены: {json_file}")
+    try:
+        with METRICS.stage('json_dump', encoder=default_encoder()) as stage:
+            written = write_json(analysis, json_file, pretty=args.json_pretty, gzip_copy=args.json_gzip)
+            stage['json_bytes'] = json_file.stat().st_size
+            if args.json_gzip:
+                stage['gzip_bytes'] = written[-1].stat().st_size
+        log(f"Данные сохранены: {', '.join(str(path) for path in written)} ({default_encoder()})")
+    except TypeError as e:
+        # Дашборд уже сохранён — без файла данных рассылка всё равно возможна
+        log(f"Данные: ОШИБКА записи: {e}")
+
+    # Период для send_dashboard.py — чтобы бот не открывал Excel повторно
+    manifest_file = save_period_manifest(output_file, analysis['period'])
+    log(f"Манифест сохранён: {manifest_file}")
+    if cache.enabled:
+        log(f"Кэш разбора: {cache.hits} из кэша, {cache.misses} разобрано заново")
+    if graph is not None:
+        log(f"Граф зависимостей: пересчитано этапов {len(graph.ran)}, из кэша {len(graph.reused)}"
+            + (f" ({', '.join(graph.reused)})" if graph.reused else ""))
+        failed = [name for name in EXTRACTORS if name in graph.failed]
+        if failed:
+            log(f"Граф зависимостей: {', '.join(failed)} не извлечены — зависящие этапы не сохранены, "
+                "следующий запуск пересчитает их")
 
     print()
     print("=" * 60)
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+История еженедельных отчётов (SQLite)
+=====================================
+Каждый запуск generate_dashboard.py дописывает в history/history.sqlite
+нормализованные факты недели: регион / подразделение / категория /
+магазин → показатель → значение, с ключом периода из period_parser.
+
+Загрузка инкрементальная: файл учитывается по SHA-256 содержимого,
+уже загруженный файл (повторный запуск, архивная копия) пропускается,
+пересборка из всех архивов не нужна. Таблица только дописывается.
+
+Для трендов: load_trend() — выборка по индексу за миллисекунды.
+"""
+
+import re
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+
+from parse_cache import file_hash
+from region_filter import find_region_columns
+
+DEFAULT_HISTORY_PATH = Path(__file__).parent / "history" / "history.sqlite"
+
+MONTHS_GENITIVE = ['января', 'февраля', 'марта', 'апреля', 'мая', 'июня',
+                   'июля', 'августа', 'сентября', 'октября', 'ноября', 'декабря']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested_files (
+    sha256       TEXT PRIMARY KEY,
+    kind         TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    period       TEXT NOT NULL,
+    period_start TEXT,
+    rows         INTEGER NOT NULL,
+    ingested_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS facts (
+    period       TEXT NOT NULL,
+    period_start TEXT,
+    kind         TEXT NOT NULL,
+    level        TEXT NOT NULL,
+    region       TEXT,
+    division     TEXT,
+    store        TEXT,
+    category     TEXT,
+    metric       TEXT NOT NULL,
+    value        REAL,
+    file_sha256  TEXT NOT NULL REFERENCES ingested_files(sha256)
+);
+CREATE INDEX IF NOT EXISTS facts_trend ON facts(level, metric, period_start);
+CREATE INDEX IF NOT EXISTS facts_file ON facts(file_sha256);
+"""
+
+# Уровень фактов по типу отчёта
+KIND_LEVELS = {
+    'regions': 'region',
+    'turnover': 'category',
+    'accessories': 'store',
+    'structure': 'store',
+}
+
+# Отчёты без числовых показателей: каждая строка с магазином — факт «показатель = 1»
+# (сумма за неделю — число магазинов подразделения / региона)
+COUNT_METRICS = {
+    'structure': 'Магазинов',
+}
+
+# Колонки измерений по ключевым словам в названии
+DIMENSION_KEYWORDS = {
+    'region': ('регион',),
+    'division': ('подразд', 'дивизион', 'филиал'),
+    'store': ('магазин',),
+    'category': ('группа', 'категор'),
+}
+
+
+def period_start(period):
+    """
+    Дата начала периода в ISO формате (для сортировки)
+    "12-18 января 2026" → "2026-01-12", "18.01.2026" → "2026-01-18"
+    """
+    match = re.search(r'(\d{1,2})-\d{1,2}\s+([а-я]+)\s+(\d{4})', str(period), re.IGNORECASE)
+    if match and match.group(2).lower() in MONTHS_GENITIVE:
+        month = MONTHS_GENITIVE.index(match.group(2).lower()) + 1
+        try:
+            return date(int(match.group(3)), month, int(match.group(1))).isoformat()
+        except ValueError:
+            return None
+    try:
+        return datetime.strptime(str(period), "%d.%m.%Y").date().isoformat()
+    except ValueError:
+        return None
+
+
+def connect(path=DEFAULT_HISTORY_PATH):
+    """Соединение с хранилищем (создаётся при первом обращении)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _dimension_columns(df):
+    """{измерение: колонка} по названиям колонок"""
+    dims = {}
+    for dim, keywords in DIMENSION_KEYWORDS.items():
+        columns = find_region_columns(df, keywords=keywords, fallback=False)
+        if columns:
+            dims[dim] = columns[0]
+    return dims
+
+
+def _dimension_values(series):
+    """Значения измерения строками; коды магазинов 201.0 (float из-за пропусков) → 201"""
+    if pd.api.types.is_float_dtype(series):
+        values = series.dropna()
+        if (values == values.round()).all():
+            series = series.astype('Int64')
+    return series.astype(str).where(series.notna())
+
+
+def normalize_facts(kind, df):
+    """
+    Факты отчёта в длинном формате:
+    level, region, division, store, category, metric, value
+    """
+    dims = _dimension_columns(df)
+    if kind == 'turnover':
+        # Первая колонка — группа товара, лист — подразделение
+        dims.setdefault('category', df.columns[0])
+        if 'Лист' in df.columns:
+            dims['division'] = 'Лист'
+    elif kind == 'regions':
+        dims.setdefault('region', df.columns[0])
+
+    dim_columns = list(dict.fromkeys(dims.values()))
+    metric_columns = [col for col in df.columns
+                      if col not in dim_columns and pd.api.types.is_numeric_dtype(df[col])]
+    count_metric = COUNT_METRICS.get(kind)
+    if not metric_columns and not count_metric:
+        return pd.DataFrame()
+
+    frame = pd.DataFrame({dim: _dimension_values(df[col]) for dim, col in dims.items()},
+                         index=df.index)
+    for col in metric_columns:
+        frame[str(col)] = pd.to_numeric(df[col], errors='coerce')
+    if count_metric:
+        # Строки без магазина (итоги, пустые) не считаются
+        count = pd.Series(1.0, index=frame.index)
+        frame[count_metric] = count.where(frame['store'].notna()) if 'store' in frame else count
+
+    facts = frame.melt(id_vars=list(dims), var_name='metric', value_name='value')
+    facts = facts[facts['value'].notna()]
+    for dim in DIMENSION_KEYWORDS:
+        if dim not in facts.columns:
+            facts[dim] = None
+    facts['level'] = KIND_LEVELS.get(kind, kind)
+    return facts[['level', 'region', 'division', 'store', 'category', 'metric', 'value']]
+
+
+def ingest(conn, kind, file_path, df, period):
+    """
+    Загрузка одного отчёта; False — файл с таким содержимым уже в истории
+    """
+    sha256 = file_hash(file_path)
+    if conn.execute("SELECT 1 FROM ingested_files WHERE sha256 = ?", (sha256,)).fetchone():
+        return False
+
+    facts = normalize_facts(kind, df)
+    start = period_start(period)
+    with conn:
+        conn.execute(
+            "INSERT INTO ingested_files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (sha256, kind, Path(file_path).name, period, start, len(facts),
+             datetime.now().isoformat(timespec='seconds')))
+        if len(facts):
+            facts = facts.assign(period=period, period_start=start, kind=kind, file_sha256=sha256)
+            conn.executemany(
+                "INSERT INTO facts (period, period_start, kind, level, region, division, store, "
+                "category, metric, value, file_sha256) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                facts[['period', 'period_start', 'kind', 'level', 'region', 'division', 'store',
+                       'category', 'metric', 'value', 'file_sha256']].itertuples(index=False, name=None))
+    return True
+
+
+def ingested(hashes, path=DEFAULT_HISTORY_PATH):
+    """Какие из SHA-256 файлов уже загружены в историю (без загрузки таблиц)"""
+    hashes = list(hashes)
+    if not hashes or not Path(path).exists():
+        return set()
+    conn = connect(path)
+    try:
+        rows = conn.execute(f"SELECT sha256 FROM ingested_files WHERE sha256 IN ({','.join('?' * len(hashes))})",
+                            hashes).fetchall()
+    finally:
+        conn.close()
+    return {row[0] for row in rows}
+
+
+def ingest_week(period, sources, path=DEFAULT_HISTORY_PATH):
+    """
+    Загрузка отчётов недели
+    sources — {тип отчёта: (путь к файлу, DataFrame)}
+    Возвращает {тип отчёта: True (загружен) / False (уже был)}
+    """
+    conn = connect(path)
+    try:
+        return {kind: ingest(conn, kind, file_path, df, period)
+                for kind, (file_path, df) in sources.items()}
+    finally:
+        conn.close()
+
+
+def load_trend(level, metric, path=DEFAULT_HISTORY_PATH, since=None, **dims):
+    """
+    Динамика показателя по неделям
+    dims — фильтры: region=, division=, store=, category=
+    """
+    query = ("SELECT period, period_start, region, division, store, category, value "
+             "FROM facts WHERE level = ? AND metric = ?")
+    params = [level, metric]
+    if since:
+        query += " AND period_start >= ?"
+        params.append(since)
+    for dim, value in dims.items():
+        if dim not in DIMENSION_KEYWORDS:
+            raise ValueError(f"Неизвестное измерение: {dim}")
+        query += f" AND {dim} = ?"
+        params.append(str(value))
+    query += " ORDER BY period_start"
+
+    conn = connect(path)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+
+def list_periods(path=DEFAULT_HISTORY_PATH):
+    """Загруженные периоды: период, дата начала, число файлов"""
+    conn = connect(path)
+    try:
+        return pd.read_sql_query(
+            "SELECT period, period_start, COUNT(*) AS files FROM ingested_files "
+            "GROUP BY period, period_start ORDER BY period_start", conn)
+    finally:
+        conn.close()
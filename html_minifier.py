@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Сжатие HTML дашборда и контроль размера
+=======================================
+Telegram iOS открывает дашборд во встроенном просмотрщике — страница
+должна укладываться в 50 KB. После рендера:
+
+- CSS в <style>: без комментариев, лишних пробелов и последних ';'
+- JS в <script>: только отступы и пустые строки (переводы строк
+  остаются — автоматическая вставка ';' в ES5 не ломается, код не
+  переписывается)
+- HTML: комментарии удаляются, пробелы вокруг блочных тегов убираются,
+  остальные серии пробелов схлопываются до одного (пробел между
+  строчными элементами, например названием и бейджем, сохраняется)
+- одинаковые style="..." (встречающиеся больше одного раза) выносятся
+  в CSS-класс с !important — как у inline-стиля, вид не меняется
+
+check_budget() — понятная ошибка, если страница всё равно больше лимита.
+"""
+
+import re
+from collections import Counter
+
+# Лимит размера дашборда для Telegram iOS
+MAX_HTML_BYTES = 50 * 1024
+
+# Теги, пробелы вокруг которых не видны на странице
+BLOCK_TAGS = (
+    'html', 'head', 'body', 'meta', 'title', 'link', 'style', 'script', 'div', 'p', 'br',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'table', 'thead', 'tbody', 'tfoot',
+    'tr', 'td', 'th', 'details', 'summary', '!DOCTYPE',
+)
+
+# Префикс классов для вынесенных inline-стилей
+STYLE_CLASS_PREFIX = 'is'
+
+_RAW_BLOCK = re.compile(r'(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)', re.IGNORECASE | re.DOTALL)
+_BLOCK_TAG = re.compile(r'\s*(</?(?:' + '|'.join(re.escape(tag) for tag in BLOCK_TAGS) + r')\b[^>]*>)\s*',
+                        re.IGNORECASE)
+_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+_SPACES = re.compile(r'\s+')
+_STYLE_ATTR = re.compile(r'\sstyle="([^"]*)"')
+_TAG_WITH_STYLE = re.compile(r'<([a-zA-Z][a-zA-Z0-9]*)([^>]*?)\sstyle="([^"]*)"([^>]*)>')
+
+
+class SizeBudgetError(ValueError):
+    """Дашборд больше допустимого размера"""
+
+
+def minify_css(css):
+    """Сжатие CSS: комментарии, пробелы, последняя ';' в блоке"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = _SPACES.sub(' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def minify_js(js):
+    """Сжатие JS без переписывания кода: отступы и пустые строки"""
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def _normalize_style(style):
+    """Стиль атрибута в каноническом виде: 'a:1;b:2'"""
+    declarations = [d.strip() for d in style.split(';') if d.strip()]
+    return ';'.join(re.sub(r'\s*:\s*', ':', d, count=1) for d in declarations)
+
+
+def dedupe_inline_styles(html, min_count=2):
+    """
+    Повторяющиеся style="..." → классы .is1, .is2, ... в первом <style>
+    Возвращает HTML (без изменений, если выносить нечего или нет <style>)
+    """
+    counts = Counter(_normalize_style(style) for style in _STYLE_ATTR.findall(html))
+    repeated = [style for style, count in counts.most_common() if style and count >= min_count]
+    if not repeated or '</style>' not in html:
+        return html
+
+    classes = {style: f'{STYLE_CLASS_PREFIX}{i}' for i, style in enumerate(repeated, 1)}
+
+    def replace(match):
+        tag, before, style, after = match.groups()
+        name = classes.get(_normalize_style(style))
+        if not name:
+            return match.group(0)
+        attrs = before + after
+        existing = re.search(r'\sclass="([^"]*)"', attrs)
+        if existing:
+            attrs = attrs.replace(existing.group(0), f' class="{existing.group(1)} {name}"', 1)
+        else:
+            attrs = f' class="{name}"' + attrs
+        return f'<{tag}{attrs}>'
+
+    html = _TAG_WITH_STYLE.sub(replace, html)
+    rules = ''.join(
+        f".{name}{{{';'.join(d + '!important' for d in style.split(';'))}}}"
+        for style, name in classes.items())
+    return html.replace('</style>', rules + '</style>', 1)
+
+
+def minify_html(html, dedupe_styles=True):
+    """Сжатие страницы: CSS, JS, пробелы в разметке, повторяющиеся inline-стили"""
+    raw_blocks = []
+
+    def stash(match):
+        opening, tag, body, closing = match.groups()
+        tag = tag.lower()
+        if tag == 'style':
+            body = minify_css(body)
+        elif tag == 'script':
+            body = minify_js(body)
+        raw_blocks.append(opening + body + closing)
+        return f'\x00{len(raw_blocks) - 1}\x00'
+
+    html = _RAW_BLOCK.sub(stash, html)
+    html = _COMMENT.sub('', html)
+    html = _SPACES.sub(' ', html)
+    html = _BLOCK_TAG.sub(r'\1', html)
+    html = re.sub(r'\x00(\d+)\x00', lambda m: raw_blocks[int(m.group(1))], html).strip()
+
+    if dedupe_styles:
+        html = dedupe_inline_styles(html)
+    return html
+
+
+def check_budget(html, max_bytes=MAX_HTML_BYTES, name='Дашборд'):
+    """Размер страницы в байтах; SizeBudgetError, если больше max_bytes"""
+    size = len(html.encode('utf-8'))
+    if max_bytes and size > max_bytes:
+        raise SizeBudgetError(
+            f"{name}: {size / 1024:.1f} KB при лимите {max_bytes / 1024:.1f} KB "
+            f"(превышение {(size - max_bytes) / 1024:.1f} KB) — Telegram iOS может не открыть файл. "
+            f"Сократите секции или увеличьте лимит (--max-kb)")
+    return size
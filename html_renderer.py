@@ -0,0 +1,460 @@
+# -*- coding: utf-8 -*-
+"""
+Сборка HTML дашборда
+====================
+Оболочка страницы (dashboard_template.PAGE_TEMPLATE) разбирается на
+куски один раз — при создании DashboardRenderer; дальше страница
+собирается склейкой готовых кусков и значений полей.
+
+Каждая секция (таблица регионов, категории, перекосы, действия, ...)
+строится отдельно из своей части analysis и кэшируется по хэшу этих
+данных: при пакетной генерации по регионам или персональных рассылках
+неизменившиеся секции не перестраиваются.
+
+Результат побайтно совпадает с прежним f-string шаблоном generate_html().
+Пустой блок (отчёт разобран, строк нет) — строка «Нет данных», а не
+примеры; значение, которого нет в данных, — «—».
+"""
+
+import hashlib
+import pickle
+import string
+from collections import OrderedDict
+from datetime import datetime
+
+from dashboard_template import PAGE_TEMPLATE
+
+# Сколько отрендеренных секций держать в кэше
+SECTION_CACHE_SIZE = 512
+
+# Пустой блок (отчёт разобран, но строк нет) и отсутствующее значение
+NO_DATA = 'Нет данных'
+NO_VALUE = '—'
+
+
+def compile_template(template):
+    """Шаблон str.format → список (текст, имя поля или None)"""
+    return [(literal, field) for literal, field, _, _ in string.Formatter().parse(template)]
+
+
+def render_template(compiled, values):
+    """Склейка разобранного шаблона со значениями полей"""
+    parts = []
+    for literal, field in compiled:
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(values[field]))
+    return ''.join(parts)
+
+
+def data_hash(data):
+    """Хэш входных данных секции (pickle — быстрее json на списках словарей)"""
+    return hashlib.blake2b(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL), digest_size=16).digest()
+
+
+def growth_class(growth):
+    if growth is None:
+        return ''
+    return 'growth-pos' if growth > 0 else 'growth-neg'
+
+
+def format_growth(growth):
+    if growth is None:
+        return NO_VALUE
+    sign = '+' if growth > 0 else ''
+    return f"{sign}{growth}%"
+
+
+def growth_words(growth):
+    """'рост +5.2%' / 'падение -18.3%'"""
+    return f"{'рост' if growth > 0 else 'падение'} {format_growth(growth)}"
+
+
+def value_or_dash(value, suffix=''):
+    """Значение поля страницы: '—', если его нет в данных"""
+    return NO_VALUE if value is None else f"{value}{suffix}"
+
+
+def empty_row(columns):
+    """Строка таблицы без данных"""
+    return f'<tr><td colspan="{columns}" class="no-data">{NO_DATA}</td></tr>'
+
+
+def season_badge(season):
+    if season == 'СЕЗОН':
+        return '<span class="badge badge-season">СЕЗОН</span>'
+    elif season == 'НЕСЕЗОН':
+        return '<span class="badge badge-offseason">НЕСЕЗОН</span>'
+    return ''
+
+
+class DashboardRenderer:
+    """Рендерер дашборда: разобранная оболочка + кэш секций"""
+
+    def __init__(self, kop_good_max, kop_warn_max, template=PAGE_TEMPLATE, cache_size=SECTION_CACHE_SIZE):
+        self.kop_good_max = kop_good_max
+        self.kop_warn_max = kop_warn_max
+        self.shell = compile_template(template)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # Секция → (часть analysis, построение HTML)
+        self.sections = {
+            'actions_html': (lambda a, region: a['actions'], self.actions_html),
+            'regions_rows': (lambda a, region: [a['regions_data'], region], self.regions_rows),
+            'regions_note': (lambda a, region: [a['regions_data'], region, a['nnv_rank'], a['nnv_growth'],
+                                                a['company_growth']], self.regions_note),
+            'divisions_rows': (lambda a, region: a['divisions'], self.divisions_rows),
+            'divisions_note': (lambda a, region: a['divisions'], self.divisions_note),
+            'key_categories_rows': (lambda a, region: a['key_categories'], self.key_categories_rows),
+            'key_categories_note': (lambda a, region: a['key_categories'], self.key_categories_note),
+            'growth_rows': (lambda a, region: a['growth_deficit'], self.growth_rows),
+            'illiquid_rows': (lambda a, region: a['illiquid_stock'], self.illiquid_rows),
+            'imbalances_html': (lambda a, region: a['imbalances'], self.imbalances_html),
+            'top_stores_rows': (lambda a, region: a['top_stores'], self.top_stores_rows),
+            'worst_stores_rows': (lambda a, region: a['worst_stores'], self.worst_stores_rows),
+            'acc_key_rows': (lambda a, region: a['accessories']['key_categories'], self.acc_key_rows),
+            'acc_growth_rows': (lambda a, region: a['accessories']['growth_categories'], self.acc_growth_rows),
+            'acc_note': (lambda a, region: [a['accessories']['key_categories'],
+                                            a['accessories']['growth_categories']], self.acc_note),
+            'plan_html': (lambda a, region: [a['imbalances'], a['growth_deficit'], a['illiquid_stock'],
+                                             a['top_stores'], a['worst_stores']], self.plan_html),
+        }
+
+    def kop_class(self, kop):
+        if kop is None:
+            return ''
+        if kop < self.kop_good_max:
+            return 'kop-good'
+        elif kop < self.kop_warn_max:
+            return 'kop-warn'
+        return 'kop-bad'
+
+    # Секции
+
+    def regions_rows(self, data):
+        regions_data, region = data
+        if not regions_data:
+            return empty_row(4)
+        return '\n'.join([
+            f'''<tr class="{'highlight-row' if r['name'] == region else ''}">
+            <td>{r['rank']}</td>
+            <td><strong>{r['name']}</strong></td>
+            <td>{r['share']}%</td>
+            <td class="{growth_class(r['growth'])}">{format_growth(r['growth'])}</td>
+        </tr>''' for r in regions_data
+        ])
+
+    def regions_note(self, data):
+        regions_data, region, rank, growth, company_growth = data
+        own = next((r for r in regions_data if r['name'] == region), None)
+        if own is None or rank is None:
+            return ''
+        note = f"{region} занимает <strong>{rank} место</strong> по доле в обороте ({own['share']}%)"
+        if growth is not None:
+            note += f" и показывает {growth_words(growth)}"
+            if company_growth is not None:
+                note += f" при {format_growth(company_growth)} по компании"
+        return f'''<div class="note">
+                {note}.
+            </div>'''
+
+    def divisions_rows(self, divisions):
+        if not divisions:
+            return empty_row(5)
+        return '\n'.join([
+            f'''<tr>
+            <td><strong>{d['name']}</strong></td>
+            <td>{d['stores']}</td>
+            <td>{value_or_dash(d['share'], '%')}</td>
+            <td class="{growth_class(d['growth'])}">{format_growth(d['growth'])}</td>
+            <td class="{self.kop_class(d['kop'])}">{value_or_dash(d['kop'])}</td>
+        </tr>''' for d in divisions
+        ])
+
+    def divisions_note(self, divisions):
+        """Лидер по приросту и два худших по приросту при КОП выше нормы"""
+        rated = [d for d in divisions if d['growth'] is not None and d['kop'] is not None]
+        if not rated:
+            return ''
+
+        def describe(d):
+            return f"{d['name']} (КОП {d['kop']}, {growth_words(d['growth'])})"
+
+        leader = max(rated, key=lambda d: d['growth'])
+        lines = [f"<strong>Лидеры:</strong> {describe(leader)}"]
+        problems = sorted((d for d in rated if d['kop'] > self.kop_good_max and d is not leader),
+                          key=lambda d: d['growth'])[:2]
+        if problems:
+            lines.append(f"<strong>Проблемные:</strong> {', '.join(describe(d) for d in problems)}")
+        return f'''<div class="note">
+                {'<br>'.join(lines)}
+            </div>'''
+
+    def key_categories_rows(self, categories):
+        if not categories:
+            return empty_row(5)
+        return '\n'.join([
+            f'''<tr>
+            <td>{i+1}</td>
+            <td>{cat['name']} {season_badge(cat.get('season'))}</td>
+            <td>{cat['share']}%</td>
+            <td class="{growth_class(cat['growth'])}">{format_growth(cat['growth'])}</td>
+            <td class="{self.kop_class(cat['kop'])}">{cat['kop']}</td>
+        </tr>''' for i, cat in enumerate(categories)
+        ])
+
+    def key_categories_note(self, categories):
+        if not categories:
+            return ''
+        total = round(sum(cat['share'] for cat in categories if cat['share'] is not None))
+        lines = [f"<strong>Вывод:</strong> ТОП-{len(categories)} дают ~{total}% оборота."]
+        seasonal = [cat['name'].lower() for cat in categories if cat.get('season') == 'СЕЗОН']
+        if seasonal:
+            lines.append(f"Сезонные категории ({', '.join(seasonal)}) в приоритете.")
+        overstock = [cat for cat in categories if cat['kop'] is not None and cat['kop'] >= self.kop_warn_max]
+        if overstock:
+            lines.append('Затоваривание: ' + ', '.join(f"{cat['name'].lower()} (КОП {cat['kop']})" for cat in overstock)
+                         + ' — нужна акция или перемещение.')
+        return f'''<div class="note">
+                {'<br>'.join(lines)}
+            </div>'''
+
+    def growth_rows(self, categories):
+        if not categories:
+            return empty_row(5)
+        return '\n'.join([
+            f'''<tr>
+            <td>{cat['name']} {season_badge(cat.get('season'))}</td>
+            <td>{cat['share']}%</td>
+            <td class="growth-pos">+{cat['growth']}%</td>
+            <td class="kop-bad">{cat['kop']}</td>
+            <td><span class="badge {'badge-urgent' if cat['priority'] == 'Высокий' else 'badge-important'}">{cat['priority']}</span></td>
+        </tr>''' for cat in categories
+        ])
+
+    def illiquid_rows(self, items):
+        if not items:
+            return empty_row(4)
+        return '\n'.join([
+            f'''<tr>
+            <td>{item['name']} {season_badge(item.get('season'))}</td>
+            <td class="kop-bad">{item['weeks']} нед</td>
+            <td>{item['stock']}</td>
+            <td>{item['action']}</td>
+        </tr>''' for item in items
+        ])
+
+    def imbalances_html(self, imbalances):
+        if not imbalances:
+            return f'<p class="no-data">{NO_DATA}</p>'
+        html = ''
+        for imb in imbalances:
+            surplus_info = ', '.join([f"{s['name']} (КОП {s['kop']})" for s in imb['surplus']])
+            deficit_info = ', '.join([f"{d['name']} (КОП {d['kop']})" for d in imb['deficit']])
+
+            html += f'''
+        <div class="imbalance-card">
+            <div class="imbalance-header">
+                <strong>{imb['category']}</strong> {season_badge(imb.get('season'))}
+                <span class="share-badge">Доля: {imb['share']}%</span>
+            </div>
+            <div class="imbalance-body">
+                <div class="imbalance-row">
+                    <span class="label-surplus">Затовар:</span> {surplus_info}
+                </div>
+                <div class="imbalance-row">
+                    <span class="label-deficit">Дефицит:</span> {deficit_info}
+                </div>
+                <div class="imbalance-action">
+                    <strong>Действие:</strong> {imb['action']}
+                    <span class="deadline">Срок: {imb['deadline']}</span>
+                </div>
+            </div>
+        </div>
+        '''
+        return html
+
+    def top_stores_rows(self, stores):
+        if not stores:
+            return empty_row(6)
+        return '\n'.join([
+            f'''<tr>
+            <td>{i+1}</td>
+            <td><strong>{store['id']}</strong></td>
+            <td>{store['division']}</td>
+            <td class="{growth_class(store['growth'])}">{format_growth(store['growth'])}</td>
+            <td class="{self.kop_class(store['kop'])}">{store['kop']}</td>
+            <td><span class="note-badge">{store['note']}</span></td>
+        </tr>''' for i, store in enumerate(stores)
+        ])
+
+    def worst_stores_rows(self, stores):
+        if not stores:
+            return empty_row(6)
+        return '\n'.join([
+            f'''<tr>
+            <td>{i+1}</td>
+            <td><strong>{store['id']}</strong></td>
+            <td>{store['division']}</td>
+            <td class="growth-neg">{store['growth']}%</td>
+            <td class="{self.kop_class(store['kop'])}">{store['kop']}</td>
+            <td><span class="problem-badge">{store['problem']}</span></td>
+        </tr>''' for i, store in enumerate(stores)
+        ])
+
+    def acc_key_rows(self, categories):
+        if not categories:
+            return empty_row(4)
+        return '\n'.join([
+            f'''<tr>
+            <td>{cat['name']}</td>
+            <td>{cat['share']}%</td>
+            <td class="{growth_class(cat['growth'])}">{format_growth(cat['growth'])}</td>
+            <td class="{self.kop_class(cat['kop'])}">{cat['kop']}</td>
+        </tr>''' for cat in categories
+        ])
+
+    def acc_growth_rows(self, categories):
+        if not categories:
+            return empty_row(4)
+        return '\n'.join([
+            f'''<tr>
+            <td>{cat['name']}</td>
+            <td>{cat['share']}%</td>
+            <td class="growth-pos">+{cat['growth']}%</td>
+            <td class="kop-bad">{cat['kop']}</td>
+        </tr>''' for cat in categories
+        ])
+
+    def acc_note(self, data):
+        key_categories, growth_categories = data
+        lines = []
+        if growth_categories:
+            lines.append(', '.join(f"{cat['name']} ({format_growth(cat['growth'])})" for cat in growth_categories)
+                         + ' — пополнить.')
+        if key_categories:
+            lines.append(f"{key_categories[0]['name']} — основа категории, нужен акцент на промо.")
+        if not lines:
+            return ''
+        return f'''<div class="note">
+                <strong>Вывод:</strong> {'<br>'.join(lines)}
+            </div>'''
+
+    def plan_html(self, data):
+        """План действий на неделю из перекосов, дефицита, неликвидов и рейтинга магазинов"""
+        imbalances, growth_deficit, illiquid, top_stores, worst_stores = data
+
+        def names(places):
+            return ', '.join(dict.fromkeys(place['name'] for place in places))
+
+        urgent = [f"Перераспределить {imb['category'].lower()}: {names(imb['surplus'])} → {names(imb['deficit'])}"
+                  for imb in imbalances[:2]]
+        if growth_deficit:
+            urgent.append(f"Заявка на {', '.join(cat['name'].lower() for cat in growth_deficit[:3])} "
+                          f"(дефицит при росте)")
+
+        week = []
+        if illiquid:
+            week.append(f"Запустить распродажу неликвидов: {', '.join(names(illiquid[:3]))}")
+        if worst_stores:
+            week.append(f"Ревизия ассортимента в худших магазинах: {', '.join(s['id'] for s in worst_stores)}")
+
+        later = ['Подготовка к новой коллекции — освободить склады']
+        if top_stores:
+            best = top_stores[0]
+            later.append(f"Анализ лучших практик магазина {best['id']} ({best['division']}) для тиражирования")
+
+        def items(lines, last=False):
+            margin = '' if last else ' margin-bottom:12px;'
+            rows = '\n'.join(f'                <li>{line}</li>' for line in lines) or \
+                f'                <li class="no-data">{NO_DATA}</li>'
+            return f'''<ul style="margin-left:20px;{margin}">
+{rows}
+            </ul>'''
+
+        return f'''<h4 style="font-size:14px; margin-bottom:8px;">Сегодня-завтра (срочно):</h4>
+            {items(urgent)}
+
+            <h4 style="font-size:14px; margin-bottom:8px;">Эта неделя:</h4>
+            {items(week)}
+
+            <h4 style="font-size:14px; margin-bottom:8px;">Планирование (следующая неделя):</h4>
+            {items(later, last=True)}'''
+
+    def actions_html(self, actions):
+        def action_card(action):
+            type_class = {
+                'urgent': 'urgent',
+                'important': '',
+                'opportunity': 'success'
+            }.get(action['type'], '')
+
+            badge_class = {
+                'urgent': 'badge-urgent',
+                'important': 'badge-important',
+                'opportunity': 'badge-opportunity'
+            }.get(action['type'], '')
+
+            return f'''
+        <div class="action-card {type_class}">
+            <div class="action-title">
+                <span class="badge {badge_class}">{action['badge']}</span>
+                {action['title']}
+            </div>
+            <div class="action-desc">
+                <div class="action-line"><span class="action-label">Проблема:</span> {action['problem']}</div>
+                <div class="action-line"><span class="action-label">Действие:</span> {action['action']}</div>
+                <div class="action-line"><span class="action-label">Срок:</span> <strong>{action['deadline']}</strong></div>
+                <div class="action-line"><span class="action-label">Ответственный:</span> {action['responsible']}</div>
+                <div class="action-line"><span class="action-label">Эффект:</span> {action['effect']}</div>
+            </div>
+        </div>
+        '''
+
+        if not actions:
+            return f'<p class="no-data">{NO_DATA}</p>'
+        return '\n'.join([action_card(a) for a in actions])
+
+    # Сборка
+
+    def section(self, name, data):
+        """HTML секции из кэша или построенный заново"""
+        key = (name, data_hash(data))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+
+        self.misses += 1
+        html = self.sections[name][1](data)
+        self._cache[key] = html
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return html
+
+    def render(self, analysis, region, region_name, generated_at=None, sections=None):
+        """Страница дашборда (sections — уже построенные секции {имя: HTML}, остальные строятся здесь)"""
+        sections = sections or {}
+        values = {name: sections[name] if name in sections else self.section(name, select(analysis, region))
+                  for name, (select, _) in self.sections.items()}
+        values.update({
+            'region': region,
+            'region_name': region_name,
+            'period': analysis['period'],
+            'stores_count': value_or_dash(analysis['stores_count']),
+            'total_regions': value_or_dash(analysis['total_regions']),
+            'company_growth': value_or_dash(analysis['company_growth'], '%'),
+            'nnv_growth': value_or_dash(analysis['nnv_growth'], '%'),
+            'nnv_rank': value_or_dash(analysis['nnv_rank']),
+            'divisions_count': len(analysis['divisions']),
+            'acc_share': value_or_dash(analysis['accessories'].get('share'), '%'),
+            'acc_avg_kop': value_or_dash(analysis['accessories'].get('avg_kop')),
+            'acc_growth': value_or_dash(analysis['accessories'].get('growth'), '%'),
+            'notes_html': ''.join(f'<div class="note no-data">{note}</div>'
+                                  for note in analysis.get('notes', [])),
+            'generated_at': (generated_at or datetime.now()).strftime('%d.%m.%Y %H:%M'),
+        })
+        return render_template(self.shell, values)
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Индекс входных Excel файлов
+===========================
+Макрос Outlook складывает в input/ и архивные вложения, дерево растёт
+каждую неделю. Вместо os.walk на каждый поиск каталог сканируется один
+раз за запуск, а поиск идёт по индексу.
+
+Если под паттерн подходит несколько файлов, выбирается самый свежий
+(по mtime, при равенстве — по пути), а не первый попавшийся в os.walk.
+Файлы, которые узнаются как другой отчёт, исключаются (exclude).
+"""
+
+import os
+from collections import namedtuple
+from pathlib import Path
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+
+# name и folder — в casefold для сравнения без учёта регистра
+InputFile = namedtuple('InputFile', ['path', 'name', 'folder', 'mtime'])
+
+
+class InputIndex:
+    """Индекс Excel файлов каталога: одно сканирование на запуск"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.files = []
+        self.scan()
+
+    def scan(self):
+        """Полное сканирование каталога (повторно — после появления новых файлов)"""
+        files = []
+        for root, dirs, names in os.walk(self.directory):
+            folder = Path(root).relative_to(self.directory).as_posix().casefold()
+            for name in names:
+                folded = name.casefold()
+                # ~$ — файлы блокировки открытых в Excel книг
+                if not folded.endswith(EXCEL_EXTENSIONS) or folded.startswith('~$'):
+                    continue
+                path = Path(root) / name
+                try:
+                    mtime = path.stat().st_mtime
+                except OSError:
+                    continue
+                files.append(InputFile(path, folded, '' if folder == '.' else folder, mtime))
+        self.files = files
+        return files
+
+    def find_all(self, pattern, directory=None, exclude=()):
+        """
+        Все файлы с паттерном в имени, от самого свежего к старому
+        exclude — (паттерн, каталог) чужих файлов: с паттерном в имени или внутри каталога
+        """
+        pattern = pattern.casefold()
+        prefix = self._folder_prefix(directory)
+        if prefix is None:
+            return []
+
+        excluded = [(other.casefold(), self._folder_prefix(folder) if folder else None)
+                    for other, folder in exclude]
+        matches = [f for f in self.files
+                   if pattern in f.name and self._within(f, prefix)
+                   and not any(other in f.name or (folder and self._within(f, folder))
+                               for other, folder in excluded)]
+        return sorted(matches, key=lambda f: (f.mtime, str(f.path)), reverse=True)
+
+    def find(self, pattern, directory=None, exclude=()):
+        """Самый свежий файл с паттерном в имени (или None)"""
+        matches = self.find_all(pattern, directory, exclude)
+        return matches[0].path if matches else None
+
+    def covers(self, directory):
+        """Лежит ли каталог внутри проиндексированного"""
+        return self._folder_prefix(directory) is not None
+
+    @staticmethod
+    def _within(input_file, prefix):
+        """Файл лежит в подпапке prefix ('' — в любой)"""
+        return not prefix or input_file.folder == prefix or input_file.folder.startswith(prefix + '/')
+
+    def _folder_prefix(self, directory):
+        """Подпапка индекса для поиска: '' — весь индекс, None — вне индекса"""
+        if directory is None:
+            return ''
+        try:
+            relative = Path(directory).relative_to(self.directory).as_posix().casefold()
+        except ValueError:
+            return None
+        return '' if relative == '.' else relative
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Запись dashboard_data.json
+==========================
+json.dump(indent=2, default=str) по всему analysis медленный на строках
+магазинов и истории, а numpy/pandas значения превращает в строки
+("12.5" вместо 12.5). Здесь — один кодировщик для файла данных дашборда:
+
+- orjson (pip install orjson), если установлен: в 5–10 раз быстрее
+  json и сразу пишет UTF-8 байты; иначе — стандартный json
+- Компактный JSON по умолчанию, с отступами — pretty=True (--json-pretty)
+- Копия dashboard_data.json.gz рядом (--json-gzip): gzip без времени
+  в заголовке — одинаковые данные дают одинаковый файл
+
+Схема значений (SCHEMA_VERSION) одна для обоих кодировщиков:
+numpy числа и bool → числа и bool JSON (float32 — кратчайшей записью: 0.1),
+NaN / inf / NaT / pd.NA → null, массивы → списки, DataFrame → список
+записей {колонка: значение}, Series → объект, даты и время → ISO 8601, timedelta → секунды,
+Decimal → число, Path → строка. Значение другого типа — TypeError:
+новое поле analysis должно попасть в схему, а не молча стать str().
+"""
+
+import gzip
+import json
+import math
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Версия схемы значений — пишется в файл (ключ 'schema_version')
+SCHEMA_VERSION = 1
+
+# Кодировщики: первый доступный — по умолчанию
+ENCODERS = ('orjson', 'json')
+
+GZIP_LEVEL = 6
+
+
+def encoder_available(encoder):
+    """Кодировщик можно использовать (orjson — если установлен)"""
+    return encoder == 'json' or (encoder == 'orjson' and orjson is not None)
+
+
+def default_encoder():
+    """orjson, если установлен, иначе json"""
+    return next(encoder for encoder in ENCODERS if encoder_available(encoder))
+
+
+def encode_value(value):
+    """Значение вне типов JSON → значение по схеме (default= для orjson и json)"""
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)
+    elif isinstance(value, np.timedelta64):
+        value = pd.Timedelta(value)
+    elif isinstance(value, np.generic):
+        if isinstance(value, np.floating) and value.dtype.itemsize < 8:
+            # float32 / float16 — кратчайшей записью, как у orjson: 0.1, а не 0.10000000149011612
+            value = float(str(value))
+        else:
+            value = value.item()
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return value
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind == 'f' and value.dtype.itemsize < 8:
+            return [encode_value(item) for item in value]
+        return value.tolist()
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict(orient='records')
+    if isinstance(value, pd.Series):
+        return value.to_dict()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Path):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    raise TypeError(f"Тип {type(value).__name__} не входит в схему dashboard_data.json")
+
+
+def to_schema(value):
+    """
+    Вся структура по схеме (для стандартного json: default= не вызывается для NaN,
+    ключей-чисел и подклассов str / int / float)
+    """
+    if isinstance(value, dict):
+        return {key if isinstance(key, str) else str(to_schema(key)): to_schema(item)
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_schema(item) for item in value]
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, int) and not isinstance(value, np.generic):
+        return int(value)
+    if isinstance(value, float) and not isinstance(value, np.generic):
+        return float(value) if math.isfinite(value) else None
+    return to_schema(encode_value(value))
+
+
+def dumps(data, pretty=False, encoder=None):
+    """JSON в UTF-8 байтах (encoder — 'orjson' / 'json', по умолчанию первый доступный)"""
+    encoder = encoder or default_encoder()
+    if encoder == 'orjson':
+        if orjson is None:
+            raise ValueError("orjson не установлен (pip install orjson)")
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=encode_value, option=option)
+    if encoder != 'json':
+        raise ValueError(f"Неизвестный кодировщик JSON: {encoder} (есть: {', '.join(ENCODERS)})")
+    if pretty:
+        text = json.dumps(to_schema(data), ensure_ascii=False, indent=2, allow_nan=False)
+    else:
+        text = json.dumps(to_schema(data), ensure_ascii=False, separators=(',', ':'), allow_nan=False)
+    return text.encode('utf-8')
+
+
+def loads(data):
+    """Разбор JSON (bytes / str) тем же кодировщиком"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json(data, path, pretty=False, gzip_copy=False, encoder=None):
+    """
+    Запись data в path (+ path.gz при gzip_copy); в файл добавляется schema_version
+    Возвращает записанные файлы
+    """
+    path = Path(path)
+    payload = dumps({**data, 'schema_version': SCHEMA_VERSION}, pretty, encoder)
+    path.write_bytes(payload)
+    written = [path]
+    if gzip_copy:
+        gz_path = path.with_name(path.name + '.gz')
+        gz_path.write_bytes(gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0))
+        written.append(gz_path)
+    return written
+
+
+def read_json(path):
+    """Чтение dashboard_data.json или его .gz копии"""
+    path = Path(path)
+    payload = path.read_bytes()
+    if path.suffix == '.gz':
+        payload = gzip.decompress(payload)
+    return loads(payload)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Кэш разобранных Excel файлов
+============================
+Ключ — SHA-256 содержимого файла + параметры чтения (лист, строка
+заголовка и т.п.), поэтому повторный запуск на тех же файлах (например,
+после сбоя отправки в Telegram) берёт готовые DataFrame с диска за
+миллисекунды. Изменился файл — изменился ключ, старые записи со временем
+вытесняются.
+
+Формат — pickle (сохраняет типы колонок pandas без доп. зависимостей).
+Вытеснение — LRU по размеру: при превышении MAX_CACHE_BYTES удаляются
+записи, к которым дольше всего не обращались.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = Path(__file__).parent / "cache"
+MAX_CACHE_BYTES = 200 * 1024 * 1024   # 200 MB
+
+# Меняется при изменении логики разбора — старые записи перестают совпадать
+CACHE_VERSION = 1
+
+_MISS = object()
+
+
+def file_hash(file_path):
+    """SHA-256 содержимого файла"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Дисковый кэш результатов разбора, адресуемый содержимым файла"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=MAX_CACHE_BYTES, enabled=True):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._hashes = {}
+
+    def content_hash(self, file_path):
+        """SHA-256 файла с запоминанием в пределах запуска (по размеру и mtime)"""
+        stat = Path(file_path).stat()
+        memo_key = (str(file_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._hashes:
+            self._hashes[memo_key] = file_hash(file_path)
+        return self._hashes[memo_key]
+
+    def key(self, file_path, **params):
+        """Ключ записи: содержимое файла + параметры чтения"""
+        parts = [str(CACHE_VERSION), pd.__version__, self.content_hash(file_path)]
+        parts += [f"{name}={params[name]!r}" for name in sorted(params)]
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return self.directory / f"{key}.pkl"
+
+    def has(self, key):
+        """Запись есть в кэше (без чтения)"""
+        return self.enabled and self._path(key).exists()
+
+    def get(self, key, default=None):
+        """Запись из кэша или default"""
+        value = self._read(key)
+        return default if value is _MISS else value
+
+    def _read(self, key):
+        if not self.enabled:
+            return _MISS
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return _MISS
+        except Exception:
+            # Повреждённая или нечитаемая запись — удаляем и читаем файл заново
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            return _MISS
+        os.utime(path)  # отметка использования для LRU
+        return value
+
+    def put(self, key, value):
+        """Сохранить запись (атомарно) и вытеснить лишнее"""
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, self._path(key))
+        except Exception:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def get_or_load(self, file_path, loader, **params):
+        """Результат из кэша, иначе loader() с сохранением в кэш"""
+        if not self.enabled:
+            return loader()
+        key = self.key(file_path, **params)
+        value = self._read(key)
+        if value is not _MISS:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = loader()
+        self.put(key, value)
+        return value
+
+    def evict(self):
+        """Удаление давно не использованных записей сверх лимита размера"""
+        entries = []
+        for path in self.directory.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        """Полная очистка кэша"""
+        for path in self.directory.glob('*.pkl'):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Метрики этапов конвейера
+========================
+Время, память, строки и прочитанные байты по каждому этапу: поиск
+файлов, extract_*, анализ, HTML, JSON, отправка в Telegram.
+
+    metrics = PipelineMetrics('generate')
+    with metrics.stage('extract_regions') as stage:
+        regions = extract_regions_data()
+        stage.update(rows=len(regions['df']), bytes=path.stat().st_size)
+    metrics.write()                  # logs/metrics_YYYYMMDD.jsonl
+    print(metrics.summary_table())
+
+Запись в JSONL — одна строка на этап, все запуски дня дописываются в
+один файл: рост времени и памяти по мере роста входных файлов видно
+из недели в неделю.
+
+Память:
+- rss_mb — пиковый RSS процесса на конец этапа (resource, на Windows — psutil, если установлен;
+  без обоих — None, а под таблицей этапов одна строка о том, что RSS недоступен)
+- peak_mb — пик Python-аллокаций внутри этапа (tracemalloc); tracemalloc
+  замедляет разбор в несколько раз, поэтому включается отдельно (trace_memory=True)
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Каталог логов метрик
+METRICS_DIR = Path(__file__).parent / "logs"
+
+# Поля записи, которые показываются в таблице рядом с названием этапа
+LABEL_KEYS = ('region', 'chat_id', 'pattern')
+
+# Строка под таблицей, если RSS взять неоткуда (Windows без psutil)
+RSS_UNAVAILABLE = "  RSS недоступен: нет модуля resource — установите psutil (pip install psutil)"
+
+
+def rss_available():
+    """Можно ли узнать RSS процесса (resource или psutil)"""
+    return resource is not None or psutil is not None
+
+
+def peak_rss_mb():
+    """Пиковый RSS процесса, MB (None — не удалось определить)"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux — KB, macOS — байты
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    return None
+
+
+def metrics_path(directory=METRICS_DIR, day=None):
+    """logs/metrics_YYYYMMDD.jsonl"""
+    return Path(directory) / f"metrics_{(day or datetime.now()).strftime('%Y%m%d')}.jsonl"
+
+
+class PipelineMetrics:
+    """Сборщик метрик одного запуска"""
+
+    def __init__(self, run='generate', directory=METRICS_DIR, trace_memory=False):
+        self.run = run
+        self.run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.directory = Path(directory)
+        self.trace_memory = trace_memory
+        self.records = []
+        self._stack = []
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, **info):
+        """
+        Замер этапа; в блоке доступна запись этапа — stage.update(rows=..., bytes=...)
+        Этапы могут быть вложенными (find_excel_file внутри extract_*)
+        """
+        record = {'stage': name, **info, 'depth': len(self._stack)}
+        self.records.append(record)
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+        self._stack.append(record)
+        started = time.perf_counter()
+        try:
+            yield record
+            record.setdefault('status', 'ok')
+        except BaseException as e:
+            record['status'] = 'error'
+            record['error'] = repr(e)
+            raise
+        finally:
+            record['seconds'] = time.perf_counter() - started
+            self._stack.pop()
+            if self.trace_memory:
+                # Пик этапа не меньше пиков вложенных этапов (reset_peak их сбрасывает)
+                peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                record['peak_mb'] = max(peak, record.get('peak_mb', 0.0))
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent['peak_mb'] = max(parent.get('peak_mb', 0.0), record['peak_mb'])
+            record['rss_mb'] = peak_rss_mb()
+
+    def record(self, name, seconds, **info):
+        """Этап, замеренный снаружи (например, отправка одному получателю)"""
+        record = {'stage': name, 'seconds': seconds, 'status': 'ok', **info,
+                  'depth': len(self._stack), 'rss_mb': peak_rss_mb()}
+        self.records.append(record)
+        return record
+
+    def merge(self, records):
+        """Записи другого сборщика (воркера пула) — вложенными в текущий этап"""
+        depth = len(self._stack)
+        for record in records:
+            self.records.append({**record, 'depth': record['depth'] + depth})
+
+    def write(self):
+        """Дописать записи запуска в logs/metrics_YYYYMMDD.jsonl; путь файла"""
+        path = metrics_path(self.directory)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().isoformat(timespec='seconds')
+        with open(path, 'a', encoding='utf-8') as f:
+            for record in self.records:
+                line = {'ts': timestamp, 'run': self.run, 'run_id': self.run_id, **record}
+                f.write(json.dumps(line, ensure_ascii=False, default=str) + '\n')
+        return path
+
+    def summary_table(self):
+        """Таблица этапов для консоли (вложенные — с отступом)"""
+        names = []
+        for record in self.records:
+            name = '  ' * record['depth'] + record['stage']
+            labels = [str(record[key]) for key in LABEL_KEYS if record.get(key) is not None]
+            if labels:
+                name += f" [{', '.join(labels)}]"
+            if record.get('status') == 'error':
+                name += ' (ошибка)'
+            names.append(name)
+
+        width = max([28] + [len(name) + 2 for name in names])
+        lines = [f"  {'Этап':<{width}}{'Время, с':>10}{'Строк':>10}{'Прочитано, KB':>15}"
+                 f"{'Пик, MB':>10}{'RSS, MB':>10}"]
+        for name, record in zip(names, self.records):
+            rows = record.get('rows')
+            size = record.get('bytes')
+            peak = record.get('peak_mb')
+            rss = record.get('rss_mb')
+            lines.append(
+                f"  {name:<{width}}{record['seconds']:>10.3f}"
+                f"{rows if rows is not None else '':>10}"
+                f"{f'{size / 1024:.1f}' if size is not None else '':>15}"
+                f"{f'{peak:.1f}' if peak is not None else '':>10}"
+                f"{f'{rss:.0f}' if rss is not None else '':>10}")
+        if not rss_available():
+            lines.append(RSS_UNAVAILABLE)
+        return '\n'.join(lines)
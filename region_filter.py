@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Векторный отбор строк по региону
+================================
+Вместо df.apply(lambda ...) по каждой ячейке строки проверяются только
+колонки региона/подразделения/магазина, и каждое уникальное значение
+колонки — один раз: названия подразделений и регионов повторяются в
+тысячах строк, поэтому проверка идёт по словарю значений (pd.factorize),
+а результат раскладывается обратно на строки массивом.
+
+Если в таблице есть колонка «Регион», регион ищется только в ней:
+короткие коды (ДВ, СЗ, ЮГ) и подразделения с названием региона
+("ННВ 1" в чужом регионе) иначе дают лишние строки.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Колонки, в которых ищется принадлежность к региону
+REGION_COLUMN_KEYWORDS = ('регион', 'подразд', 'дивизион', 'филиал', 'магазин')
+
+
+def find_region_columns(df, keywords=REGION_COLUMN_KEYWORDS, fallback=True):
+    """
+    Колонки региона/подразделения по названию
+    Если таких нет — все текстовые колонки (как при полном переборе ячеек),
+    при fallback=False — пустой список
+    """
+    columns = [col for col in df.columns
+               if any(keyword in str(col).lower() for keyword in keywords)]
+    if columns or not fallback:
+        return columns
+    return [col for col in df.columns
+            if df[col].dtype == object or isinstance(df[col].dtype, (pd.StringDtype, pd.CategoricalDtype))]
+
+
+def region_columns(df):
+    """Колонка «Регион», если есть, иначе все колонки региона/подразделения/магазина"""
+    return find_region_columns(df, keywords=('регион',), fallback=False) or find_region_columns(df)
+
+
+def value_labels(values):
+    """Значения как текст: 10267, 10267.0 и '10267 ' — одно и то же"""
+    return pd.Index(values).astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+
+
+def _column_mask(series, needles):
+    """Маска строк, где значение колонки содержит одну из подстрок"""
+    codes, uniques = pd.factorize(series)
+    if len(uniques) == 0:
+        return np.zeros(len(series), dtype=bool)
+
+    labels = pd.Index(uniques).astype(str).str.lower()
+    hits = np.zeros(len(uniques), dtype=bool)
+    for needle in needles:
+        hits |= np.asarray(labels.str.contains(needle, regex=False))
+
+    mask = np.zeros(len(series), dtype=bool)
+    valid = codes >= 0
+    mask[valid] = hits[codes[valid]]
+    return mask
+
+
+def region_mask(df, region, columns=None):
+    """
+    Булева маска строк региона
+    region — подстрока ('ннв') или несколько вариантов (('ннв', 'нижний'))
+    columns — колонки для поиска (по умолчанию find_region_columns)
+    """
+    needles = (region,) if isinstance(region, str) else tuple(region)
+    needles = tuple(needle.lower() for needle in needles)
+    if columns is None:
+        columns = find_region_columns(df)
+
+    mask = np.zeros(len(df), dtype=bool)
+    for col in columns:
+        mask |= _column_mask(df[col], needles)
+    return pd.Series(mask, index=df.index)
+
+
+def filter_region(df, region, columns=None):
+    """Строки региона"""
+    return df[region_mask(df, region, columns)]
+
+
+def member_mask(series, values):
+    """
+    Маска строк, где значение колонки — одно из values
+    (номера магазинов, названия подразделений из структуры региона)
+    """
+    codes, uniques = pd.factorize(series)
+    hits = np.asarray(value_labels(uniques).isin(value_labels(list(values))), dtype=bool)
+    mask = np.zeros(len(series), dtype=bool)
+    valid = codes >= 0
+    mask[valid] = hits[codes[valid]]
+    return pd.Series(mask, index=series.index)
+
+
+def split_by_region(df, regions, columns=None):
+    """{регион: строки региона} для нескольких регионов за один выбор колонок"""
+    if columns is None:
+        columns = find_region_columns(df)
+    return {region: filter_region(df, region, columns) for region in regions}
@@ -0,0 +1,10 @@
+@echo off
+chcp 65001 >nul
+REM =========================================================
+REM   KARI WATCH - Наблюдение за input\
+REM   Генерация + рассылка, как только пришли все три отчёта
+REM =========================================================
+
+cd /d "%~dp0"
+python watch_inputs.py %*
+pause
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Сезонность категорий
+====================
+Ключевые слова зимних и летних категорий компилируются один раз — по
+одному регулярному выражению-альтернации на сезон. Колонка названий
+размечается одним векторным вызовом по уникальным значениям
+(pd.factorize); разметка названий запоминается и общая у kind() и kinds().
+
+Что считать "в сезоне", задаёт календарь по месяцам отчёта: зимние
+категории — СЕЗОН с сентября по февраль, летние — с марта по август.
+"""
+
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Какой сезон идёт в продажах в каждом месяце (1 = январь)
+SEASON_CALENDAR = {
+    1: 'winter', 2: 'winter', 3: 'summer', 4: 'summer', 5: 'summer', 6: 'summer',
+    7: 'summer', 8: 'summer', 9: 'winter', 10: 'winter', 11: 'winter', 12: 'winter',
+}
+
+BADGE_IN_SEASON = 'СЕЗОН'
+BADGE_OFF_SEASON = 'НЕСЕЗОН'
+
+
+def compile_keywords(keywords):
+    """Одно регулярное выражение на список подстрок (длинные — первыми)"""
+    ordered = sorted({keyword.lower() for keyword in keywords}, key=len, reverse=True)
+    return re.compile('|'.join(map(re.escape, ordered))) if ordered else None
+
+
+class SeasonMatcher:
+    """
+    Сезон категории по названию: 'winter', 'summer' или None
+    При совпадении с обоими списками побеждает зима (как раньше)
+    """
+
+    def __init__(self, winter, summer, calendar=SEASON_CALENDAR):
+        self.winter = compile_keywords(winter)
+        self.summer = compile_keywords(summer)
+        self.calendar = dict(calendar)
+        self._memo = {}
+
+    def kind(self, name):
+        """Сезон одного названия (с запоминанием)"""
+        if name not in self._memo:
+            lower = str(name).lower()
+            if self.winter and self.winter.search(lower):
+                self._memo[name] = 'winter'
+            elif self.summer and self.summer.search(lower):
+                self._memo[name] = 'summer'
+            else:
+                self._memo[name] = None
+        return self._memo[name]
+
+    def kinds(self, names, values=('winter', 'summer')):
+        """
+        Сезоны колонки названий: каждое уникальное значение проверяется один раз
+        и запоминается (как в kind()) — следующие вызовы берут его из памяти
+        values — что ставить для (зима, лето), по умолчанию 'winter'/'summer'
+        """
+        names = pd.Series(names, dtype=object)
+        codes, uniques = pd.factorize(names)
+
+        new = [name for name in uniques if name not in self._memo]
+        if new:
+            labels = pd.Index(new, dtype=object).astype(str).str.lower()
+            winter = self._contains(labels, self.winter)
+            summer = self._contains(labels, self.summer)
+            found = np.select([winter, summer], ['winter', 'summer'], None)
+            self._memo.update(zip(new, found.tolist()))
+
+        replace = {'winter': values[0], 'summer': values[1], None: None}
+        unique_values = np.array([replace[self._memo[name]] for name in uniques] + [None], dtype=object)
+        # Код -1 (пропуск) указывает на последний элемент — None
+        return pd.Series(unique_values[codes], index=names.index, dtype=object)
+
+    @staticmethod
+    def _contains(labels, pattern):
+        if pattern is None or len(labels) == 0:
+            return np.zeros(len(labels), dtype=bool)
+        return np.asarray(labels.str.contains(pattern))
+
+    def badges(self, month=None):
+        """{сезон: бейдж} для месяца отчёта (по умолчанию — текущего)"""
+        current = self.calendar.get(month or datetime.now().month)
+        return {kind: BADGE_IN_SEASON if kind == current else BADGE_OFF_SEASON
+                for kind in ('winter', 'summer')}
+
+    def badge(self, name, month=None):
+        """'СЕЗОН' / 'НЕСЕЗОН' / None для одного названия"""
+        kind = self.kind(name)
+        return self.badges(month)[kind] if kind else None
+
+    def label(self, names, month=None):
+        """Бейджи для колонки названий одним вызовом"""
+        badges = self.badges(month)
+        return self.kinds(names, values=(badges['winter'], badges['summer']))
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Итоги отчётов по частям таблицы
+===============================
+Потоковый разбор (stream_reader.py) отдаёт лист частями; агрегаторы
+копят по ним ровно то, что analyze_data() берёт из полной таблицы:
+
+- CategoryTotals — суммы и число значений по категориям → analytics.category_summary()
+- TopRows — первые N строк по показателю (неликвиды) → analytics.illiquid_stock()
+- NodeTotals — остаток и база узлов по категориям → transfer_plan.balance_nodes()
+
+Результат совпадает с расчётом по полной таблице: суммы и счётчики
+складываются, а nlargest по объединению лучших строк частей — это
+nlargest по всей таблице (при равенстве — та же первая строка).
+"""
+
+import pandas as pd
+
+import analytics
+import transfer_plan
+
+
+class CategoryTotals:
+    """Итоги категорий (строк столько, сколько категорий)"""
+
+    def __init__(self):
+        self.totals = None
+
+    def add(self, metrics):
+        part = analytics.category_totals(metrics)
+        if self.totals is not None:
+            part = pd.concat([self.totals, part]).groupby(level=0, sort=False).sum()
+        self.totals = part
+
+    def summary(self):
+        return analytics.summary_from_totals(self.totals)
+
+
+class TopRows:
+    """Первые limit строк с column > minimum, по убыванию column"""
+
+    def __init__(self, column, minimum, limit):
+        self.column = column
+        self.minimum = minimum
+        self.limit = limit
+        self.rows = None
+
+    def add(self, frame):
+        rows = frame[frame[self.column] > self.minimum].nlargest(self.limit, self.column)
+        if self.rows is not None:
+            parts = [part for part in (self.rows, rows) if len(part)]
+            if len(parts) > 1:
+                rows = pd.concat(parts, ignore_index=True).nlargest(self.limit, self.column)
+            elif parts:
+                rows = parts[0]
+        self.rows = rows
+
+
+class NodeTotals:
+    """
+    Остаток и база узлов (магазин или подразделение × категория)
+    Итоги сворачиваются после каждой части, как в CategoryTotals: в памяти —
+    строка на узел, а не итоги всех частей
+    """
+
+    def __init__(self):
+        self.level = None
+        self.totals = None
+
+    def add(self, metrics):
+        # Уровень — по первой части (колонка магазина есть во всём листе или нигде)
+        self.level = self.level or transfer_plan.node_level(metrics)
+        part = transfer_plan.node_totals(metrics, self.level)
+        if self.totals is not None:
+            part = pd.concat([self.totals, part], ignore_index=True).groupby(
+                ['category', 'node'], sort=False).agg(
+                stock=('stock', 'sum'), base=('base', 'sum'), division=('division', 'first')).reset_index()
+        self.totals = part
+
+    def nodes(self):
+        return self.totals
+
+
+class TurnoverTotals:
+    """Итоги оборачиваемости для analyze_data(): категории, неликвиды, узлы плана перемещений"""
+
+    def __init__(self, weeks_min, illiquid_limit=5):
+        self.categories = CategoryTotals()
+        self.illiquid = TopRows('weeks', weeks_min, illiquid_limit)
+        self.nodes = NodeTotals()
+        self.rows = 0
+
+    def add(self, chunk):
+        """Часть листа отчёта (DataFrame с колонками выгрузки и 'Лист')"""
+        self.rows += len(chunk)
+        metrics = analytics.metrics_frame(chunk)
+        if metrics.empty:
+            return
+        self.categories.add(metrics)
+        self.illiquid.add(metrics)
+        self.nodes.add(metrics)
+
+    def empty(self):
+        return self.categories.totals is None
+
+    def results(self):
+        """(category_summary, строки-кандидаты в неликвиды, node_totals)"""
+        return self.categories.summary(), self.illiquid.rows, self.nodes.nodes()
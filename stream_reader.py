@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Потоковое чтение больших Excel отчётов
+======================================
+load_sheet() / load_sheets() держат в памяти весь лист: сырые строки и
+DataFrame. Выгрузки по всей компании (сотни тысяч строк магазин ×
+группа товара) читаются потоком — openpyxl read_only,
+iter_rows(values_only=True) — и отдаются частями по chunk_rows строк.
+
+Часть — обычный DataFrame с колонками листа, собранный тем же
+build_frame(), что и pd.read_excel(header=N), поэтому к ней применимы те
+же analytics.*; итоги по частям копят агрегаторы stream_aggregates.py.
+Пик памяти — одна часть и итоги, а не весь лист.
+
+Отличия от load_sheet(): пустые строки после заголовка пропускаются,
+кэш разбора не используется (в нём хранился бы как раз весь лист).
+"""
+
+import openpyxl
+import pandas as pd
+
+from excel_loader import build_frame
+
+# Строк в одной части
+CHUNK_ROWS = 5000
+
+
+def _cell(value):
+    """Значение ячейки как в pd.read_excel: пусто → '', целое число → int"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _rows(ws):
+    """Строки листа без пустых ячеек в конце (как в pd.read_excel)"""
+    # Размеры листа в файле бывают неверными (A1:A1) — читаем до последней строки
+    ws.reset_dimensions()
+    for row in ws.iter_rows(values_only=True):
+        values = [_cell(value) for value in row]
+        while values and values[-1] == '':
+            values.pop()
+        yield values
+
+
+def _frame(columns, rows):
+    """DataFrame части: строки дополняются пустыми ячейками до общей ширины"""
+    width = max(len(columns), max(len(row) for row in rows))
+    padded = [row + [''] * (width - len(row)) for row in [columns] + rows]
+    return build_frame(padded, header=0)
+
+
+def _chunks(rows, header, chunk_rows):
+    """Части листа по chunk_rows строк после строки заголовка header"""
+    columns = None
+    chunk = []
+    for idx, values in enumerate(rows):
+        if idx < header:
+            continue
+        if columns is None:
+            columns = values
+            continue
+        if not values:
+            continue
+        chunk.append(values)
+        if len(chunk) >= chunk_rows:
+            yield _frame(columns, chunk)
+            chunk = []
+    if chunk:
+        yield _frame(columns, chunk)
+
+
+def iter_sheet_chunks(file_path, sheet_name=0, header=0, chunk_rows=CHUNK_ROWS):
+    """Части одного листа (sheet_name — имя или номер листа)"""
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet_name] if isinstance(sheet_name, int) else wb[sheet_name]
+        yield from _chunks(_rows(ws), header, chunk_rows)
+    finally:
+        wb.close()
+
+
+def iter_book_chunks(file_path, header=0, chunk_rows=CHUNK_ROWS, sheet_column='Лист'):
+    """
+    Части всех листов книги в порядке книги; имя листа — в колонке sheet_column
+    Маленькие листы (лист на подразделение) собираются в одну часть до chunk_rows
+    строк: расчёт по части стоит почти одинаково при 200 и при 5000 строк
+    """
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        pending = []
+        pending_rows = 0
+        for ws in wb.worksheets:
+            for chunk in _chunks(_rows(ws), header, chunk_rows):
+                chunk[sheet_column] = ws.title
+                pending.append(chunk)
+                pending_rows += len(chunk)
+                if pending_rows >= chunk_rows:
+                    yield pd.concat(pending, ignore_index=True)
+                    pending = []
+                    pending_rows = 0
+        if pending:
+            yield pd.concat(pending, ignore_index=True)
+    finally:
+        wb.close()
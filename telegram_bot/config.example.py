@@ -14,6 +14,12 @@ RECIPIENTS = [
 USE_GROUP = True
 GROUP_CHAT_ID = -1001234567890  # Your Telegram group ID
 
+# Send rate limits (optional, defaults in fanout.py)
+# SEND_CONCURRENCY = 8            # parallel sends
+# SEND_GLOBAL_RATE = 25.0         # messages per second per bot
+# SEND_PRIVATE_CHAT_RATE = 1.0    # messages per second per private chat
+# SEND_GROUP_CHAT_RATE = 20 / 60  # messages per second per group
+
 # Dashboard path (relative to telegram_bot/)
 DASHBOARD_PATH = "../output/dashboard_current.html"
 
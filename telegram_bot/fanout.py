@@ -0,0 +1,152 @@
+"""
+Параллельная рассылка с учётом лимитов Telegram
+Одновременно отправляется не больше concurrency сообщений, темп
+ограничивается token bucket'ами: общий (~30 сообщений/с на бота) и
+отдельный на каждый чат (1 сообщение/с в личку, 20/мин в группу).
+RetryAfter от Telegram ставит на паузу всю рассылку (лимит общий на
+бота), после паузы отправка повторяется.
+"""
+
+import asyncio
+import time
+import warnings
+from datetime import timedelta
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TelegramError, TimedOut
+
+# Лимиты Telegram Bot API (с запасом)
+GLOBAL_RATE = 25.0            # сообщений в секунду на бота
+PRIVATE_CHAT_RATE = 1.0       # сообщений в секунду в один личный чат
+GROUP_CHAT_RATE = 20 / 60     # сообщений в секунду в одну группу
+SEND_CONCURRENCY = 8          # одновременных отправок
+MAX_ATTEMPTS = 4              # попыток на получателя
+BACKOFF_BASE = 1.0            # секунд, удваивается при сетевых ошибках
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity в запасе"""
+
+    def __init__(self, rate, capacity=1.0, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Дождаться токена"""
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """Общий лимит бота + лимит на каждый чат"""
+
+    def __init__(self, global_rate=GLOBAL_RATE, private_rate=PRIVATE_CHAT_RATE,
+                 group_rate=GROUP_CHAT_RATE):
+        self.global_bucket = TokenBucket(global_rate, capacity=max(1.0, global_rate))
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.chat_buckets = {}
+        self.paused_until = 0.0
+
+    def pause(self, seconds):
+        """Не отправлять ничего seconds секунд (RetryAfter — лимит бота, а не чата)"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def wait_pause(self):
+        """Дождаться конца паузы (пока ждём, её могут продлить)"""
+        while (delay := self.paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+    def chat_bucket(self, chat_id):
+        """Bucket чата (группы и каналы — отрицательные chat_id)"""
+        if chat_id not in self.chat_buckets:
+            rate = self.group_rate if int(chat_id) < 0 else self.private_rate
+            self.chat_buckets[chat_id] = TokenBucket(rate)
+        return self.chat_buckets[chat_id]
+
+    async def acquire(self, chat_id):
+        """Дождаться разрешения на отправку в чат"""
+        await self.wait_pause()
+        await self.chat_bucket(chat_id).acquire()
+        await self.wait_pause()
+        await self.global_bucket.acquire()
+
+
+def retry_after_seconds(error):
+    """Пауза из RetryAfter (int или timedelta в зависимости от версии библиотеки)"""
+    with warnings.catch_warnings():
+        # PTB 22.2+ предупреждает о будущей смене типа на timedelta — учтено ниже
+        warnings.simplefilter('ignore')
+        delay = error.retry_after
+    if isinstance(delay, timedelta):
+        return delay.total_seconds()
+    return float(delay)
+
+
+async def send_with_retry(chat_id, send_one, limiter, max_attempts=MAX_ATTEMPTS,
+                          backoff_base=BACKOFF_BASE):
+    """
+    Отправка одному получателю с повторами
+    Возвращает отчёт: {'chat_id', 'ok', 'attempts', 'seconds', 'result', 'error'}
+    """
+    started = time.monotonic()
+    report = {'chat_id': chat_id, 'ok': False, 'attempts': 0, 'seconds': 0.0,
+              'result': None, 'error': None}
+
+    for attempt in range(1, max_attempts + 1):
+        report['attempts'] = attempt
+        await limiter.acquire(chat_id)
+        try:
+            report['result'] = await send_one(chat_id)
+            report['ok'] = True
+            report['error'] = None
+            break
+        except RetryAfter as e:
+            report['error'] = str(e)
+            # Остальные отправки ждут вместе с этой: следующий acquire() выдержит паузу
+            limiter.pause(retry_after_seconds(e))
+            delay = 0
+        except (BadRequest, Forbidden) as e:
+            # "chat not found" / "bot was blocked" повтором не лечатся
+            # (BadRequest — подкласс NetworkError, поэтому проверяется раньше)
+            report['error'] = str(e)
+            break
+        except (TimedOut, NetworkError) as e:
+            report['error'] = str(e)
+            delay = backoff_base * 2 ** (attempt - 1)
+        except TelegramError as e:
+            report['error'] = str(e)
+            break
+
+        if attempt < max_attempts:
+            await asyncio.sleep(delay)
+
+    report['seconds'] = time.monotonic() - started
+    return report
+
+
+async def fan_out(recipients, send_one, concurrency=SEND_CONCURRENCY, limiter=None,
+                  max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE):
+    """
+    Рассылка всем получателям с ограничением параллельности и темпа
+    send_one(chat_id) — корутина отправки одному получателю
+    Возвращает отчёты в порядке recipients
+    """
+    limiter = limiter or RateLimiter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def worker(chat_id):
+        async with semaphore:
+            return await send_with_retry(chat_id, send_one, limiter, max_attempts, backoff_base)
+
+    return await asyncio.gather(*(worker(chat_id) for chat_id in recipients))
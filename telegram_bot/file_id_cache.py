@@ -0,0 +1,100 @@
+"""
+Загрузка дашборда в Telegram один раз, дальше — по file_id
+Первая успешная отправка загружает файл, Telegram возвращает file_id,
+остальные получатели получают тот же документ по file_id без повторной
+загрузки. file_id сохраняется на диск вместе с хэшем дашборда, поэтому
+повторный запуск после частичного сбоя (в ту же неделю) тоже не грузит
+файл заново. Изменился дашборд — изменился хэш, файл загружается снова.
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+from telegram.error import BadRequest
+
+FILE_ID_CACHE_NAME = "telegram_file_id.json"
+
+# BadRequest про сам file_id (другой бот, устаревшая ссылка на файл) — в нижнем регистре;
+# остальные (нет чата, бот заблокирован) относятся к получателю, а не к файлу
+FILE_ID_ERRORS = ('wrong file identifier', 'file reference')
+
+
+def is_file_id_error(error):
+    """Ошибка Telegram из-за недействительного file_id"""
+    message = str(getattr(error, 'message', error)).lower()
+    return any(text in message for text in FILE_ID_ERRORS)
+
+
+def load_file_id(cache_path, sha256, bot_key):
+    """file_id из кэша, если он относится к этому дашборду и этому боту"""
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get('sha256') == sha256 and cached.get('bot') == bot_key:
+        return cached.get('file_id') or None
+    return None
+
+
+def save_file_id(cache_path, sha256, bot_key, file_id):
+    """Запомнить file_id для дашборда с данным хэшем"""
+    cached = {
+        'sha256': sha256,
+        'bot': bot_key,
+        'file_id': file_id,
+        'uploaded_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cached, f, ensure_ascii=False, indent=2)
+
+
+class UploadOnceDocument:
+    """
+    Документ, который загружается в Telegram не больше одного раза
+
+    Параллельные отправки ждут первую загрузку (asyncio.Lock) и затем
+    используют полученный file_id. Если загрузка не удалась — следующая
+    отправка пробует загрузить сама. file_id сбрасывается только при
+    ошибке про сам file_id; ошибка получателя уходит наверх, кэш не трогается.
+    """
+
+    def __init__(self, content, filename, cache_path=None, bot_key=''):
+        self.content = content
+        self.filename = filename
+        self.sha256 = hashlib.sha256(content).hexdigest()
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.bot_key = bot_key
+        self.file_id = load_file_id(self.cache_path, self.sha256, bot_key) if self.cache_path else None
+        self.uploads = 0
+        self._lock = asyncio.Lock()
+
+    async def send(self, bot, chat_id, **kwargs):
+        """Отправить документ в чат (по file_id, если он уже известен)"""
+        file_id = self.file_id
+        if file_id:
+            try:
+                return await bot.send_document(chat_id=chat_id, document=file_id, **kwargs)
+            except BadRequest as e:
+                if not is_file_id_error(e):
+                    raise
+                # file_id недействителен (например, другой бот) — загрузим заново
+                if self.file_id == file_id:
+                    self.file_id = None
+
+        async with self._lock:
+            if self.file_id:
+                return await bot.send_document(chat_id=chat_id, document=self.file_id, **kwargs)
+
+            message = await bot.send_document(chat_id=chat_id, document=self.content,
+                                              filename=self.filename, **kwargs)
+            self.uploads += 1
+            document = getattr(message, 'document', None)
+            if document is not None and document.file_id:
+                self.file_id = document.file_id
+                if self.cache_path:
+                    save_file_id(self.cache_path, self.sha256, self.bot_key, self.file_id)
+            return message
@@ -2,12 +2,17 @@
 Утилита для извлечения периода отчёта из Excel файлов
 """
 
+import hashlib
+import json
 import re
 import sys
 from pathlib import Path
 from datetime import datetime
 import openpyxl
 
+# Манифест запуска генератора: лежит рядом с dashboard_current.html
+MANIFEST_NAME = "dashboard_manifest.json"
+
 
 def safe_print(text):
     """Безопасный вывод текста"""
@@ -52,70 +57,70 @@ def parse_period_from_filename(filename):
     return None
 
 
+MONTH_NAMES = {
+    '01': 'января', '02': 'февраля', '03': 'марта',
+    '04': 'апреля', '05': 'мая', '06': 'июня',
+    '07': 'июля', '08': 'августа', '09': 'сентября',
+    '10': 'октября', '11': 'ноября', '12': 'декабря'
+}
+
+# Паттерны дат в ячейках (компилируются один раз) и форматирование совпадения
+EXCEL_PERIOD_PATTERNS = [
+    # 12-18.01.2026
+    (re.compile(r'(\d{1,2})-(\d{1,2})\.(\d{1,2})\.(\d{4})', re.IGNORECASE),
+     lambda g: f"{g[0]}-{g[1]} {MONTH_NAMES.get(g[2], g[2])} {g[3]}"),
+    # 12-18 января 2026
+    (re.compile(r'(\d{1,2})-(\d{1,2})\s+(января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря)\s+(\d{4})', re.IGNORECASE),
+     lambda g: f"{g[0]}-{g[1]} {g[2]} {g[3]}"),
+    # 12.01.2026 - 18.01.2026
+    (re.compile(r'(\d{1,2})\.(\d{1,2})\.(\d{4})\s*-\s*(\d{1,2})\.(\d{1,2})\.(\d{4})', re.IGNORECASE),
+     lambda g: f"{g[0]}-{g[3]} {MONTH_NAMES.get(g[1], g[1])} {g[2]}"),
+]
+
+# Область поиска периода: первые 20 строк, первые 10 колонок
+SCAN_MAX_ROW = 20
+SCAN_MAX_COL = 10
+
+
+def find_period_in_rows(rows):
+    """
+    Первый период в потоке строк (кортежи значений ячеек)
+    Ячейки просматриваются построчно, слева направо
+    """
+    for row in rows:
+        for cell_value in row:
+            if not cell_value or not isinstance(cell_value, str):
+                continue
+            for pattern, formatter in EXCEL_PERIOD_PATTERNS:
+                match = pattern.search(cell_value)
+                if match:
+                    return formatter(match.groups())
+    return None
+
+
 def parse_period_from_excel(filepath):
     """
     Извлекает период из содержимого Excel файла
     Ищет в первых строках/ячейках
+
+    Лист читается потоково (iter_rows в read_only режиме): XML листа
+    проходится один раз и только до первого совпадения
     """
     try:
         wb = openpyxl.load_workbook(filepath, read_only=True, data_only=True)
-        sheet = wb.active
-        
-        # Проверяем первые 20 строк, первые 10 колонок
-        for row in range(1, min(21, sheet.max_row + 1)):
-            for col in range(1, min(11, sheet.max_column + 1)):
-                cell_value = sheet.cell(row, col).value
-                
-                if cell_value and isinstance(cell_value, str):
-                    # Ищем паттерны дат
-                    patterns = [
-                        r'(\d{1,2})-(\d{1,2})\.(\d{1,2})\.(\d{4})',  # 12-18.01.2026
-                        r'(\d{1,2})-(\d{1,2})\s+(января|февраля|марта|апреля|мая|июня|июля|августа|сентября|октября|ноября|декабря)\s+(\d{4})',  # 12-18 января 2026
-                        r'(\d{1,2})\.(\d{1,2})\.(\d{4})\s*-\s*(\d{1,2})\.(\d{1,2})\.(\d{4})',  # 12.01.2026 - 18.01.2026
-                    ]
-                    
-                    for pattern in patterns:
-                        match = re.search(pattern, cell_value, re.IGNORECASE)
-                        if match:
-                            groups = match.groups()
-                            
-                            if len(groups) == 4 and '.' in pattern and 'января' not in pattern:
-                                # Формат: 12-18.01.2026
-                                day_start, day_end, month, year = groups
-                                month_names = {
-                                    '01': 'января', '02': 'февраля', '03': 'марта',
-                                    '04': 'апреля', '05': 'мая', '06': 'июня',
-                                    '07': 'июля', '08': 'августа', '09': 'сентября',
-                                    '10': 'октября', '11': 'ноября', '12': 'декабря'
-                                }
-                                month_name = month_names.get(month, month)
-                                return f"{day_start}-{day_end} {month_name} {year}"
-                            
-                            elif len(groups) == 4 and 'января' in pattern.lower():
-                                # Формат: 12-18 января 2026
-                                day_start, day_end, month_name, year = groups
-                                return f"{day_start}-{day_end} {month_name} {year}"
-                            
-                            elif len(groups) == 6:
-                                # Формат: 12.01.2026 - 18.01.2026
-                                day_start, month_start, year_start, day_end, month_end, year_end = groups
-                                month_names = {
-                                    '01': 'января', '02': 'февраля', '03': 'марта',
-                                    '04': 'апреля', '05': 'мая', '06': 'июня',
-                                    '07': 'июля', '08': 'августа', '09': 'сентября',
-                                    '10': 'октября', '11': 'ноября', '12': 'декабря'
-                                }
-                                month_name = month_names.get(month_start, month_start)
-                                return f"{day_start}-{day_end} {month_name} {year_start}"
-        
-        wb.close()
+        try:
+            sheet = wb.active
+            rows = sheet.iter_rows(max_row=SCAN_MAX_ROW, max_col=SCAN_MAX_COL, values_only=True)
+            return find_period_in_rows(rows)
+        finally:
+            wb.close()
     except Exception as e:
         safe_print(f"Oshibka chtenija Excel: {e}")
-    
+
     return None
 
 
-def get_report_period():
+def get_report_period(cache=None):
     """
     Определяет период отчёта из Excel файлов
     Порядок поиска:
@@ -124,6 +129,9 @@ def get_report_period():
     3. Из названия файла "Рассылка аксессуары магазины.xlsx"
     4. Из содержимого "Рассылка аксессуары магазины.xlsx"
     5. Текущая дата
+
+    cache — parse_cache.ParseCache: результат чтения содержимого
+    запоминается по хэшу файла, неизменные файлы не открываются повторно
     """
     script_dir = Path(__file__).parent
     input_dir = script_dir.parent / "input"
@@ -147,7 +155,10 @@ def get_report_period():
     for filepath in files_to_check:
         if filepath.exists():
             safe_print(f"[Poisk] Proverjaju soderzhimoe: {filepath.name}")
-            period = parse_period_from_excel(filepath)
+            if cache is not None:
+                period = cache.get_or_load(filepath, lambda: parse_period_from_excel(filepath), kind='period')
+            else:
+                period = parse_period_from_excel(filepath)
             if period:
                 safe_print(f"[OK] Period najden v soderzhimom fajla: {period}")
                 return period
@@ -159,6 +170,50 @@ def get_report_period():
     return period
 
 
+def _dashboard_hash(dashboard_path):
+    """SHA-256 файла дашборда"""
+    return hashlib.sha256(Path(dashboard_path).read_bytes()).hexdigest()
+
+
+def save_period_manifest(dashboard_path, period):
+    """
+    Сохраняет период, определённый при генерации, рядом с дашбордом
+    Хэш дашборда связывает манифест с конкретным файлом
+    """
+    dashboard_path = Path(dashboard_path)
+    manifest = {
+        'period': period,
+        'dashboard': dashboard_path.name,
+        'dashboard_sha256': _dashboard_hash(dashboard_path),
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    manifest_path = dashboard_path.parent / MANIFEST_NAME
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest_path
+
+
+def load_period_manifest(dashboard_path):
+    """
+    Период из манифеста генератора
+    None — манифеста нет, он повреждён или относится к другому дашборду
+    """
+    dashboard_path = Path(dashboard_path)
+    manifest_path = dashboard_path.parent / MANIFEST_NAME
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('dashboard_sha256') != _dashboard_hash(dashboard_path):
+            safe_print("[Info] Manifest otnositsja k drugomu dashbordu")
+            return None
+        return manifest.get('period') or None
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        safe_print(f"[Info] Manifest ne prochitan: {e}")
+        return None
+
+
 if __name__ == '__main__':
     # Тест
     period = get_report_period()
@@ -3,13 +3,14 @@
 Отправляет dashboard_current.html всем получателям из config.py
 """
 
+import argparse
 import asyncio
 import os
 import sys
 from datetime import datetime
 from pathlib import Path
 from telegram import Bot
-from telegram.error import TelegramError
+import config
 from config import (
     BOT_TOKEN,
     RECIPIENTS,
@@ -18,7 +19,14 @@ from config import (
     DASHBOARD_PATH,
     MESSAGE_TEMPLATE
 )
-from period_parser import get_report_period
+from period_parser import get_report_period, load_period_manifest
+from file_id_cache import UploadOnceDocument, FILE_ID_CACHE_NAME
+from fanout import RateLimiter, fan_out, SEND_CONCURRENCY, GLOBAL_RATE, PRIVATE_CHAT_RATE, GROUP_CHAT_RATE
+
+# Кэш разбора Excel общий с generate_dashboard.py (лежит в корне проекта)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from parse_cache import ParseCache
+from pipeline_metrics import PipelineMetrics
 
 
 def safe_print(text):
@@ -44,10 +52,16 @@ def get_dashboard_path():
     return dashboard
 
 
-def format_message():
+def format_message(dashboard_path, use_cache=True):
     """Форматировать сообщение для отправки"""
-    # Получаем период из Excel файлов
-    period = get_report_period()
+    # Период уже определён генератором — берём из манифеста рядом с дашбордом
+    period = load_period_manifest(dashboard_path)
+    if period:
+        safe_print(f"[OK] Period iz manifesta: {period}")
+    else:
+        # Fallback: манифеста нет (старый запуск генератора) — читаем Excel
+        safe_print("[Info] Manifest ne najden, period opredeljaetsja iz Excel")
+        period = get_report_period(cache=ParseCache(enabled=use_cache))
     timestamp = datetime.now().strftime("%d.%m.%Y %H:%M")
     
     return MESSAGE_TEMPLATE.format(
@@ -56,26 +70,36 @@ def format_message():
     )
 
 
-async def send_to_user(bot: Bot, chat_id: int, dashboard_path: Path, message: str):
-    """Отправить дашборд одному пользователю"""
-    try:
-        with open(dashboard_path, 'rb') as file:
-            await bot.send_document(
-                chat_id=chat_id,
-                document=file,
-                filename="dashboard_kari_nnv.html",
-                caption=message,
-                parse_mode='HTML'
-            )
-        safe_print(f"  [OK] Otpravleno polzovatelju {chat_id}")
-        return True
-    except TelegramError as e:
-        safe_print(f"  [ERROR] Otpravka polzovatelju {chat_id}: {e}")
-        return False
-
-
-async def send_dashboard():
-    """Основная функция рассылки"""
+async def send_to_user(bot: Bot, chat_id: int, document: UploadOnceDocument, message: str):
+    """
+    Отправить дашборд одному пользователю
+    Файл загружается один раз, остальным — по file_id
+    Ошибки Telegram пробрасываются — повторы и отчёт делает fan_out()
+    """
+    return await document.send(
+        bot,
+        chat_id,
+        caption=message,
+        parse_mode='HTML'
+    )
+
+
+def print_send_report(reports):
+    """Отчёт по каждому получателю"""
+    for report in reports:
+        status = "OK" if report['ok'] else "ERROR"
+        line = f"  [{status}] {report['chat_id']}: popytok {report['attempts']}, {report['seconds']:.1f} s"
+        if report['error']:
+            line += f" ({report['error']})"
+        safe_print(line)
+
+
+async def send_dashboard(use_cache=True, bot=None, metrics=None):
+    """
+    Основная функция рассылки
+    metrics — PipelineMetrics: время рассылки и каждой отправки (по умолчанию не пишутся)
+    """
+    metrics = metrics or PipelineMetrics('send')
     safe_print("\n" + "="*60)
     safe_print("RASSYLKA DASHBORDA KARI")
     safe_print("="*60)
@@ -88,13 +112,13 @@ async def send_dashboard():
         safe_print(f"[OK] Razmer fajla: {file_size:.1f} KB")
     except FileNotFoundError as e:
         safe_print(f"\n[ERROR] {e}")
-        return
+        return []
     
     # Создаём бота
-    bot = Bot(token=BOT_TOKEN)
+    bot = bot or Bot(token=BOT_TOKEN)
     
     # Формируем сообщение
-    message = format_message()
+    message = format_message(dashboard_path, use_cache=use_cache)
     safe_print(f"\n[OK] Soobschenie sformirovano")
     
     # Определяем получателей
@@ -108,24 +132,45 @@ async def send_dashboard():
     if not recipients:
         safe_print("\n[WARNING] Spisok poluchatelej pust!")
         safe_print("Dobav' chat_id v config.py")
-        return
+        return []
     
-    # Отправка
+    # Файл читается один раз и загружается в Telegram один раз (дальше — по file_id,
+    # file_id запоминается рядом с дашбордом вместе с его хэшем)
+    document = UploadOnceDocument(
+        dashboard_path.read_bytes(),
+        filename="dashboard_kari_nnv.html",
+        cache_path=dashboard_path.parent / FILE_ID_CACHE_NAME,
+        bot_key=str(BOT_TOKEN).split(':')[0],
+    )
+    if document.file_id:
+        safe_print("[OK] Dashboard uzhe zagruzhen v Telegram, otpravka po file_id")
+
+    # Отправка: параллельно, с учётом лимитов Telegram (настройки — в config.py)
     safe_print("\n[START] Nachinayu rassylku...\n")
-    
-    success_count = 0
-    fail_count = 0
-    
-    for chat_id in recipients:
-        result = await send_to_user(bot, chat_id, dashboard_path, message)
-        if result:
-            success_count += 1
-        else:
-            fail_count += 1
-        
-        # Небольшая пауза между отправками
-        await asyncio.sleep(0.5)
-    
+
+    limiter = RateLimiter(
+        global_rate=getattr(config, 'SEND_GLOBAL_RATE', GLOBAL_RATE),
+        private_rate=getattr(config, 'SEND_PRIVATE_CHAT_RATE', PRIVATE_CHAT_RATE),
+        group_rate=getattr(config, 'SEND_GROUP_CHAT_RATE', GROUP_CHAT_RATE),
+    )
+    with metrics.stage('telegram_fanout', recipients=len(recipients), bytes=len(document.content)) as stage:
+        reports = await fan_out(
+            recipients,
+            lambda chat_id: send_to_user(bot, chat_id, document, message),
+            concurrency=getattr(config, 'SEND_CONCURRENCY', SEND_CONCURRENCY),
+            limiter=limiter,
+        )
+        for report in reports:
+            metrics.record('telegram_send', report['seconds'], chat_id=report['chat_id'],
+                           attempts=report['attempts'], status='ok' if report['ok'] else 'error',
+                           error=report['error'])
+        stage['uploads'] = document.uploads
+    print_send_report(reports)
+    safe_print(f"[OK] Zagruzok fajla: {document.uploads}")
+
+    success_count = sum(1 for report in reports if report['ok'])
+    fail_count = len(reports) - success_count
+
     # Итоги
     safe_print("\n" + "="*60)
     safe_print("ITOGI RASSYLKI")
@@ -135,18 +180,37 @@ async def send_dashboard():
     safe_print(f"[TOTAL] Uspeshnost': {success_count}/{len(recipients)}")
     safe_print("="*60 + "\n")
 
+    return reports
+
+
+def parse_args(argv=None):
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Рассылка дашборда KARI")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="не использовать кэш разобранных Excel файлов")
+    return parser.parse_args(argv)
+
 
-def main():
+def main(argv=None):
     """Точка входа"""
+    args = parse_args(argv)
+    metrics = PipelineMetrics('send')
     try:
         # Запускаем асинхронную функцию
-        asyncio.run(send_dashboard())
+        asyncio.run(send_dashboard(use_cache=not args.no_cache, metrics=metrics))
     except KeyboardInterrupt:
         safe_print("\n\n[STOP] Rassylka prervana pol'zovatelem\n")
     except Exception as e:
         safe_print(f"\n[CRITICAL ERROR] {e}\n")
         import traceback
         traceback.print_exc()
+    finally:
+        if metrics.records:
+            try:
+                safe_print(metrics.summary_table())
+                safe_print(f"[OK] Metriki: {metrics.write()}")
+            except OSError as e:
+                safe_print(f"[ERROR] Metriki ne zapisany: {e}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ АНАЛИТИКИ КОП И КАТЕГОРИЙ
+==============================
+
+Проверяет analytics.py на маленьких таблицах с известным ответом:
+КОП = доля в остатках / доля в продажах, строки «Итого» отбрасываются,
+доли категорий по подразделениям считаются из сумм продаж и остатков,
+рост + дефицит отбирается по порогам, у лучших и худших магазинов
+верные пометки; места регионов — по доле, прирост компании — из строки
+«Итого»; подразделения региона — магазины из структуры, доля от продаж.
+
+Запуск:
+    python test/test_analytics.py
+    python -m pytest test/test_analytics.py
+"""
+
+import math
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import analytics
+
+
+def close(a, b, eps=1e-9):
+    return math.isclose(a, b, rel_tol=eps, abs_tol=eps)
+
+
+def test_metrics_frame_computes_kop_and_drops_totals():
+    df = pd.DataFrame({
+        'Группа товара': ['Сапоги', 'Кроссовки', 'Сандалии', 'Итого'],
+        'Доля в продажах %': [20.0, 10.0, 0.0, 100.0],
+        'Доля в остатках %': [30.0, 5.0, 4.0, 100.0],
+        'Оборачиваемость, недель': [12, 8, 60, 15],
+        'Лист': ['Казань 1', 'Казань 1', 'Ярославское', 'Казань 1'],
+    })
+    metrics = analytics.metrics_frame(df)
+
+    assert list(metrics['name']) == ['Сапоги', 'Кроссовки', 'Сандалии']
+    assert list(metrics['division']) == ['Казань 1', 'Казань 1', 'Ярославское']
+    assert close(metrics['kop'].iloc[0], 1.5)
+    assert close(metrics['kop'].iloc[1], 0.5)
+    # Продаж нет — КОП не определён, а не бесконечность
+    assert pd.isna(metrics['kop'].iloc[2])
+    assert list(metrics['weeks']) == [12, 8, 60]
+
+    # Готовая колонка КОП важнее расчётной
+    df['КОП'] = [2.0, None, None, 1.0]
+    metrics = analytics.metrics_frame(df)
+    assert list(metrics['kop'].iloc[:2]) == [2.0, 0.5]
+
+
+def test_category_summary_shares_from_sums():
+    metrics = analytics.metrics_frame(pd.DataFrame({
+        'Группа товара': ['Сапоги', 'Кроссовки', 'Сапоги', 'Кроссовки'],
+        'Продажи, шт': [30, 10, 50, 10],
+        'Остаток, шт': [100, 100, 100, 100],
+        'Прирост %': [10, 40, 20, None],
+        'Лист': ['Казань 1', 'Казань 1', 'Ярославское', 'Ярославское'],
+    }))
+    summary = analytics.category_summary(metrics).set_index('name')
+
+    # Продажи 80 и 20 из 100, остатки 200 и 200 из 400
+    assert close(summary.loc['Сапоги', 'share'], 80.0)
+    assert close(summary.loc['Кроссовки', 'share'], 20.0)
+    assert close(summary.loc['Сапоги', 'stock_share'], 50.0)
+    assert close(summary.loc['Сапоги', 'kop'], 50.0 / 80.0)
+    assert close(summary.loc['Кроссовки', 'kop'], 50.0 / 20.0)
+    # Прирост — среднее по заполненным листам
+    assert close(summary.loc['Сапоги', 'growth'], 15.0)
+    assert close(summary.loc['Кроссовки', 'growth'], 40.0)
+    assert summary.loc['Сапоги', 'stock'] == 200
+
+
+def test_growth_deficit_thresholds_and_priority():
+    summary = pd.DataFrame({
+        'name': ['Кроссовки детские', 'Сапоги', 'Кеды', 'Тапочки'],
+        'share': [3.21, 12.0, 2.0, 1.0],
+        'growth': [58.4, 60.0, 25.0, 10.0],
+        'kop': [0.55, 1.4, 0.8, 0.2],
+    })
+    records = analytics.growth_deficit(summary, growth_min=20)
+
+    # Сапоги растут, но товара хватает; тапочки растут слабо
+    assert [r['name'] for r in records] == ['Кроссовки детские', 'Кеды']
+    assert records[0] == {'name': 'Кроссовки детские', 'share': 3.2, 'growth': 58,
+                          'kop': 0.6, 'priority': 'Высокий'}
+    assert records[1]['priority'] == 'Средний'
+    assert analytics.growth_deficit(summary, growth_min=100) == []
+
+
+def test_store_ranking_notes_and_problems():
+    stores = analytics.metrics_frame(pd.DataFrame({
+        'Магазин': [10267, 10315, 10688, 10712, 11588],
+        'Подразделение': ['Казань 1', 'Казань 1', 'Ярославское', 'Ярославское', 'Ярославское'],
+        'Прирост %': [25.0, 12.0, -3.0, -15.0, None],
+        'КОП': [1.1, 1.8, 2.2, 3.5, 1.0],
+    }), name='store')
+    top, worst = analytics.store_ranking(stores, kop_good=(0.8, 1.5), kop_bad=2.0)
+
+    assert [s['id'] for s in top] == ['10267', '10315', '10688']
+    assert [s['note'] for s in top] == ['Лучший по росту', 'Рост продаж', 'Минимальное падение']
+    assert top[0] == {'id': '10267', 'division': 'Казань 1', 'growth': 25.0,
+                      'kop': 1.1, 'note': 'Лучший по росту'}
+
+    # Магазин без прироста в рейтинг не попадает
+    assert [s['id'] for s in worst] == ['10712', '10688', '10315']
+    assert [s['problem'] for s in worst] == ['Критичное затоваривание',
+                                             'Затоваривание + падение',
+                                             'Избыток остатков']
+
+    empty = stores.assign(growth=float('nan'))
+    assert analytics.store_ranking(empty, kop_good=(0.8, 1.5), kop_bad=2.0) == ([], [])
+
+
+def test_region_table_ranks_by_share():
+    df = pd.DataFrame({
+        'Регион': ['МСК', 'ННВ', 'ДВ', 'Итого'],
+        'Прирост %': [-10.0, -20.0, None, -12.5],
+        'Доля %': [30.0, 50.0, 20.0, 100.0],
+    })
+    table, company = analytics.region_table(df)
+
+    assert table == [{'name': 'ННВ', 'growth': -20.0, 'share': 50.0, 'rank': 1},
+                     {'name': 'МСК', 'growth': -10.0, 'share': 30.0, 'rank': 2},
+                     {'name': 'ДВ', 'growth': None, 'share': 20.0, 'rank': 3}]
+    assert company == -12.5
+
+    # Без «Итого» — средний прирост с весом доли, без колонки доли — доля от продаж
+    df = df.iloc[:3].drop(columns='Доля %').assign(**{'Продажи ТП': [300, 500, 200]})
+    table, company = analytics.region_table(df)
+    assert [(row['name'], row['share']) for row in table] == [('ННВ', 50.0), ('МСК', 30.0), ('ДВ', 20.0)]
+    assert close(company, round((-10.0 * 30 + -20.0 * 50) / 80, 1))
+
+
+def test_division_table_from_store_rows():
+    stores = analytics.metrics_frame(pd.DataFrame({
+        'Подразделение': ['Казань 1', 'Казань 1', 'Владимир'],
+        'Магазин': [201, 202, 203],
+        'Продажи ТП': [60, 20, 120],
+        'Прирост %': [5.0, 15.0, -25.0],
+        'КОП': [0.9, 1.1, 2.4],
+    }), name='store')
+
+    assert analytics.division_table(stores) == [
+        {'name': 'Владимир', 'stores': 1, 'share': 60.0, 'growth': -25.0, 'kop': 2.4},
+        {'name': 'Казань 1', 'stores': 2, 'share': 40.0, 'growth': 10.0, 'kop': 1.0},
+    ]
+
+    # Число магазинов — по структуре; подразделение без продаж — в конце, без показателей
+    table = analytics.division_table(stores, {'Казань 1': 5, 'Ижевское': 3})
+    assert [(row['name'], row['stores']) for row in table] == [('Владимир', 1), ('Казань 1', 5), ('Ижевское', 3)]
+    assert table[2] == {'name': 'Ижевское', 'stores': 3, 'share': None, 'growth': None, 'kop': None}
+    assert analytics.division_table(None, {'Ижевское': 3})[0]['stores'] == 3
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ПАКЕТНОЙ ГЕНЕРАЦИИ ПО РЕГИОНАМ
+===================================
+
+Проверяет generate_dashboard.slice_region_data() и analyze_data(samples=False):
+у каждого региона — свои подразделения, магазины, место и прирост из
+отчёта по регионам; подразделение "ННВ 1" в чужом регионе не попадает в
+ННВ; региону без строк оборачиваемости — пустые блоки и строка «нет
+данных», а не примеры ННВ.
+
+Запуск:
+    python test/test_batch_regions.py
+    python -m pytest test/test_batch_regions.py
+"""
+
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import generate_dashboard as gd
+
+
+def reports():
+    """Разобранные отчёты: магазины МСК и ННВ (у МСК — подразделение "ННВ 1"), ДВ — только в отчёте по регионам"""
+    regions = {'period': '12-18 января 2026', 'df': pd.DataFrame({
+        'Регион': ['МСК', 'ННВ', 'ДВ', 'Итого'],
+        'Продажи ТП': [600, 300, 100, 1000],
+        'Прирост %': [-10.0, -20.0, 5.0, -12.5],
+        'Доля %': [60.0, 30.0, 10.0, 100.0],
+    })}
+    stores = pd.DataFrame({
+        'Регион': ['МСК', 'МСК', 'ННВ', 'ННВ', 'ННВ'],
+        'Подразделение': ['ННВ 1', 'Москва Центр', 'Казань 1', 'Казань 1', 'Владимир'],
+        'Магазин': [101, 102, 201, 202, 203],
+    })
+    structure = {'df': stores.assign(Город='Город')}
+    accessories = {'df': stores.assign(**{
+        'Продажи ТП': [50, 150, 60, 20, 120],
+        'Прирост %': [10.0, -30.0, 5.0, 15.0, -25.0],
+        'КОП': [1.0, 2.5, 0.9, 1.1, 2.4],
+    })}
+    turnover_rows = pd.DataFrame({
+        'Группа товара': ['Сапоги', 'Кроссовки'] * 3,
+        'Магазин': [101, 101, 201, 201, 203, 203],
+        'Доля в продажах %': [60.0, 40.0, 70.0, 30.0, 50.0, 50.0],
+        'Доля в остатках %': [50.0, 50.0, 40.0, 60.0, 80.0, 20.0],
+        'Оборачиваемость, недель': [10, 60, 12, 8, 90, 5],
+        'Прирост %': [5.0, 70.0, -5.0, 80.0, 10.0, -10.0],
+        'Лист': ['ННВ 1', 'ННВ 1', 'Казань 1', 'Казань 1', 'Владимир', 'Владимир'],
+    })
+    turnover = {'df': turnover_rows, 'sheets': ['ННВ 1', 'Казань 1', 'Владимир'],
+                'file': 'Отчет по оборачиваемости ТЗ.xlsx'}
+    return regions, turnover, accessories, structure
+
+
+def analyze(region, data=None):
+    data = reports() if data is None else data
+    with contextlib.redirect_stdout(io.StringIO()):
+        return gd.analyze_data(*gd.slice_region_data(*data, region), region=region, samples=False)
+
+
+def test_every_region_has_name_and_aliases():
+    assert len(gd.REGION_NAMES) == 11
+    assert set(gd.REGION_ALIASES) == set(gd.REGION_NAMES)
+    # Код региона — один из его вариантов написания
+    assert all(code.lower() in aliases for code, aliases in gd.REGION_ALIASES.items())
+
+
+def test_slice_uses_region_column_and_structure():
+    regions, turnover, accessories, structure = gd.slice_region_data(*reports(), 'ННВ')
+
+    assert sorted(structure['df']['Магазин']) == [201, 202, 203]
+    assert sorted(accessories['nnv']['Магазин']) == [201, 202, 203]
+    # Строки оборачиваемости — по магазинам региона из структуры, а не по "ННВ" в листе
+    assert sorted(turnover['df']['Магазин'].unique()) == [201, 203]
+    assert turnover['sheets'] == ['Казань 1', 'Владимир']
+    # Отчёт по регионам не режется: нужна таблица всех регионов
+    assert len(regions['df']) == 4
+
+
+def test_region_analysis_from_own_rows():
+    analysis = analyze('МСК')
+
+    assert analysis['region_name'] == 'Москва'
+    assert (analysis['nnv_rank'], analysis['total_regions']) == (1, 3)
+    assert (analysis['nnv_growth'], analysis['company_growth']) == (-10.0, -12.5)
+    assert analysis['stores_count'] == 2
+    assert [d['name'] for d in analysis['divisions']] == ['Москва Центр', 'ННВ 1']
+    assert analysis['divisions'][0] == {'name': 'Москва Центр', 'stores': 1, 'share': 75.0,
+                                        'growth': -30.0, 'kop': 2.5}
+    assert {s['id'] for s in analysis['top_stores']} == {'101', '102'}
+    assert [c['name'] for c in analysis['key_categories']] == ['Сапоги', 'Кроссовки']
+    assert analysis['notes'] == []
+
+    nnv = analyze('ННВ')
+    assert nnv['nnv_rank'] == 2
+    assert [d['name'] for d in nnv['divisions']] == ['Владимир', 'Казань 1']
+    assert [d['stores'] for d in nnv['divisions']] == [1, 2]
+
+
+def test_region_without_turnover_gets_no_samples():
+    analysis = analyze('ДВ')
+
+    for key in ('key_categories', 'growth_deficit', 'illiquid_stock', 'imbalances', 'actions',
+                'divisions', 'top_stores', 'worst_stores'):
+        assert analysis[key] == [], key
+    assert analysis['stores_count'] is None
+    assert analysis['nnv_rank'] == 3
+    assert analysis['notes'] == ['Нет данных оборачиваемости по региону ДВ',
+                                 'Нет данных по магазинам региона ДВ в отчёте по аксессуарам']
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        html = gd.generate_html(analysis)
+    assert 'Нет данных оборачиваемости по региону ДВ' in html
+    assert 'Ярославское' not in html and 'Ботинки женские зимние' not in html
+
+
+def test_regional_turnover_file_belongs_to_its_region():
+    regions, turnover, accessories, structure = reports()
+    turnover = {**turnover, 'df': turnover['df'].drop(columns='Магазин'),
+                'file': 'Отчет по оборачиваемости ТЗ регион ННВ.xlsx'}
+    data = (regions, turnover, accessories, structure)
+
+    assert gd.slice_region_data(*data, 'ННВ')[1] is turnover
+    assert gd.slice_region_data(*data, 'МСК')[1] is None
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
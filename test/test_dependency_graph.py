@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ГРАФА ЗАВИСИМОСТЕЙ
+=======================
+
+Проверяет dependency_graph.py: после изменения одного входного файла
+пересчитываются только зависящие от него этапы, остальное берётся из
+хранилища; план (--dry-run) совпадает с тем, что реально считается;
+узел с отсечкой по значению не пересчитывает потребителей, если его
+значение не изменилось; посчитанное по сбойному извлечению (None при
+существующем файле) не сохраняется — следующий запуск восстанавливается;
+правка исходников (отпечаток кода) меняет ключи.
+
+Запуск:
+    python test/test_dependency_graph.py
+    python -m pytest test/test_dependency_graph.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from dependency_graph import DependencyGraph, code_fingerprint, RUN, CACHED, SKIP, INPUT
+from parse_cache import ParseCache
+
+
+def build(tmp, calls):
+    """Два входа → разбор → анализ → секции; period — по значению (первая строка файла a)"""
+    graph = DependencyGraph(ParseCache(Path(tmp) / 'cache'))
+    graph.add_file('input_a', Path(tmp) / 'a.txt')
+    graph.add_file('input_b', Path(tmp) / 'b.txt')
+
+    def stage(name, compute):
+        def run(*values):
+            calls.append(name)
+            return compute(*values)
+        return run
+
+    graph.add('extract_a', stage('extract_a', lambda path: path.read_text()), deps=('input_a',), persist=False)
+    graph.add('extract_b', stage('extract_b', lambda path: path.read_text()), deps=('input_b',), persist=False)
+    graph.add('period', stage('period', lambda path: path.read_text().splitlines()[0]), deps=('input_a',),
+              by_value=True)
+    graph.add('analyze_a', stage('analyze_a', lambda text: text.upper()), deps=('extract_a',), params=1)
+    graph.add('analyze_b', stage('analyze_b', lambda text, period: f"{period}: {text}"),
+              deps=('extract_b', 'period'), params=1)
+    graph.add('html_a', stage('html_a', lambda part: f"<p>{part}</p>"), deps=('analyze_a',))
+    graph.add('html_b', stage('html_b', lambda part: f"<p>{part}</p>"), deps=('analyze_b',))
+    return graph
+
+
+def run(tmp):
+    """Один «запуск»: план и вычисленные этапы"""
+    calls = []
+    graph = build(tmp, calls)
+    plan = graph.plan(['html_a', 'html_b'])
+    values = [graph.value('html_a'), graph.value('html_b')]
+    return plan, calls, values
+
+
+def test_only_changed_branch_reruns():
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'a.txt').write_text('12-18 января\nобувь')
+        (Path(tmp) / 'b.txt').write_text('сумки')
+
+        plan, calls, values = run(tmp)
+        assert values == ['<p>12-18 ЯНВАРЯ\nОБУВЬ</p>', '<p>12-18 января: сумки</p>']
+        assert sorted(calls) == sorted(['period', 'extract_a', 'extract_b', 'analyze_a', 'analyze_b',
+                                        'html_a', 'html_b'])
+
+        # Ничего не изменилось — всё из хранилища, файлы не читаются
+        plan, calls, again = run(tmp)
+        assert again == values and calls == ['period']
+        assert plan['html_a'] == plan['html_b'] == CACHED
+        assert plan['extract_a'] == plan['analyze_a'] == SKIP
+        assert plan['input_a'] == INPUT
+
+        # Заново прислан только b — ветка a не трогается
+        (Path(tmp) / 'b.txt').write_text('ремни')
+        plan, calls, values = run(tmp)
+        assert values[1] == '<p>12-18 января: ремни</p>'
+        assert sorted(calls) == sorted(['period', 'extract_b', 'analyze_b', 'html_b'])
+        assert [name for name, status in plan.items() if status == RUN] == \
+               ['extract_b', 'period', 'analyze_b', 'html_b']
+
+
+def test_value_cutoff():
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'a.txt').write_text('12-18 января\nобувь')
+        (Path(tmp) / 'b.txt').write_text('сумки')
+        run(tmp)
+
+        # a изменился, период тот же — ветка b остаётся в кэше
+        (Path(tmp) / 'a.txt').write_text('12-18 января\nсапоги')
+        plan, calls, values = run(tmp)
+        assert plan['html_b'] == CACHED and 'analyze_b' not in calls
+        assert values[0] == '<p>12-18 ЯНВАРЯ\nСАПОГИ</p>'
+
+        # Новый период — пересчитывается и b
+        (Path(tmp) / 'a.txt').write_text('19-25 января\nсапоги')
+        plan, calls, values = run(tmp)
+        assert plan['html_b'] == RUN and values[1] == '<p>19-25 января: сумки</p>'
+
+
+def test_failed_extract_not_saved():
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / 'a.txt').write_text('обувь')
+        store = ParseCache(Path(tmp) / 'cache')
+
+        def run_once(broken):
+            # Сбой чтения: экстрактор возвращает None, анализ показывает пример
+            graph = DependencyGraph(store)
+            path = Path(tmp) / 'a.txt'
+            graph.add_file('input_a', path if path.exists() else None)
+            graph.add('extract_a', lambda path: None if broken or path is None else path.read_text(),
+                      deps=('input_a',), persist=False, may_fail=True)
+            graph.add('analyze_a', lambda text: (text or 'пример').upper(), deps=('extract_a',))
+            graph.add('html_a', lambda part: f"<p>{part}</p>", deps=('analyze_a',))
+            return graph, graph.value('html_a')
+
+        graph, html = run_once(broken=True)
+        assert html == '<p>ПРИМЕР</p>'
+        assert graph.failed == {'extract_a', 'analyze_a', 'html_a'}
+
+        # Следующий обычный запуск — настоящие данные, а не пример из хранилища
+        graph, html = run_once(broken=False)
+        assert html == '<p>ОБУВЬ</p>' and graph.reused == [] and graph.failed == set()
+        graph, html = run_once(broken=False)
+        assert html == '<p>ОБУВЬ</p>' and graph.reused == ['html_a']
+
+        # Файла нет — None не сбой, результат сохраняется
+        (Path(tmp) / 'a.txt').unlink()
+        graph, html = run_once(broken=False)
+        assert html == '<p>ПРИМЕР</p>' and graph.failed == set()
+        assert run_once(broken=False)[0].reused == ['html_a']
+
+
+def test_code_change_invalidates_results():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / 'a.txt').write_text('обувь')
+        source = tmp / 'analytics.py'
+        source.write_text('SHARE = 1\n')
+        store = ParseCache(tmp / 'cache')
+
+        def run_once():
+            graph = DependencyGraph(store, code=code_fingerprint([source]))
+            graph.add_file('input_a', tmp / 'a.txt')
+            graph.add('analyze_a', lambda path: path.read_text().upper(), deps=('input_a',))
+            graph.value('analyze_a')
+            return graph
+
+        first = run_once()
+        assert run_once().reused == ['analyze_a']
+
+        # Правка исходника анализа — новый ключ, результат старого кода не берётся
+        source.write_text('SHARE = 2\n')
+        changed = run_once()
+        assert changed.key('analyze_a') != first.key('analyze_a')
+        assert changed.reused == [] and changed.ran == ['analyze_a']
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ НОРМАЛИЗАЦИИ ТИПОВ
+=======================
+
+Проверяет dtype_normalizer.py: значения не меняются, типы становятся
+компактнее, анализ по нормализованной таблице совпадает с исходной;
+неразобранные числа считаются, части потока приводятся по плану первой.
+
+Запуск:
+    python test/test_dtype_normalizer.py
+    python -m pytest test/test_dtype_normalizer.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import analytics
+from dtype_normalizer import normalize_columns, normalize_frame, frame_memory
+
+
+def turnover(rows=240):
+    """Оборачиваемость: группа × магазин, как после load_sheets()"""
+    rng = np.random.default_rng(1)
+    categories = ['Ботинки женские зимние', 'Кроссовки мужские', 'Сандалии детские', 'Итого']
+    return pd.DataFrame({
+        'Группа товара': [categories[i % 4] for i in range(rows)],
+        'Магазин': [10000 + i // 4 for i in range(rows)],
+        'Доля в продажах %': rng.uniform(1, 15, rows).round(1),
+        'Доля в остатках %': rng.uniform(1, 15, rows).round(1),
+        'Остаток': rng.integers(10, 500, rows),
+        'Прирост %': [f"{v:.1f}".replace('.', ',') + '%' for v in rng.uniform(-40, 90, rows)],
+        'Unnamed: 8': [np.nan] * rows,
+        'Лист': ['ННВ 1' if i < rows // 2 else 'Казань 1' for i in range(rows)],
+    })
+
+
+def test_types_are_compact_and_values_kept():
+    raw = turnover()
+    df = normalize_frame(raw)
+
+    assert 'Unnamed: 8' not in df.columns
+    assert isinstance(df['Группа товара'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['Лист'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['Магазин'].dtype, pd.CategoricalDtype)
+    assert df['Остаток'].dtype == np.int16
+    # Дробные не теряют точность
+    assert df['Доля в продажах %'].dtype == np.float64
+    assert df['Доля в продажах %'].tolist() == raw['Доля в продажах %'].tolist()
+    # Текст '12,5%' → число
+    assert df['Прирост %'].tolist() == [float(v.rstrip('%').replace(',', '.')) for v in raw['Прирост %']]
+    assert frame_memory(df) < frame_memory(raw) / 2
+
+
+def test_text_columns_stay_text():
+    raw = pd.DataFrame({
+        'Регион': ['МСК', 'ННВ', 'СПБ', 'ЮГ'],
+        'Код': ['A1', '2', '3', '4'],
+        'Магазин': [10001, 10002, 10003, 10004],
+        'Пусто': ['', ' ', '', ''],
+    })
+    df = normalize_frame(raw)
+    assert list(df.columns) == ['Регион', 'Код', 'Магазин']
+    # Все значения разные — category не выгоднее
+    assert df['Регион'].tolist() == ['МСК', 'ННВ', 'СПБ', 'ЮГ']
+    assert not isinstance(df['Регион'].dtype, pd.CategoricalDtype)
+    assert df['Код'].tolist() == ['A1', '2', '3', '4']
+    assert df['Магазин'].dtype == np.int16
+
+
+def test_analysis_unchanged():
+    raw = turnover()
+    # Прирост числами (текст '12,5%' аналитика сама не разбирает — до нормализации это NaN)
+    raw['Прирост %'] = normalize_frame(raw)['Прирост %']
+    before = analytics.category_summary(analytics.metrics_frame(raw))
+    after = analytics.category_summary(analytics.metrics_frame(normalize_frame(raw)))
+    pd.testing.assert_frame_equal(before, after)
+
+
+def test_coerced_values_counted():
+    raw = turnover(100)
+    raw.loc[[3, 7], 'Прирост %'] = 'н/д'
+    df, plan, coerced = normalize_columns(raw)
+
+    # 98% значений — числа: колонка числовая, два значения потеряны и посчитаны
+    assert plan['Прирост %'] == 'number' and df['Прирост %'].isna().sum() == 2
+    assert coerced == {'Прирост %': 2}
+    assert plan['Unnamed: 8'] == 'drop' and plan['Лист'] == 'category'
+
+
+def test_stream_chunks_follow_first_plan():
+    raw = turnover(200)
+    first, second = raw.iloc[:100].copy(), raw.iloc[100:].copy()
+    # Во второй части прирост почти весь текстом, группа не повторяется, а пустая колонка заполнена
+    second['Прирост %'] = ['н/д'] * 60 + list(second['Прирост %'].iloc[60:])
+    second['Группа товара'] = [f"Группа {i}" for i in range(100)]
+    second['Unnamed: 8'] = 1.0
+
+    _, plan, _ = normalize_columns(first)
+    df, plan_after, coerced = normalize_columns(second, plan)
+
+    # Прирост остаётся числом, группа — category, как в первой части
+    assert pd.api.types.is_float_dtype(df['Прирост %']) and df['Прирост %'].isna().sum() == 60
+    assert coerced == {'Прирост %': 60}
+    assert isinstance(df['Группа товара'].dtype, pd.CategoricalDtype)
+    # Пустая в первой части колонка со значениями не теряется
+    assert plan_after['Unnamed: 8'] == 'number' and (df['Unnamed: 8'] == 1).all()
+    # Без плана вторая часть получила бы другие типы
+    alone = normalize_frame(second)
+    assert not pd.api.types.is_float_dtype(alone['Прирост %'])
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
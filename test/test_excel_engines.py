@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ДВИЖКОВ РАЗБОРА EXCEL
+==========================
+
+Проверяет excel_loader.py: calamine и openpyxl дают одинаковые таблицы
+при строках заголовка, которые используют экстракторы (без заголовка,
+1, 2, 4 и поиск по ключевым словам), а движок выбирается по файлу и
+входит в ключ кэша разбора; время разбора и файлы из кэша прошлого
+запуска сбрасываются.
+Без python-calamine сравнение движков пропускается.
+
+Запуск:
+    python test/test_excel_engines.py
+    python -m pytest test/test_excel_engines.py
+"""
+
+import datetime
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+try:
+    from pytest import skip
+except ImportError:  # запуск через main() без pytest
+    def skip(reason):
+        raise unittest.SkipTest(reason)
+
+# Пропуск теста: pytest.skip() или unittest.SkipTest
+SKIPPED = (unittest.SkipTest, getattr(skip, 'Exception', unittest.SkipTest))
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import excel_loader
+from excel_loader import (load_sheet, load_sheets, configure_engines, configure_cache, engine_available,
+                          parse_time, reset_parse_stats, resolve_engine)
+from parse_cache import ParseCache
+
+
+def write_report(path):
+    """Отчёт с шапкой из 4 строк и «неудобными» ячейками: даты, bool, текст-числа, пропуски, ошибки"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'ННВ 1'
+    ws.append(['Рассылка аксессуары'])
+    ws.append(['12.01.2026 - 18.01.2026', None, None])
+    ws.append([])
+    ws.append([None, 'Итоги недели'])
+    ws.append(['Регион', 'Магазин', 'Продажи ТП', 'Прирост %', 'Дата', 'Открыт', 'КОП'])
+    ws.append(['ННВ', 10001, 1234.0, '12,5%', datetime.datetime(2026, 1, 12), True, 1.25])
+    ws.append(['ННВ', 10002, 1234.5, -3.25, datetime.date(2026, 1, 13), False, 0.8])
+    ws.append([])
+    ws.append(['МСК', None, '1 234', None, None, None, None, 'примечание'])
+    ws.append(['Итого', None, '=C6+C7', '#N/A', None, None, 1.1])
+    second = wb.create_sheet('Казань 1')
+    for row in ws.iter_rows(values_only=True):
+        second.append(row)
+    wb.save(path)
+
+
+def test_engines_give_identical_frames():
+    if not engine_available('calamine'):
+        skip("python-calamine не установлен — сравнение пропущено")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'report.xlsx'
+        write_report(path)
+        try:
+            for options in ({'header': None}, {'header': 1}, {'header': 2}, {'header': 4},
+                            {'header_keywords': ('регион',), 'default_header': 3}):
+                frames = []
+                for engine in ('openpyxl', 'calamine'):
+                    configure_engines(engine)
+                    frames.append(load_sheet(path, sheet_name=0, **options))
+                pd.testing.assert_frame_equal(*frames, obj=str(options))
+
+            books = []
+            for engine in ('openpyxl', 'calamine'):
+                configure_engines(engine)
+                books.append(load_sheets(path, header=4))
+            assert list(books[0]) == list(books[1]) == ['ННВ 1', 'Казань 1']
+            for sheet in books[0]:
+                pd.testing.assert_frame_equal(books[0][sheet], books[1][sheet])
+        finally:
+            configure_engines()
+
+
+def test_engine_per_file():
+    try:
+        configure_engines('openpyxl', {'оборачиваемост': 'calamine'})
+        assert resolve_engine('input/Структура розница 2026.xlsx') == 'openpyxl'
+        expected = 'calamine' if engine_available('calamine') else 'openpyxl'
+        assert resolve_engine('input/Отчет по ОБОРАЧИВАЕМОСТИ ТЗ.xlsx') == expected
+        try:
+            configure_engines('xlrd')
+        except ValueError as e:
+            assert 'xlrd' in str(e)
+        else:
+            raise AssertionError("неизвестный движок принят")
+    finally:
+        configure_engines()
+
+
+def test_engine_in_cache_key():
+    if not engine_available('calamine'):
+        skip("python-calamine не установлен — смена движка не проверяется")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'report.xlsx'
+        write_report(path)
+        cache = ParseCache(Path(tmp) / 'cache')
+        configure_cache(cache)
+        try:
+            for engine in ('openpyxl', 'openpyxl', 'calamine', 'calamine'):
+                configure_engines(engine)
+                load_sheet(path, sheet_name=0, header=4)
+                load_sheets(path, header=4)
+            # Смена движка — новый разбор, тот же движок — из кэша
+            assert (cache.misses, cache.hits) == (4, 4)
+        finally:
+            configure_engines()
+            configure_cache(None)
+
+
+def test_parse_stats_reset_between_runs():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'report.xlsx'
+        write_report(path)
+        configure_cache(ParseCache(Path(tmp) / 'cache'))
+        try:
+            reset_parse_stats()
+            load_sheet(path, sheet_name=0, header=4)
+            load_sheet(path, sheet_name=0, header=4)
+            assert parse_time(path) > 0
+            assert excel_loader.CACHED_FILES == {path.name}
+
+            # Следующий запуск в том же процессе начинает с нуля
+            reset_parse_stats()
+            assert parse_time(path) == 0.0 and not excel_loader.PARSE_TIMINGS
+            assert not excel_loader.CACHED_FILES
+        finally:
+            configure_cache(None)
+            reset_parse_stats()
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except SKIPPED as e:
+            print(f"⏭️ {test.__name__}: {e}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ПАРАЛЛЕЛЬНОГО ИЗВЛЕЧЕНИЯ
+=============================
+
+Проверяет generate_dashboard.extract_all() с процессом на экстрактор:
+отчёты приходят в порядке экстракторов, упавший или зависший экстрактор
+даёт None и не задерживает остальные дольше своего лимита, лимит
+отсчитывается от запуска самого экстрактора; экстрактор оборачиваемости
+в своём процессе запускает пул по листам (--sheet-workers).
+
+Запуск:
+    python test/test_extract_parallel.py
+    python -m pytest test/test_extract_parallel.py
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import openpyxl
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import generate_dashboard as gd
+from excel_loader import configure_cache
+from pipeline_metrics import PipelineMetrics
+
+
+def report_ok(**kwargs):
+    gd.log("отчёт готов")
+    return {'df': pd.DataFrame({'Магазин': [10001, 10002]}), 'path': Path(__file__)}
+
+
+def report_crash(**kwargs):
+    raise RuntimeError("битый файл")
+
+
+def report_hang(**kwargs):
+    time.sleep(60)
+
+
+def report_slow(**kwargs):
+    time.sleep(1.5)
+    return report_ok()
+
+
+def extract(extractors, timeouts=None, workers=4, options=None):
+    """extract_all() параллельно, до 4 процессов; (отчёты, записи метрик, вывод)"""
+    gd.METRICS = PipelineMetrics('test')
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        reports = gd.extract_all(options, workers=workers, timeouts=timeouts, extractors=extractors)
+    return reports, gd.METRICS.records, output.getvalue()
+
+
+def test_reports_in_order_with_worker_metrics():
+    reports, records, output = extract({'extract_regions': report_ok, 'extract_turnover': report_ok})
+    assert [len(report['df']) for report in reports] == [2, 2]
+    assert output.count("отчёт готов") == 2
+    # Этапы воркеров вложены в extract_parallel
+    assert [(r['stage'], r['depth']) for r in records] == [
+        ('extract_parallel', 0), ('extract_regions', 1), ('extract_turnover', 1)]
+    assert records[1]['rows'] == 2
+
+
+def test_crash_and_timeout_degrade_to_none():
+    started = time.perf_counter()
+    reports, records, output = extract(
+        {'extract_regions': report_ok, 'extract_turnover': report_hang, 'extract_structure': report_crash},
+        timeouts={'extract_turnover': 1})
+    assert time.perf_counter() - started < 20
+    assert reports[0] is not None and reports[1] is None and reports[2] is None
+    assert 'extract_turnover не уложился' in output
+    assert 'битый файл' in output
+    errors = {r['stage']: r['error'] for r in records if r.get('status') == 'error'}
+    assert errors['extract_turnover'] == 'timeout'
+    assert records[0]['failed'] == 2
+
+
+def test_timeout_counts_from_extractor_start():
+    # Два процесса на три экстрактора: третий ждёт 1.5 с свободного места, его лимит 2.5 с —
+    # от своего запуска, а не от начала извлечения
+    slow = ('extract_regions', 'extract_turnover', 'extract_structure')
+    reports, records, output = extract(dict.fromkeys(slow, report_slow),
+                                       timeouts=dict.fromkeys(slow, 2.5), workers=2)
+    assert all(report is not None for report in reports), output
+
+    started = time.perf_counter()
+    reports, records, output = extract(
+        {'extract_regions': report_hang, 'extract_turnover': report_ok},
+        timeouts={'extract_regions': 1, 'extract_turnover': 1})
+    # Зависший процесс завершён по своему лимиту, соседний отчёт цел
+    assert time.perf_counter() - started < 10
+    assert reports[0] is None and len(reports[1]['df']) == 2
+    assert [r['stage'] for r in records if r.get('status') == 'error'] == ['extract_regions']
+
+
+def write_turnover(path):
+    """Оборачиваемость из двух листов, шапка отчёта — в третьей строке"""
+    wb = openpyxl.Workbook()
+    for n, sheet in enumerate(['ННВ 1', 'Казань 1']):
+        ws = wb.active if n == 0 else wb.create_sheet()
+        ws.title = sheet
+        ws.append(['Обувь остатки и оборачиваемость'])
+        ws.append([])
+        ws.append(['Группа товара', 'Доля в продажах %', 'Доля в остатках %', 'Оборачиваемость, недель'])
+        ws.append(['Сапоги', 20.0, 30.0, 12])
+        ws.append(['Кроссовки', 10.0, 5.0, 8])
+    wb.save(path)
+
+
+def test_turnover_sheet_workers_inside_extractor_process():
+    # --extract-workers 2 --sheet-workers 2: экстрактор в своём процессе запускает пул по листам
+    input_dir = gd.INPUT_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        write_turnover(Path(tmp) / 'Обувь остатки и оборачиваемость по группам товара.xlsx')
+        try:
+            gd.INPUT_DIR = Path(tmp)
+            gd.reset_input_indexes()
+            configure_cache(None)
+            reports, records, output = extract(
+                {'extract_regions': report_ok, 'extract_turnover': gd.extract_turnover_data},
+                options={'extract_turnover': {'sheet_workers': 2}}, workers=2)
+        finally:
+            gd.INPUT_DIR = input_dir
+            gd.reset_input_indexes()
+
+    assert reports[1] is not None, output
+    assert reports[1]['sheets'] == ['ННВ 1', 'Казань 1']
+    assert len(reports[1]['df']) == 4
+    assert 'ОШИБКА' not in output
+    assert records[0]['failed'] == 0
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
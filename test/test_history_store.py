@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ИСТОРИИ ОТЧЁТОВ
+====================
+
+Проверяет history_store.py: файл учитывается по SHA-256 содержимого —
+повторно присланный отчёт (даже под другим именем) не дописывается,
+ingested() возвращает ровно загруженные хэши, вторая неделя дописывает
+строки к первой; структура даёт факты «Магазинов» по магазинам;
+отчёты, разбираемые потоком, ради истории не извлекаются.
+
+Запуск:
+    python test/test_history_store.py
+    python -m pytest test/test_history_store.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import generate_dashboard as gd
+import history_store
+from dependency_graph import DependencyGraph
+from parse_cache import file_hash
+
+
+def regions_df(growth):
+    return pd.DataFrame({'Регион': ['МСК', 'ННВ'], 'Прирост %': growth, 'Доля %': [60.0, 40.0]})
+
+
+def structure_df():
+    return pd.DataFrame({
+        'Регион': ['ННВ', 'ННВ', 'ННВ', None],
+        'Подразделение': ['Казань 1', 'Казань 1', 'Владимир', None],
+        'Магазин': [201, 202, 203, None],
+        'Город': ['Казань', 'Казань', 'Владимир', 'Итого'],
+    })
+
+
+def write(path, content):
+    path.write_bytes(content)
+    return path
+
+
+def count(db, table):
+    conn = history_store.connect(db)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_resent_file_is_skipped_by_sha256():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db = tmp / 'history.sqlite'
+        report = write(tmp / 'Отчет по приросту регионы.xlsx', b'week 1')
+
+        added = history_store.ingest_week('12-18 января 2026', {'regions': (report, regions_df([-10.0, -20.0]))}, db)
+        assert added == {'regions': True}
+        assert count(db, 'facts') == 4
+
+        # Тот же файл под другим именем — уже в истории, строки не дублируются
+        copy = write(tmp / 'копия.xlsx', b'week 1')
+        added = history_store.ingest_week('12-18 января 2026', {'regions': (copy, regions_df([-10.0, -20.0]))}, db)
+        assert added == {'regions': False}
+        assert count(db, 'facts') == 4
+        assert count(db, 'ingested_files') == 1
+
+
+def test_ingested_returns_loaded_hashes():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db = tmp / 'history.sqlite'
+        loaded = write(tmp / 'a.xlsx', b'week 1')
+        other = write(tmp / 'b.xlsx', b'week 2')
+
+        # Истории ещё нет — файл базы не создаётся
+        assert history_store.ingested([file_hash(loaded)], db) == set()
+        assert not db.exists()
+
+        history_store.ingest_week('12-18 января 2026', {'regions': (loaded, regions_df([-10.0, -20.0]))}, db)
+        assert history_store.ingested([file_hash(loaded), file_hash(other)], db) == {file_hash(loaded)}
+        assert history_store.ingested(iter([file_hash(other)]), db) == set()
+        assert history_store.ingested([], db) == set()
+
+
+def test_second_week_appends_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db = tmp / 'history.sqlite'
+        week1 = write(tmp / 'w1.xlsx', b'week 1')
+        week2 = write(tmp / 'w2.xlsx', b'week 2')
+
+        history_store.ingest_week('12-18 января 2026', {'regions': (week1, regions_df([-10.0, -20.0]))}, db)
+        history_store.ingest_week('19-25 января 2026', {'regions': (week2, regions_df([-5.0, 3.0]))}, db)
+
+        assert count(db, 'facts') == 8
+        periods = history_store.list_periods(db)
+        assert list(periods['period_start']) == ['2026-01-12', '2026-01-19']
+        assert list(periods['files']) == [1, 1]
+
+        trend = history_store.load_trend('region', 'Прирост %', db, region='ННВ')
+        assert list(trend['period']) == ['12-18 января 2026', '19-25 января 2026']
+        assert list(trend['value']) == [-20.0, 3.0]
+        assert len(history_store.load_trend('region', 'Прирост %', db, since='2026-01-19')) == 2
+
+
+def test_structure_ingests_store_facts():
+    facts = history_store.normalize_facts('structure', structure_df())
+
+    # Строка итогов без магазина — не факт
+    assert len(facts) == 3
+    assert set(facts['metric']) == {'Магазинов'}
+    assert set(facts['level']) == {'store'}
+    assert facts.groupby('division')['value'].sum().to_dict() == {'Владимир': 1.0, 'Казань 1': 2.0}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        db = tmp / 'history.sqlite'
+        report = write(tmp / 'Структура розница 2026.xlsx', b'structure')
+        history_store.ingest_week('12-18 января 2026', {'structure': (report, structure_df())}, db)
+
+        trend = history_store.load_trend('store', 'Магазинов', db, division='Казань 1')
+        assert sorted(trend['store']) == ['201', '202']
+        assert list(history_store.list_periods(db)['files']) == [1]
+
+
+def test_streamed_reports_are_not_history_targets():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        graph = DependencyGraph()
+        for kind in gd.REPORT_SOURCES:
+            graph.add_file(f'input_{kind}', write(tmp / f'{kind}.xlsx', kind.encode()))
+        graph.add('period', lambda: '12-18 января 2026')
+
+        # Новых файлов в истории нет — нужны все отчёты
+        assert gd.history_targets(graph) == [f'extract_{kind}' for kind in gd.REPORT_SOURCES]
+        # С --stream оборачиваемость и аксессуары в историю не пишутся — и не извлекаются ради неё
+        options = {'extract_turnover': {'stream': True}, 'extract_accessories': {'stream': True}}
+        assert gd.history_targets(graph, options) == ['extract_regions', 'extract_structure']
+        options = {'extract_turnover': {'stream': False}}
+        assert 'extract_turnover' in gd.history_targets(graph, options)
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ СЖАТИЯ HTML
+================
+
+Проверяет html_minifier.py: текст страницы не меняется, стили и
+скрипты сжимаются безопасно, лимит размера даёт понятную ошибку.
+
+Запуск:
+    python test/test_html_minifier.py
+    python -m pytest test/test_html_minifier.py
+"""
+
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from html_minifier import minify_html, minify_css, check_budget, SizeBudgetError
+
+PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        /* карточки */
+        .card {
+            padding: 12px;
+            color: #1a1a1a;
+        }
+    </style>
+</head>
+<body>
+    <!-- Заголовок -->
+    <div class="card">
+        <td>Сапоги зимние <span class="badge">СЕЗОН</span></td>
+        <h4 style="font-size: 14px; margin-bottom: 8px;">Первый</h4>
+        <h4 class="x" style="font-size:14px;margin-bottom:8px">Второй</h4>
+        <pre>  как   есть  </pre>
+    </div>
+    <script>
+        var a = 1
+        var b = 2
+    </script>
+</body>
+</html>
+'''
+
+
+def test_markup_whitespace_and_comments():
+    html = minify_html(PAGE)
+    assert '<!--' not in html
+    assert '\n    <div' not in html
+    # Пробел между названием и бейджем сохраняется
+    assert 'Сапоги зимние <span class="badge">СЕЗОН</span>' in html
+    assert '<pre>  как   есть  </pre>' in html
+    assert len(html) < len(PAGE)
+
+
+def test_css_and_js():
+    assert minify_css('.a { color: red; margin: 0 auto; }  /* x */') == '.a{color:red;margin:0 auto}'
+    html = minify_html(PAGE)
+    # Переводы строк в JS остаются (ASI), убираются только отступы
+    assert '<script>var a = 1\nvar b = 2</script>' in html
+
+
+def test_repeated_inline_styles_become_class():
+    html = minify_html(PAGE)
+    assert 'style=' not in html
+    assert '<h4 class="is1">Первый</h4>' in html
+    assert '<h4 class="x is1">Второй</h4>' in html
+    assert '.is1{font-size:14px!important;margin-bottom:8px!important}</style>' in html
+
+
+def test_budget():
+    assert check_budget('a' * 100, max_bytes=100) == 100
+    assert check_budget('я' * 1000, max_bytes=0) == 2000
+    try:
+        check_budget('я' * 100, max_bytes=100, name='Дашборд ННВ')
+    except SizeBudgetError as e:
+        assert 'Дашборд ННВ' in str(e) and '--max-kb' in str(e)
+    else:
+        raise AssertionError("лимит не сработал")
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
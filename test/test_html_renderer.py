@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ СБОРКИ HTML
+================
+
+Проверяет html_renderer.py: разобранная оболочка даёт тот же текст, что
+str.format, неизменившиеся секции берутся из кэша, изменившиеся —
+строятся заново.
+
+Запуск:
+    python test/test_html_renderer.py
+    python -m pytest test/test_html_renderer.py
+"""
+
+import copy
+import sys
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from dashboard_template import PAGE_TEMPLATE
+from html_renderer import DashboardRenderer, compile_template, render_template
+
+GENERATED_AT = datetime(2026, 1, 19, 9, 30)
+
+
+def sample_analysis():
+    """Минимальный analysis со всеми полями, которые читает шаблон"""
+    return {
+        'period': '12-18 января 2026', 'stores_count': 119, 'total_regions': 11,
+        'company_growth': -20.3, 'nnv_growth': -22.8, 'nnv_rank': 3,
+        'regions_data': [{'name': 'ННВ', 'growth': -22.8, 'share': 11.3, 'rank': 3}],
+        'divisions': [{'name': 'ННВ 1', 'stores': 28, 'growth': -20.5, 'kop': 1.2, 'share': 24.2}],
+        'key_categories': [{'name': 'Ботинки женские зимние', 'share': 15.4, 'growth': -24, 'kop': 1.1,
+                            'season': 'СЕЗОН'}],
+        'growth_deficit': [{'name': 'Кроссовки детские', 'share': 3.2, 'growth': 58, 'kop': 0.6,
+                            'priority': 'Высокий', 'season': None}],
+        'illiquid_stock': [{'name': 'Балетки детские', 'weeks': 429, 'stock': '46 пар',
+                            'action': 'Распродажа -70%', 'season': 'НЕСЕЗОН'}],
+        'imbalances': [{'category': 'Кроссовки мужские', 'share': 8.5, 'season': None,
+                        'surplus': [{'name': 'Владимир', 'kop': 3.5, 'stores': ['10834']}],
+                        'deficit': [{'name': 'Ижевское', 'kop': 0.5, 'stores': ['10848']}],
+                        'action': 'Переместить 40 пар', 'deadline': 'до пятницы'}],
+        'top_stores': [{'id': '10267', 'division': 'Казань 1', 'growth': 5.2, 'kop': 1.0, 'note': 'Лучший'}],
+        'worst_stores': [{'id': '11588', 'division': 'ННВ 1', 'growth': -45.2, 'kop': 3.2, 'problem': 'Затовар'}],
+        'accessories': {'share': 27.7, 'avg_kop': 1.6, 'growth': -18.5,
+                        'key_categories': [{'name': 'Сумки', 'share': 8.2, 'growth': -12, 'kop': 1.2}],
+                        'growth_categories': [{'name': 'Кошельки', 'share': 2.1, 'growth': 45, 'kop': 0.7}]},
+        'actions': [{'type': 'urgent', 'badge': 'СРОЧНО', 'title': 'Перераспределить', 'problem': 'p',
+                     'action': 'a', 'deadline': 'd', 'responsible': 'r', 'effect': 'e'}],
+    }
+
+
+def test_compiled_shell_matches_str_format():
+    compiled = compile_template(PAGE_TEMPLATE)
+    fields = {field for _, field in compiled if field}
+    values = {field: f'<{field}>' for field in fields}
+    assert render_template(compiled, values) == PAGE_TEMPLATE.format(**values)
+
+
+def test_render_fills_every_field():
+    html = DashboardRenderer(1.2, 2.0).render(sample_analysis(), 'ННВ', 'Нижний Новгород', GENERATED_AT)
+    assert html.startswith('<!DOCTYPE html>') and html.endswith('</html>')
+    assert 'KARI Dashboard ННВ | 12-18 января 2026' in html
+    assert '19.01.2026 09:30' in html
+    assert '<span class="badge badge-season">СЕЗОН</span>' in html
+    assert '{{' not in html and '{region}' not in html
+
+
+def test_unchanged_sections_come_from_cache():
+    renderer = DashboardRenderer(1.2, 2.0)
+    analysis = sample_analysis()
+    first = renderer.render(analysis, 'ННВ', 'Нижний Новгород', GENERATED_AT)
+    sections = len(renderer.sections)
+    assert (renderer.hits, renderer.misses) == (0, sections)
+
+    # Та же страница — все секции из кэша
+    assert renderer.render(copy.deepcopy(analysis), 'ННВ', 'Нижний Новгород', GENERATED_AT) == first
+    assert (renderer.hits, renderer.misses) == (sections, sections)
+
+    # Изменились данные одной секции — перестраивается только она
+    analysis['actions'][0]['effect'] = 'новый эффект'
+    html = renderer.render(analysis, 'ННВ', 'Нижний Новгород', GENERATED_AT)
+    assert renderer.misses == sections + 1
+    assert 'новый эффект' in html
+
+    # Магазины — в таблице и в плане на неделю: перестраиваются обе секции
+    analysis['top_stores'][0]['growth'] = 7.5
+    html = renderer.render(analysis, 'ННВ', 'Нижний Новгород', GENERATED_AT)
+    assert renderer.misses == sections + 3
+    assert '+7.5%' in html
+
+
+def test_cache_is_bounded():
+    renderer = DashboardRenderer(1.2, 2.0, cache_size=3)
+    renderer.render(sample_analysis(), 'ННВ', 'Нижний Новгород', GENERATED_AT)
+    assert len(renderer._cache) == 3
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
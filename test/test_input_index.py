@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ПОИСКА ВХОДНЫХ ФАЙЛОВ
+==========================
+
+Проверяет input_index.py и generate_dashboard.find_report_file(): из
+нескольких подходящих файлов берётся самый свежий (при равном mtime —
+по пути), файлы блокировки Excel не в счёт; запасной паттерн отчёта не
+берёт файл, который узнаётся как другой отчёт; новый запуск в том же
+процессе видит новые файлы.
+
+Запуск:
+    python test/test_input_index.py
+    python -m pytest test/test_input_index.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import generate_dashboard as gd
+from input_index import InputIndex
+
+
+def touch(path, mtime):
+    """Пустой «Excel» файл с заданным mtime"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'')
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_newest_match_wins():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        touch(root / 'архив' / 'По регионам.xlsx', 1000)
+        newest = touch(root / 'Отчет по приросту регионы' / 'По регионам (2).xlsx', 3000)
+        touch(root / 'Отчет по приросту регионы' / 'По регионам.xlsx', 2000)
+        touch(root / 'Отчет по приросту регионы' / '~$По регионам.xlsx', 9000)
+        touch(root / 'По регионам.csv', 9000)
+
+        index = InputIndex(root)
+        assert index.find('по РЕГИОНАМ') == newest
+        assert [f.mtime for f in index.find_all('по регионам')] == [3000, 2000, 1000]
+        assert index.find('по регионам', root / 'архив').name == 'По регионам.xlsx'
+        assert index.find('по регионам', Path(tmp).parent / 'другой') is None
+
+        # Равный mtime — решает путь, а не порядок os.walk
+        touch(root / 'б' / 'По регионам.xlsx', 3000)
+        assert InputIndex(root).find('по регионам') == root / 'б' / 'По регионам.xlsx'
+
+
+def test_fallback_pattern_skips_other_reports():
+    saved = gd.INPUT_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        gd.INPUT_DIR = Path(tmp)
+        try:
+            gd.reset_input_indexes()
+            turnover = touch(gd.INPUT_DIR / 'Обувь остатки и оборачиваемость по группам товара'
+                             / 'Отчет по оборачиваемости ТЗ регион ННВ.xlsx', 3000)
+            touch(gd.INPUT_DIR / 'Отчет по приросту аксессуаров по магазинам' / 'Регион аксессуары.xlsx', 3000)
+            assert gd.find_report_file('turnover') == turnover
+            # Отчёта по регионам нет — файл оборачиваемости его не подменяет
+            assert gd.find_report_file('regions') is None
+
+            # Новый файл появился между запусками — виден после reset_input_indexes()
+            regions = touch(gd.INPUT_DIR / 'Регионы неделя 3.xlsx', 2000)
+            assert gd.find_report_file('regions') is None
+            gd.reset_input_indexes()
+            assert gd.find_report_file('regions') == regions
+        finally:
+            gd.INPUT_DIR = saved
+            gd.reset_input_indexes()
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
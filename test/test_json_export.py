@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ЗАПИСИ DASHBOARD_DATA.JSON
+===============================
+
+Проверяет json_export.py: numpy/pandas значения пишутся по схеме (числа,
+null, ISO даты, записи таблиц), а не строками; orjson и json дают
+одинаковые байты; компактный, с отступами и .gz файлы читаются в одни
+и те же данные; тип вне схемы — TypeError. Без orjson сравнение
+кодировщиков пропускается.
+
+Запуск:
+    python test/test_json_export.py
+    python -m pytest test/test_json_export.py
+"""
+
+import gzip
+import sys
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    from pytest import skip
+except ImportError:  # запуск через main() без pytest
+    def skip(reason):
+        raise unittest.SkipTest(reason)
+
+# Пропуск теста: pytest.skip() или unittest.SkipTest
+SKIPPED = (unittest.SkipTest, getattr(skip, 'Exception', unittest.SkipTest))
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from json_export import dumps, loads, write_json, read_json, encoder_available, SCHEMA_VERSION
+
+
+def sample():
+    """Фрагмент analysis с типами, которые дают analytics.* и pandas"""
+    return {
+        'period': '12-18 января 2026',
+        'stores_count': np.int64(119),
+        'top_stores': [{'id': np.int64(10267), 'growth': np.float64(5.2), 'kop': np.float32(1.5),
+                        'note': np.str_('Лучший по росту'), 'open': np.bool_(True)}],
+        'illiquid': pd.DataFrame({'name': ['Балетки', 'Панамы'], 'weeks': [429, np.nan]}),
+        'trend': np.array([1.5, 2.0]),
+        'by_store': {10267: 1.0},
+        'missing': [np.nan, float('inf'), pd.NaT, pd.NA],
+        'updated': pd.Timestamp('2026-01-19 08:30'),
+        'day': date(2026, 1, 12),
+        'source': Path('input') / 'По регионам.xlsx',
+    }
+
+
+EXPECTED = {
+    'period': '12-18 января 2026',
+    'stores_count': 119,
+    'top_stores': [{'id': 10267, 'growth': 5.2, 'kop': 1.5, 'note': 'Лучший по росту', 'open': True}],
+    'illiquid': [{'name': 'Балетки', 'weeks': 429.0}, {'name': 'Панамы', 'weeks': None}],
+    'trend': [1.5, 2.0],
+    'by_store': {'10267': 1.0},
+    'missing': [None, None, None, None],
+    'updated': '2026-01-19T08:30:00',
+    'day': '2026-01-12',
+    'source': str(Path('input') / 'По регионам.xlsx'),
+}
+
+
+def test_schema_values():
+    assert loads(dumps(sample(), encoder='json')) == EXPECTED
+    try:
+        dumps({'bad': object()}, encoder='json')
+    except TypeError as e:
+        assert 'object' in str(e)
+    else:
+        raise AssertionError("тип вне схемы записан")
+
+
+def test_encoders_identical():
+    if not encoder_available('orjson'):
+        skip("orjson не установлен — сравнение пропущено")
+    # float32 (компактные типы dtype_normalizer) — одинаковой кратчайшей записью
+    data = {**sample(), 'share': np.float32(0.1), 'shares': np.array([0.1, np.nan, 2.5], dtype=np.float32),
+            'half': np.float16(0.1)}
+    for pretty in (False, True):
+        assert dumps(data, pretty, 'orjson') == dumps(data, pretty, 'json')
+    assert b'"share":0.1,' in dumps(data, encoder='json')
+    assert loads(dumps(data, encoder='json'))['shares'] == [0.1, None, 2.5]
+
+
+def test_write_pretty_and_gzip():
+    with tempfile.TemporaryDirectory() as tmp:
+        compact = Path(tmp) / 'compact.json'
+        pretty = Path(tmp) / 'pretty.json'
+        write_json(sample(), compact)
+        written = write_json(sample(), pretty, pretty=True, gzip_copy=True)
+
+        assert written == [pretty, Path(tmp) / 'pretty.json.gz']
+        assert b'\n' not in compact.read_bytes() and b'\n  "period"' in pretty.read_bytes()
+        assert gzip.decompress(written[1].read_bytes()) == pretty.read_bytes()
+        expected = {**EXPECTED, 'schema_version': SCHEMA_VERSION}
+        assert read_json(compact) == read_json(pretty) == read_json(written[1]) == expected
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except SKIPPED as e:
+            print(f"⏭️ {test.__name__}: {e}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ КЭША РАЗБОРА
+=================
+
+Проверяет parse_cache.py: ключ меняется вместе с содержимым файла и
+параметрами чтения; повреждённая или нечитаемая запись не роняет запуск,
+а удаляется и разбирается заново; при превышении лимита вытесняются
+записи, к которым дольше всего не обращались.
+
+Запуск:
+    python test/test_parse_cache.py
+    python -m pytest test/test_parse_cache.py
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from parse_cache import ParseCache
+
+
+class Vanished:
+    """Класс, которого «нет» при чтении записи (переименован в новой версии)"""
+
+
+def test_key_follows_content_and_params():
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / 'report.xlsx'
+        report.write_bytes(b'week 1')
+        cache = ParseCache(Path(tmp) / 'cache')
+
+        key = cache.key(report, sheet='Лист1', header=3)
+        assert cache.key(report, header=3, sheet='Лист1') == key
+        assert cache.key(report, sheet='Лист1', header=4) != key
+        assert cache.key(report, sheet='Лист2', header=3) != key
+
+        calls = []
+        load = lambda: calls.append(1) or len(calls)
+        assert cache.get_or_load(report, load, sheet='Лист1') == 1
+        assert cache.get_or_load(report, load, sheet='Лист1') == 1
+        assert cache.get_or_load(report, load, sheet='Лист2') == 2
+
+        # Тот же путь, новое содержимое — новый ключ, разбор заново
+        report.write_bytes(b'week 2')
+        os.utime(report, ns=(10**18, 10**18))
+        assert cache.key(report, sheet='Лист1', header=3) != key
+        assert cache.get_or_load(report, load, sheet='Лист1') == 3
+        assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_corrupted_and_unreadable_entries_are_reloaded():
+    with tempfile.TemporaryDirectory() as tmp:
+        report = Path(tmp) / 'report.xlsx'
+        report.write_bytes(b'week 1')
+        cache = ParseCache(Path(tmp) / 'cache')
+        cache.directory.mkdir()
+
+        # Мусор, оборванная запись и запись с исчезнувшим классом
+        entries = {
+            'garbage': b'not a pickle',
+            'truncated': pickle.dumps(list(range(1000)))[:50],
+            'vanished': pickle.dumps(Vanished()).replace(b'Vanished', b'Vanishe_'),
+        }
+        for sheet, payload in entries.items():
+            path = cache.directory / f"{cache.key(report, sheet=sheet)}.pkl"
+            path.write_bytes(payload)
+            assert cache.get(cache.key(report, sheet=sheet), 'нет') == 'нет'
+            assert not path.exists()
+
+        path = cache.directory / f"{cache.key(report, sheet='garbage')}.pkl"
+        path.write_bytes(b'not a pickle')
+        assert cache.get_or_load(report, lambda: 'разобрано', sheet='garbage') == 'разобрано'
+        assert cache.get_or_load(report, lambda: 'заново', sheet='garbage') == 'разобрано'
+
+        # Запись, которую нельзя ни прочитать, ни удалить, — промах, а не ошибка
+        blocked = cache.directory / f"{cache.key(report, sheet='blocked')}.pkl"
+        blocked.mkdir()
+        assert cache.get(cache.key(report, sheet='blocked'), 'нет') == 'нет'
+
+
+def test_lru_eviction_keeps_recently_used():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ParseCache(Path(tmp) / 'cache', max_bytes=10**9)
+        payload = b'x' * 1000
+        for n, key in enumerate(['a', 'b', 'c']):
+            cache.put(key, payload)
+            os.utime(cache.directory / f'{key}.pkl', (1000 + n, 1000 + n))
+
+        # Обращение к самой старой записи делает её свежей
+        assert cache.get('a') == payload
+
+        size = (cache.directory / 'a.pkl').stat().st_size
+        cache.max_bytes = 3 * size
+        cache.put('d', payload)
+        assert sorted(path.stem for path in cache.directory.glob('*.pkl')) == ['a', 'c', 'd']
+        assert cache.get('b') is None
+
+        cache.clear()
+        assert not list(cache.directory.glob('*.pkl'))
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ПЕРИОДА ОТЧЁТА
+===================
+
+Проверяет telegram_bot/period_parser.py: манифест генератора читается
+обратно тем же периодом; если дашборд с тех пор изменился или манифест
+повреждён, load_period_manifest() возвращает None, и send_dashboard
+определяет период разбором Excel. Поиск периода в строках листа
+находит его и ниже первых строк, берёт первое совпадение и дальше
+совпадения строки не читает; вне области поиска периода нет.
+
+Запуск:
+    python test/test_period_parser.py
+    python -m pytest test/test_period_parser.py
+"""
+
+import json
+import sys
+import tempfile
+import types
+from pathlib import Path
+
+import openpyxl
+
+BASE_DIR = Path(__file__).parent.parent
+TELEGRAM_BOT_DIR = BASE_DIR / "telegram_bot"
+sys.path.insert(0, str(TELEGRAM_BOT_DIR))
+sys.path.insert(1, str(BASE_DIR))
+
+import period_parser
+from period_parser import (MANIFEST_NAME, SCAN_MAX_ROW, find_period_in_rows, load_period_manifest,
+                           parse_period_from_excel, save_period_manifest)
+
+PERIOD = "12-18 января 2026"
+
+
+def write_dashboard(tmp, html="<html>dashboard</html>"):
+    dashboard = Path(tmp) / "dashboard_current.html"
+    dashboard.write_text(html, encoding='utf-8')
+    return dashboard
+
+
+def write_report(path, cells):
+    """Книга с одним листом: cells — {(строка, колонка): значение}, нумерация с 1"""
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    for (row, col), value in cells.items():
+        sheet.cell(row=row, column=col, value=value)
+    wb.save(path)
+    return path
+
+
+def message_period(dashboard):
+    """Период в подписи send_dashboard.format_message() и были ли разобраны Excel"""
+    config = types.ModuleType('config')
+    config.BOT_TOKEN = 'TEST'
+    config.RECIPIENTS = []
+    config.USE_GROUP = False
+    config.GROUP_CHAT_ID = None
+    config.DASHBOARD_PATH = str(dashboard)
+    config.MESSAGE_TEMPLATE = "{period}|{timestamp}"
+    sys.modules['config'] = config
+    sys.modules.pop('send_dashboard', None)
+
+    import send_dashboard
+    scans = []
+
+    def scan(cache=None):
+        scans.append(cache)
+        return "05-11 января 2026"
+
+    send_dashboard.get_report_period = scan
+    period = send_dashboard.format_message(dashboard, use_cache=False).split('|')[0]
+    return period, len(scans)
+
+
+def test_manifest_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        dashboard = write_dashboard(tmp)
+        manifest_path = save_period_manifest(dashboard, PERIOD)
+
+        assert manifest_path == Path(tmp) / MANIFEST_NAME
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        assert manifest['period'] == PERIOD and manifest['dashboard'] == dashboard.name
+        assert load_period_manifest(dashboard) == PERIOD
+        # Период из манифеста — Excel не открывается
+        assert message_period(dashboard) == (PERIOD, 0)
+
+
+def test_changed_dashboard_falls_back_to_scan():
+    with tempfile.TemporaryDirectory() as tmp:
+        dashboard = write_dashboard(tmp)
+        save_period_manifest(dashboard, PERIOD)
+
+        # Дашборд перегенерирован без манифеста — хэш не совпадает
+        write_dashboard(tmp, "<html>new dashboard</html>")
+        assert load_period_manifest(dashboard) is None
+        assert message_period(dashboard) == ("05-11 января 2026", 1)
+
+
+def test_corrupt_manifest_falls_back_to_scan():
+    with tempfile.TemporaryDirectory() as tmp:
+        dashboard = write_dashboard(tmp)
+        manifest_path = save_period_manifest(dashboard, PERIOD)
+
+        manifest_path.write_text('{"period": "12-18', encoding='utf-8')
+        assert load_period_manifest(dashboard) is None
+        assert message_period(dashboard) == ("05-11 января 2026", 1)
+
+        # Манифест без периода и без манифеста вовсе — тоже разбор Excel
+        empty = {'period': '', 'dashboard_sha256': period_parser._dashboard_hash(dashboard)}
+        manifest_path.write_text(json.dumps(empty), encoding='utf-8')
+        assert load_period_manifest(dashboard) is None
+        manifest_path.unlink()
+        assert load_period_manifest(dashboard) is None
+        assert message_period(dashboard) == ("05-11 января 2026", 1)
+
+
+def test_period_found_past_first_rows():
+    rows = [('ОТЧЁТ', None), (None, 42), ('Магазин', 'Период: 12-18.01.2026')]
+    assert find_period_in_rows(rows) == "12-18 января 2026"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = write_report(Path(tmp) / 'report.xlsx', {
+            (1, 1): 'Отчёт по приросту', (2, 1): 'Регион',
+            (15, 7): 'Период 12.01.2026 - 18.01.2026',
+        })
+        assert parse_period_from_excel(report) == "12-18 января 2026"
+
+
+def test_no_period():
+    assert find_period_in_rows([]) is None
+    assert find_period_in_rows([('Регион', 12, None), (3.5, 'без даты')]) is None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        assert parse_period_from_excel(write_report(tmp / 'empty.xlsx', {(1, 1): 'Регион'})) is None
+        # Период ниже области поиска не ищется
+        report = write_report(tmp / 'late.xlsx', {(SCAN_MAX_ROW + 1, 1): '12-18 января 2026'})
+        assert parse_period_from_excel(report) is None
+        # Не Excel — None, а не исключение
+        broken = tmp / 'broken.xlsx'
+        broken.write_bytes(b'not a workbook')
+        assert parse_period_from_excel(broken) is None
+
+
+def test_first_matching_row_wins():
+    read = []
+
+    def rows():
+        for row in [('шапка',), ('05-11 января 2026', '12-18.01.2026'), ('19-25 января 2026',)]:
+            read.append(row)
+            yield row
+
+    # Первое совпадение по строкам, в строке — слева направо; дальше строки не читаются
+    assert find_period_in_rows(rows()) == "05-11 января 2026"
+    assert len(read) == 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        report = write_report(Path(tmp) / 'report.xlsx', {
+            (3, 5): '05-11 января 2026', (4, 1): '12-18 января 2026',
+        })
+        assert parse_period_from_excel(report) == "05-11 января 2026"
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ МЕТРИК ЭТАПОВ
+==================
+
+Проверяет pipeline_metrics.PipelineMetrics: формат строк JSONL (одна
+строка на этап, поля запуска, вложенность, ошибка этапа), перенос
+записей воркера через merge() вложенными в текущий этап и строку
+«RSS недоступен» под таблицей, если нет ни resource, ни psutil.
+
+Запуск:
+    python test/test_pipeline_metrics.py
+    python -m pytest test/test_pipeline_metrics.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import pipeline_metrics
+from pipeline_metrics import PipelineMetrics
+
+
+def test_jsonl_record_format():
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics = PipelineMetrics('generate', directory=tmp)
+        with metrics.stage('extract_regions', region='ННВ') as stage:
+            with metrics.stage('find_excel_file'):
+                pass
+            stage.update(rows=12, bytes=2048, path=Path('input') / 'regions.xlsx')
+        try:
+            with metrics.stage('analyze_data'):
+                raise ValueError("нет колонки")
+        except ValueError:
+            pass
+        metrics.record('telegram_send', 0.5, chat_id=42)
+
+        path = metrics.write()
+        assert path == pipeline_metrics.metrics_path(tmp)
+        lines = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+    assert [(line['stage'], line['depth']) for line in lines] == [
+        ('extract_regions', 0), ('find_excel_file', 1), ('analyze_data', 0), ('telegram_send', 0)]
+    for line in lines:
+        assert line['run'] == 'generate' and line['run_id'] == metrics.run_id
+        assert {'ts', 'seconds', 'status', 'rss_mb'} <= set(line)
+    assert lines[0]['rows'] == 12 and lines[0]['bytes'] == 2048 and lines[0]['region'] == 'ННВ'
+    # Значения не из JSON — строкой
+    assert lines[0]['path'] == str(Path('input') / 'regions.xlsx')
+    assert lines[2]['status'] == 'error' and lines[2]['error'] == "ValueError('нет колонки')"
+    assert lines[3]['chat_id'] == 42 and lines[3]['seconds'] == 0.5
+
+
+def test_write_appends_runs_of_the_day():
+    with tempfile.TemporaryDirectory() as tmp:
+        for run in ('generate', 'send'):
+            metrics = PipelineMetrics(run, directory=tmp)
+            with metrics.stage('total'):
+                pass
+            path = metrics.write()
+        assert [json.loads(line)['run'] for line in path.read_text(encoding='utf-8').splitlines()] == \
+            ['generate', 'send']
+
+
+def test_merge_nests_worker_records():
+    worker = PipelineMetrics('generate')
+    with worker.stage('extract_turnover', rows=100):
+        with worker.stage('find_excel_file'):
+            pass
+
+    metrics = PipelineMetrics('generate')
+    with metrics.stage('extract_parallel', workers=2):
+        metrics.merge(worker.records)
+    metrics.merge(worker.records[:1])
+
+    assert [(r['stage'], r['depth']) for r in metrics.records] == [
+        ('extract_parallel', 0), ('extract_turnover', 1), ('find_excel_file', 2), ('extract_turnover', 0)]
+    assert metrics.records[1]['rows'] == 100
+    # Записи воркера не меняются
+    assert [r['depth'] for r in worker.records] == [0, 1]
+
+
+def test_summary_notes_missing_rss():
+    metrics = PipelineMetrics('generate')
+    resource, psutil = pipeline_metrics.resource, pipeline_metrics.psutil
+    try:
+        pipeline_metrics.resource = pipeline_metrics.psutil = None
+        with metrics.stage('extract_regions'):
+            pass
+        with metrics.stage('analyze_data'):
+            pass
+        table = metrics.summary_table()
+    finally:
+        pipeline_metrics.resource, pipeline_metrics.psutil = resource, psutil
+
+    assert [r['rss_mb'] for r in metrics.records] == [None, None]
+    assert table.count(pipeline_metrics.RSS_UNAVAILABLE) == 1
+    if pipeline_metrics.rss_available():
+        assert pipeline_metrics.RSS_UNAVAILABLE not in metrics.summary_table()
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ОТБОРА ПО РЕГИОНУ
+======================
+
+Проверяет region_filter.py: регистр и пробелы в значениях не мешают
+отбору, без колонок региона поиск идёт по текстовым колонкам (или ни
+по каким при fallback=False), колонка «Регион» важнее подразделений,
+а результат совпадает с прежним перебором ячеек через df.apply().
+
+Запуск:
+    python test/test_region_filter.py
+    python -m pytest test/test_region_filter.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from region_filter import (filter_region, find_region_columns, region_columns, region_mask,
+                           split_by_region)
+
+
+def accessories_df():
+    return pd.DataFrame({
+        'Регион': ['ННВ', ' ннв ', 'Ннв', 'МСК', None, 'Итого'],
+        'Подразделение': ['ННВ 1', 'ННВ 2', 'ннв 3', 'ННВ 1', 'ННВ 4', None],
+        'Магазин': [101, 102, 103, 104, 105, None],
+        'Выручка': [10.0, 20.0, 30.0, 40.0, 50.0, 150.0],
+    })
+
+
+def legacy_filter(df, region):
+    """Прежний отбор из extract_accessories_data(): подстрока в любой ячейке строки"""
+    return df[df.apply(lambda r: any(region in str(v).lower() for v in r.values if pd.notna(v)), axis=1)]
+
+
+def test_case_and_whitespace():
+    df = accessories_df()
+    columns = ['Регион']
+
+    # Регион и значения — в любом регистре, пробелы вокруг значения не мешают
+    for region in ('ннв', 'ННВ', 'Ннв'):
+        assert list(filter_region(df, region, columns)['Магазин']) == [101, 102, 103]
+    # Несколько вариантов написания
+    assert list(filter_region(df, ('ННВ', 'мск'), columns)['Магазин']) == [101, 102, 103, 104]
+    # Маска на индексе таблицы
+    df.index = [10, 11, 12, 13, 14, 15]
+    mask = region_mask(df, 'ннв', columns)
+    assert list(mask.index) == list(df.index) and mask.dtype == bool
+    assert list(mask) == [True, True, True, False, False, False]
+
+
+def test_missing_region_column():
+    df = pd.DataFrame({'Город': ['Нижний Новгород', 'Москва', None], 'Выручка': [1.0, 2.0, 3.0]})
+
+    # Колонок региона нет — ищем по текстовым колонкам, числа не смотрим
+    assert find_region_columns(df) == ['Город']
+    assert list(filter_region(df, 'нижний')['Выручка']) == [1.0]
+    # Без запасного варианта колонок нет — и строк нет
+    assert find_region_columns(df, fallback=False) == []
+    assert filter_region(df, 'нижний', columns=[]).empty
+    # Колонка из одних пропусков
+    empty = pd.DataFrame({'Регион': [None, np.nan]})
+    assert not region_mask(empty, 'ннв').any()
+
+
+def test_fallback_column_choice():
+    df = accessories_df()
+
+    # Есть «Регион» — только она: «ННВ 1» подразделения в строке МСК не считается
+    assert region_columns(df) == ['Регион']
+    assert 104 not in list(filter_region(df, 'ннв', region_columns(df))['Магазин'])
+
+    # Нет «Регион» — колонки подразделения и магазина
+    divisions = df.drop(columns='Регион')
+    assert region_columns(divisions) == ['Подразделение', 'Магазин']
+    assert list(filter_region(divisions, 'ннв', region_columns(divisions))['Магазин']) == [101, 102, 103, 104, 105]
+
+    # Ни одной колонки по названию — все текстовые (object, string, category)
+    cities = pd.DataFrame({
+        'Город': ['Казань', 'Москва'],
+        'Формат': pd.Categorical(['ННВ-мини', 'стандарт']),
+        'Код': pd.array(['a', 'b'], dtype='string'),
+        'Выручка': [1.0, 2.0],
+    })
+    assert region_columns(cities) == ['Город', 'Формат', 'Код']
+    assert list(filter_region(cities, 'ннв', region_columns(cities))['Выручка']) == [1.0]
+
+
+def test_matches_legacy_filter():
+    df = accessories_df()
+    for region in ('ннв', 'мск', 'итого', 'юг'):
+        new = filter_region(df, region)
+        assert new.index.equals(legacy_filter(df, region).index), region
+
+    split = split_by_region(df, ('ннв', 'мск'))
+    assert split['мск'].index.equals(legacy_filter(df, 'мск').index)
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ СЕЗОННОСТИ КАТЕГОРИЙ
+=========================
+
+Проверяет season_matcher.SeasonMatcher: kinds() размечает колонку так же,
+как kind() по одному названию (зима важнее лета, пропуск — None), и
+запоминает разметку; бейджи — по календарю месяца. Месяц сезонности
+дашборда — узел графа: без распознанного периода смена текущего месяца
+меняет ключ анализа оборачиваемости.
+
+Запуск:
+    python test/test_season_matcher.py
+    python -m pytest test/test_season_matcher.py
+"""
+
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import generate_dashboard as gd
+from season_matcher import SeasonMatcher
+
+NAMES = ['Сапоги зимние', 'Сандалии летние', 'Кеды', 'Сапоги летние', None, 'Сапоги зимние']
+
+
+def matcher():
+    return SeasonMatcher(winter=['зимн', 'сапог'], summer=['летн', 'сандал'])
+
+
+def test_kinds_match_kind():
+    kinds = matcher().kinds(NAMES)
+
+    # "Сапоги летние" — в обоих списках, побеждает зима
+    assert list(kinds) == ['winter', 'summer', None, 'winter', None, 'winter']
+    single = matcher()
+    assert [single.kind(name) if name else None for name in NAMES] == list(kinds)
+
+
+def test_kinds_memoized():
+    seasons = matcher()
+    seasons.kinds(NAMES)
+    assert seasons._memo == {'Сапоги зимние': 'winter', 'Сандалии летние': 'summer',
+                             'Кеды': None, 'Сапоги летние': 'winter'}
+
+    # Без выражений известные названия берутся из памяти, новые — без сезона
+    seasons.winter = seasons.summer = None
+    assert list(seasons.kinds(['Кеды', 'Сапоги зимние', 'Сапоги детские'])) == [None, 'winter', None]
+    assert seasons.kind('Сандалии летние') == 'summer'
+
+
+def test_label_by_report_month():
+    seasons = matcher()
+    assert list(seasons.label(NAMES[:3], month=1)) == ['СЕЗОН', 'НЕСЕЗОН', None]
+    assert list(seasons.label(NAMES[:3], month=7)) == ['НЕСЕЗОН', 'СЕЗОН', None]
+    assert seasons.badge('Сандалии летние', month=7) == 'СЕЗОН'
+
+
+def clock(month):
+    """datetime, у которого сейчас — 15-е число месяца month 2026 года"""
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime(2026, month, 15)
+    return Clock
+
+
+def test_season_month_in_graph_key():
+    assert gd.season_month('12-18 января 2026') == 1
+
+    def keys(month):
+        # Узлы считаются лениво — ключи нужны, пока часы показывают month
+        gd.datetime = clock(month)
+        graph = gd.build_graph()
+        return graph.value('season_month'), graph.key('analyze_turnover'), graph.key('analyze_accessories')
+
+    input_dir, now = gd.INPUT_DIR, gd.datetime
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            # Входных файлов нет — период «Текущая неделя», сезон по текущему месяцу
+            gd.INPUT_DIR = Path(tmp)
+            january, july = keys(1), keys(7)
+        finally:
+            gd.INPUT_DIR, gd.datetime = input_dir, now
+
+    assert (january[0], july[0]) == (1, 7)
+    assert july[1] != january[1]
+    # Анализ аксессуаров от сезона не зависит
+    assert july[2] == january[2]
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ РАССЫЛКИ С ПОДДЕЛЬНЫМ БОТОМ
+================================
+
+Проверяет параллельную рассылку (telegram_bot/fanout.py, file_id_cache.py
+и send_dashboard.py) без сети: FakeBot подменяет telegram.Bot, записывает
+отправки и выдаёт file_id на каждую загрузку файла.
+
+Запуск:
+    python test/test_send_fanout.py
+    python -m pytest test/test_send_fanout.py
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+from telegram.error import BadRequest, RetryAfter, TimedOut
+
+BASE_DIR = Path(__file__).parent.parent
+TELEGRAM_BOT_DIR = BASE_DIR / "telegram_bot"
+sys.path.insert(0, str(TELEGRAM_BOT_DIR))
+sys.path.insert(1, str(BASE_DIR))
+
+from fanout import RateLimiter, TokenBucket, fan_out
+from file_id_cache import UploadOnceDocument
+from pipeline_metrics import PipelineMetrics
+
+
+class FakeBot:
+    """Подделка telegram.Bot: записывает отправки, умеет имитировать ошибки"""
+
+    def __init__(self, failures=None, delay=0.0):
+        # failures: {chat_id: [исключение для 1-й попытки, для 2-й, ...]}
+        self.failures = {chat_id: list(errors) for chat_id, errors in (failures or {}).items()}
+        self.delay = delay
+        self.sent = []
+        self.errors = []
+        self.uploads = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def send_document(self, chat_id, document, filename=None, caption=None, parse_mode=None):
+        started = time.monotonic()
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            errors = self.failures.get(chat_id)
+            if errors:
+                self.errors.append(time.monotonic())
+                raise errors.pop(0)
+            if isinstance(document, bytes):
+                # Загрузка файла — Telegram возвращает новый file_id
+                self.uploads += 1
+                file_id = f"FILE-{self.uploads}"
+            elif document.startswith('FILE-'):
+                file_id = document
+            else:
+                raise BadRequest("Wrong file identifier/http url specified")
+            self.sent.append({'chat_id': chat_id, 'document': document, 'filename': filename,
+                              'caption': caption, 'started': started, 'time': time.monotonic()})
+            return types.SimpleNamespace(message_id=len(self.sent),
+                                         document=types.SimpleNamespace(file_id=file_id))
+        finally:
+            self.in_flight -= 1
+
+
+def fast_limiter():
+    """Лимитер без ощутимых пауз"""
+    return RateLimiter(global_rate=1000, private_rate=1000, group_rate=1000)
+
+
+def run_fan_out(bot, recipients, **kwargs):
+    kwargs.setdefault('limiter', fast_limiter())
+    kwargs.setdefault('backoff_base', 0.01)
+    return asyncio.run(fan_out(
+        recipients,
+        lambda chat_id: bot.send_document(chat_id=chat_id, document=b'<html></html>'),
+        **kwargs,
+    ))
+
+
+def test_all_recipients_get_report_in_order():
+    bot = FakeBot()
+    reports = run_fan_out(bot, [3, 1, 2])
+    assert [r['chat_id'] for r in reports] == [3, 1, 2]
+    assert all(r['ok'] and r['attempts'] == 1 for r in reports)
+    assert sorted(s['chat_id'] for s in bot.sent) == [1, 2, 3]
+
+
+def test_concurrency_is_bounded():
+    bot = FakeBot(delay=0.02)
+    reports = run_fan_out(bot, list(range(1, 21)), concurrency=4)
+    assert all(r['ok'] for r in reports)
+    assert 1 < bot.max_in_flight <= 4
+
+
+def test_retry_after_is_waited_and_retried():
+    bot = FakeBot(failures={7: [RetryAfter(0), TimedOut()]})
+    reports = run_fan_out(bot, [7, 8])
+    assert reports[0]['ok'] and reports[0]['attempts'] == 3
+    assert reports[1]['ok'] and reports[1]['attempts'] == 1
+
+
+def test_retry_after_pauses_all_workers():
+    bot = FakeBot(failures={1: [RetryAfter(0.3)]}, delay=0.02)
+    reports = run_fan_out(bot, list(range(1, 9)), concurrency=4)
+    assert all(r['ok'] for r in reports)
+
+    # После RetryAfter ни одна отправка — и в другие чаты тоже — не начинается раньше паузы
+    flood = bot.errors[0]
+    later = [s['started'] for s in bot.sent if s['started'] > flood]
+    assert later and min(later) - flood >= 0.3
+
+
+def test_permanent_error_is_not_retried():
+    bot = FakeBot(failures={5: [BadRequest("Chat not found")]})
+    reports = run_fan_out(bot, [5, 6])
+    assert not reports[0]['ok'] and reports[0]['attempts'] == 1
+    assert 'Chat not found' in reports[0]['error']
+    assert reports[1]['ok']
+
+
+def test_gives_up_after_max_attempts():
+    bot = FakeBot(failures={9: [TimedOut()] * 5})
+    reports = run_fan_out(bot, [9], max_attempts=3)
+    assert not reports[0]['ok'] and reports[0]['attempts'] == 3
+
+
+def test_per_chat_rate_is_respected():
+    bucket = TokenBucket(rate=20)  # 20 в секунду → интервал 50 мс
+
+    async def take(n):
+        started = time.monotonic()
+        for _ in range(n):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # Первый токен сразу, остальные 4 — с интервалом 50 мс
+    assert asyncio.run(take(5)) >= 0.18
+
+
+def send_all(bot, document, recipients):
+    """Рассылка UploadOnceDocument всем получателям"""
+    return asyncio.run(fan_out(
+        recipients,
+        lambda chat_id: document.send(bot, chat_id, caption='x'),
+        limiter=fast_limiter(),
+        backoff_base=0.01,
+    ))
+
+
+def test_document_is_uploaded_once_and_forwarded_by_file_id():
+    bot = FakeBot(delay=0.01)
+    document = UploadOnceDocument(b'<html>1</html>', 'dashboard.html')
+    reports = send_all(bot, document, [1, 2, 3, 4, 5])
+    assert all(r['ok'] for r in reports)
+    assert bot.uploads == 1 and document.uploads == 1
+    assert [s['document'] for s in bot.sent].count('FILE-1') == 4
+
+
+def test_failed_upload_is_retried_by_next_recipient():
+    bot = FakeBot(failures={1: [BadRequest("Chat not found")]})
+    document = UploadOnceDocument(b'<html>1</html>', 'dashboard.html')
+    reports = send_all(bot, document, [1, 2, 3])
+    assert [r['ok'] for r in reports] == [False, True, True]
+    assert bot.uploads == 1
+
+
+def test_recipient_error_keeps_file_id():
+    bot = FakeBot(failures={2: [BadRequest("Chat not found")]})
+    document = UploadOnceDocument(b'<html>1</html>', 'dashboard.html')
+    send_all(bot, document, [1])
+    # file_id уже известен: ошибка чата 2 — его ошибка, а не повод грузить файл заново
+    reports = send_all(bot, document, [2, 3])
+    assert [r['ok'] for r in reports] == [False, True]
+    assert reports[0]['error'] and 'Chat not found' in reports[0]['error']
+    assert bot.uploads == 1 and document.uploads == 1
+    assert document.file_id == 'FILE-1'
+
+
+def test_file_id_is_reused_across_runs_for_same_content():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "telegram_file_id.json"
+
+        bot = FakeBot()
+        send_all(bot, UploadOnceDocument(b'<html>1</html>', 'd.html', cache_path, 'bot1'), [1, 2])
+        assert bot.uploads == 1
+
+        # Повторный запуск с тем же дашбордом — без загрузки
+        bot = FakeBot()
+        bot.uploads = 1
+        send_all(bot, UploadOnceDocument(b'<html>1</html>', 'd.html', cache_path, 'bot1'), [3, 4])
+        assert bot.uploads == 1
+
+        # Новый дашборд — новая загрузка
+        document = UploadOnceDocument(b'<html>2</html>', 'd.html', cache_path, 'bot1')
+        assert document.file_id is None
+        send_all(bot, document, [5])
+        assert bot.uploads == 2
+
+
+def test_invalid_cached_file_id_falls_back_to_upload():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "telegram_file_id.json"
+        document = UploadOnceDocument(b'<html>1</html>', 'd.html', cache_path, 'bot1')
+        document.file_id = 'EXPIRED'
+        bot = FakeBot()
+        reports = send_all(bot, document, [1, 2])
+        assert all(r['ok'] for r in reports)
+        assert bot.uploads == 1 and document.file_id == 'FILE-1'
+
+
+def test_send_dashboard_reads_file_once_and_reports():
+    """send_dashboard.send_dashboard() целиком, с подменёнными config и Bot"""
+    with tempfile.TemporaryDirectory() as tmp:
+        dashboard = Path(tmp) / "dashboard_current.html"
+        dashboard.write_text("<html>dashboard</html>", encoding='utf-8')
+
+        config = types.ModuleType('config')
+        config.BOT_TOKEN = 'TEST'
+        config.RECIPIENTS = [101, 102, 103]
+        config.USE_GROUP = False
+        config.GROUP_CHAT_ID = None
+        config.DASHBOARD_PATH = str(dashboard)
+        config.MESSAGE_TEMPLATE = "Период: {period} | {timestamp}"
+        config.SEND_PRIVATE_CHAT_RATE = 1000
+        config.SEND_GLOBAL_RATE = 1000
+        sys.modules['config'] = config
+        sys.modules.pop('send_dashboard', None)
+
+        import send_dashboard
+        send_dashboard.get_report_period = lambda cache=None: "12-18 января 2026"
+
+        bot = FakeBot(failures={102: [RetryAfter(0)]})
+        metrics = PipelineMetrics('send', directory=tmp)
+        reports = asyncio.run(send_dashboard.send_dashboard(use_cache=False, bot=bot, metrics=metrics))
+
+        assert [r['ok'] for r in reports] == [True, True, True]
+        assert sorted(s['chat_id'] for s in bot.sent) == [101, 102, 103]
+        assert bot.uploads == 1
+        assert sum(s['document'] == b"<html>dashboard</html>" for s in bot.sent) == 1
+        assert all("12-18 января 2026" in s['caption'] for s in bot.sent)
+        assert (Path(tmp) / "telegram_file_id.json").exists()
+
+        sends = [r for r in metrics.records if r['stage'] == 'telegram_send']
+        assert [r['chat_id'] for r in sends] == [101, 102, 103]
+        assert [r['attempts'] for r in sends] == [1, 2, 1]
+        assert metrics.records[0]['bytes'] == len(b"<html>dashboard</html>")
+        lines = metrics.write().read_text(encoding='utf-8').splitlines()
+        assert len(lines) == 4 and all(json.loads(line)['run'] == 'send' for line in lines)
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ПОТОКОВОГО РАЗБОРА
+=======================
+
+Проверяет stream_reader.py и stream_aggregates.py: части листа вместе
+дают ту же таблицу, что load_sheet(), а итоги по частям — те же
+категории, неликвиды и узлы плана перемещений, что расчёт по всей таблице.
+
+Запуск:
+    python test/test_stream_reader.py
+    python -m pytest test/test_stream_reader.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import analytics
+import transfer_plan
+from excel_loader import load_sheet, load_sheets
+from stream_reader import iter_sheet_chunks, iter_book_chunks
+from stream_aggregates import TurnoverTotals
+
+HEADER = ['Группа товара', 'Магазин', 'Доля в продажах %', 'Доля в остатках %',
+          'Оборачиваемость, недель', 'Остаток', 'Прирост %']
+CATEGORIES = ['Ботинки женские зимние', 'Кроссовки мужские', 'Сандалии детские', 'Угги женские']
+
+
+def write_turnover(path, divisions=3, stores=6):
+    """Оборачиваемость: лист на подразделение, две строки шапки, итог в конце листа"""
+    rng = np.random.default_rng(7)
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for d in range(divisions):
+        ws = wb.create_sheet(f"ННВ {d + 1}")
+        ws.append(['Оборачиваемость ТЗ'])
+        ws.append(['12.01.2026 - 18.01.2026'])
+        ws.append(HEADER)
+        for s in range(stores):
+            for category in CATEGORIES:
+                ws.append([category, 10000 + d * 100 + s, round(float(rng.uniform(1, 15)), 1),
+                           round(float(rng.uniform(1, 15)), 1), int(rng.integers(5, 400)),
+                           int(rng.integers(0, 300)), round(float(rng.uniform(-40, 90)), 1)])
+        ws.append(['Итого', None, 100.0, 100.0, None, 5000, -12.5])
+    wb.save(path)
+
+
+def test_chunks_match_load_sheet():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'turnover.xlsx'
+        write_turnover(path)
+        full = load_sheet(path, sheet_name='ННВ 2', header=2)
+        chunks = list(iter_sheet_chunks(path, sheet_name='ННВ 2', header=2, chunk_rows=5))
+        assert len(chunks) == 5
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
+
+
+def test_book_chunks_cross_sheets():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'turnover.xlsx'
+        write_turnover(path)
+        chunks = list(iter_book_chunks(path, header=2, chunk_rows=40))
+        # 3 листа × 25 строк — части по 40+ строк, листы не теряются
+        assert [len(chunk) for chunk in chunks] == [50, 25]
+        assert list(pd.concat(chunks)['Лист'].value_counts(sort=False)) == [25, 25, 25]
+
+
+def test_totals_match_full_table():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'turnover.xlsx'
+        write_turnover(path)
+        sheets = load_sheets(path, header=2)
+        df = pd.concat([frame.assign(**{'Лист': sheet}) for sheet, frame in sheets.items()],
+                       ignore_index=True)
+        metrics = analytics.metrics_frame(df)
+
+        totals = TurnoverTotals(weeks_min=50, illiquid_limit=5)
+        for chunk in iter_book_chunks(path, header=2, chunk_rows=7):
+            totals.add(chunk)
+        summary, illiquid, nodes = totals.results()
+
+    assert totals.rows == len(df)
+    pd.testing.assert_frame_equal(summary, analytics.category_summary(metrics))
+    assert analytics.illiquid_stock(illiquid, 50) == analytics.illiquid_stock(metrics, 50)
+    pd.testing.assert_frame_equal(transfer_plan.balance_nodes(nodes, 0.8, 1.2),
+                                  transfer_plan.node_balance(metrics, 0.8, 1.2))
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
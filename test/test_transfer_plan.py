@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ ПЛАНА ПЕРЕМЕЩЕНИЙ
+======================
+
+Проверяет transfer_plan.py на маленьких сетях, где правильный план
+считается вручную.
+
+Запуск:
+    python test/test_transfer_plan.py
+    python -m pytest test/test_transfer_plan.py
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+import transfer_plan
+
+
+def network(rows):
+    """metrics_frame() из кортежей (категория, магазин, подразделение, остаток, КОП)"""
+    return pd.DataFrame(rows, columns=['name', 'store', 'division', 'stock', 'kop'])
+
+
+def test_surplus_moves_to_deficit_within_band():
+    # База 100 у всех: A — КОП 2.0 (излишек 80), B — 0.5 (дефицит 30), C — 0.6 (дефицит 20)
+    metrics = network([
+        ('Кроссовки', '1', 'Север', 200, 2.0),
+        ('Кроссовки', '2', 'Юг', 50, 0.5),
+        ('Кроссовки', '3', 'Юг', 60, 0.6),
+        ('Кроссовки', '4', 'Юг', 100, 1.0),
+    ])
+    balance = transfer_plan.node_balance(metrics, 0.8, 1.2)
+    assert list(balance['qty']) == [80, -30, -20, 0]
+
+    plan = transfer_plan.plan_transfers(balance)
+    assert list(zip(plan['source'], plan['target'], plan['qty'])) == [('1', '2', 30), ('1', '3', 20)]
+
+    after = transfer_plan.apply_plan(balance, plan)
+    assert list(after['kop'].round(2)) == [1.5, 0.8, 0.8, 1.0]
+
+
+def test_categories_are_planned_independently():
+    metrics = network([
+        ('Ботинки', '1', 'Север', 300, 3.0),
+        ('Ботинки', '2', 'Юг', 50, 0.5),
+        ('Сапоги', '1', 'Север', 50, 0.5),
+        ('Сапоги', '2', 'Юг', 300, 3.0),
+        ('Сандалии', '1', 'Север', 300, 3.0),
+    ])
+    plan = transfer_plan.plan_transfers(transfer_plan.node_balance(metrics, 0.8, 1.2))
+    moves = {(c, s, t): q for c, s, t, q in zip(plan['category'], plan['source'], plan['target'], plan['qty'])}
+    # Дефицит 30 в каждой категории; у Сандалий получателя нет
+    assert moves == {('Ботинки', '1', '2'): 30, ('Сапоги', '2', '1'): 30}
+
+
+def test_largest_surplus_is_matched_first_with_few_moves():
+    metrics = network([
+        ('Кроссовки', str(10000 + i), 'Север', stock, kop)
+        for i, (stock, kop) in enumerate([(400, 4.0), (150, 1.5), (20, 0.2), (40, 0.4), (70, 0.7)])
+    ])
+    plan = transfer_plan.plan_transfers(transfer_plan.node_balance(metrics, 0.8, 1.2))
+    # 2 источника + 3 получателя → не больше 4 перемещений
+    assert len(plan) <= 4
+    assert plan['qty'].sum() == 60 + 40 + 10
+    assert plan.iloc[0]['source'] == '10000'
+
+
+def test_small_moves_are_skipped():
+    metrics = network([
+        ('Кроссовки', '1', 'Север', 123, 1.23),
+        ('Кроссовки', '2', 'Юг', 79, 0.79),
+    ])
+    balance = transfer_plan.node_balance(metrics, 0.8, 1.2)
+    assert (balance['qty'] == 0).all()
+    assert transfer_plan.plan_transfers(balance).empty
+
+
+def test_division_level_without_store_column():
+    metrics = network([
+        ('Кроссовки', '', 'Ярославское', 300, 3.0),
+        ('Кроссовки', '', 'Казань 1', 50, 0.5),
+    ])
+    balance = transfer_plan.node_balance(metrics, 0.8, 1.2)
+    plan = transfer_plan.plan_transfers(balance)
+    cards = transfer_plan.plan_imbalances(plan, balance, [{'name': 'Кроссовки', 'share': 8.5, 'season': None}])
+    # Магазинов в плане нет — и ключа 'stores' нет
+    assert cards[0]['surplus'] == [{'name': 'Ярославское', 'kop': 3.0}]
+    assert cards[0]['deficit'] == [{'name': 'Казань 1', 'kop': 0.5}]
+    assert cards[0]['action'] == 'Переместить 30 пар из Ярославское в Казань 1'
+
+
+def test_card_lists_largest_divisions_only():
+    # Излишки 40..80 в 5 подразделениях, дефицит 3 × 70 — закрывают три крупнейших
+    metrics = network([('Кроссовки', str(i), f'Подразделение {i}', 150 + 10 * i, (150 + 10 * i) / 100)
+                       for i in range(1, 6)]
+                      + [('Кроссовки', str(i), 'Казань 1', 10, 0.1) for i in range(7, 10)])
+    balance = transfer_plan.node_balance(metrics, 0.8, 1.2)
+    plan = transfer_plan.plan_transfers(balance)
+    cards = transfer_plan.plan_imbalances(plan, balance, [{'name': 'Кроссовки', 'share': 8.5}], max_places=2)
+    assert [place['name'] for place in cards[0]['surplus']] == ['Подразделение 5', 'Подразделение 4']
+    assert cards[0]['surplus'][0]['stores'] == ['5'] and cards[0]['deficit'][0]['stores'] == ['7', '8', '9']
+    assert ' и ещё ' in cards[0]['action'].split(' в ')[0]
+    assert cards[0]['action'].startswith(f"Переместить {transfer_plan.pairs(int(plan['qty'].sum()))} ")
+
+
+def test_pairs_plural():
+    assert [transfer_plan.pairs(n) for n in (1, 3, 5, 11, 21, 22, 112)] == [
+        '1 пара', '3 пары', '5 пар', '11 пар', '21 пара', '22 пары', '112 пар']
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ТЕСТ НАБЛЮДЕНИЯ ЗА INPUT/
+=========================
+
+Проверяет watch_inputs.InputWatcher: генерация только после «тишины»,
+когда во всех трёх подпапках лежат дописанные файлы одного периода
+(файл без распознанного периода не готов); обработанный набор не запускается повторно, повторно присланный — да.
+
+Запуск:
+    python test/test_watch_inputs.py
+    python -m pytest test/test_watch_inputs.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import openpyxl
+
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from watch_inputs import InputWatcher, WATCH_FOLDERS
+
+PERIOD = '12.01.2026 - 18.01.2026'
+
+
+def write_report(path, period=PERIOD, mtime=None):
+    """Отчёт с периодом во второй строке, как у выгрузок KARI"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb = openpyxl.Workbook()
+    wb.active.append(['Отчёт'])
+    wb.active.append([period])
+    wb.save(path)
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def fill_input(input_dir, period=PERIOD):
+    """Все три подпапки с отчётами одного периода"""
+    for folder in WATCH_FOLDERS.values():
+        write_report(input_dir / folder / f'{folder}.xlsx', period)
+
+
+def test_batch_after_settle_and_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = Path(tmp) / 'input'
+        watcher = InputWatcher(input_dir, settle=30, state_path=Path(tmp) / 'state.json')
+        write_report(input_dir / WATCH_FOLDERS['REGIONS'] / 'regions.xlsx')
+        assert watcher.poll(now=0) is None
+        assert watcher.poll(now=100) is None  # только один отчёт
+
+        fill_input(input_dir)
+        assert watcher.poll(now=200) is None  # изменения — ждём тишины
+        assert watcher.poll(now=210) is None
+        batch = watcher.poll(now=231)
+        assert batch and set(batch['files']) == set(WATCH_FOLDERS)
+        assert batch['period'] == '12-18 января 2026'
+
+        watcher.mark_done(batch)
+        assert watcher.poll(now=300) is None
+        # Перезапуск наблюдателя: состояние из файла, повтора нет
+        restarted = InputWatcher(input_dir, settle=30, state_path=Path(tmp) / 'state.json')
+        assert restarted.poll(now=0) is None and restarted.poll(now=100) is None
+
+        # Повторно присланный отчёт того же периода — новый набор
+        path = input_dir / WATCH_FOLDERS['ACCESSORIES'] / 'accessories v2.xlsx'
+        write_report(path, mtime=(path.parent / f"{WATCH_FOLDERS['ACCESSORIES']}.xlsx").stat().st_mtime_ns + 10**9)
+        assert restarted.poll(now=200) is None
+        batch = restarted.poll(now=300)
+        assert batch and batch['files']['ACCESSORIES'].name == 'accessories v2.xlsx'
+
+
+def test_partial_file_and_period_mismatch():
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = Path(tmp) / 'input'
+        fill_input(input_dir)
+        watcher = InputWatcher(input_dir, settle=30, state_path=Path(tmp) / 'state.json')
+
+        # Файл блокировки Excel не в счёт, недописанный .xlsx — не готов
+        turnover = input_dir / WATCH_FOLDERS['TURNOVER'] / f"{WATCH_FOLDERS['TURNOVER']}.xlsx"
+        (turnover.parent / '~$lock.xlsx').write_bytes(b'lock')
+        data = turnover.read_bytes()
+        turnover.write_bytes(data[:len(data) // 2])
+        assert watcher.poll(now=0) is None
+        assert watcher.poll(now=100) is None
+
+        # Дописан, но оборачиваемость за другую неделю
+        write_report(turnover, '05.01.2026 - 11.01.2026')
+        assert watcher.poll(now=200) is None
+        assert watcher.poll(now=300) is None
+
+        # Период не распознан ни в содержимом, ни в имени — тоже ждём
+        write_report(turnover, 'Остатки на конец недели')
+        assert watcher.poll(now=300) is None
+        assert watcher.poll(now=400) is None
+
+        write_report(turnover)
+        assert watcher.poll(now=400) is None
+        batch = watcher.poll(now=500)
+        assert batch and batch['files']['TURNOVER'] == turnover
+
+        # Неудачный цикл не повторяется, пока файлы те же
+        watcher.mark_failed(batch)
+        assert watcher.poll(now=600) is None
+
+
+def main():
+    """Запуск всех тестов без pytest"""
+    tests = [obj for name, obj in sorted(globals().items()) if name.startswith('test_')]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e!r}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+План перемещений товара между магазинами
+========================================
+Для каждой категории считается, сколько пар лишние в затоваренных
+магазинах (КОП > KOP_GOOD_MAX) и сколько не хватает в магазинах с
+дефицитом (КОП < KOP_GOOD_MIN), и излишки распределяются по дефицитам.
+
+База магазина — остаток при КОП 1.0 (остаток / КОП); перемещение не
+меняет суммы по категории, поэтому база постоянна и нужное количество
+считается сразу: излишек = остаток − KOP_GOOD_MAX × база, дефицит =
+KOP_GOOD_MIN × база − остаток (с округлением до пары вверх).
+
+Сопоставление — жадное "крупный с крупным" (правило северо-западного
+угла по отсортированным спискам): в категории не больше m + n − 1
+перемещений для m источников и n получателей. Считается сразу по всем
+категориям: отрезки накопленных сумм источников и получателей
+пересекаются через np.searchsorted, без циклов по магазинам.
+
+Если в отчёте нет колонки магазина, узлами плана служат подразделения.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Меньше стольких пар не перемещаем (не окупает логистику)
+MIN_TRANSFER = 5
+
+# Подразделений-источников и получателей в карточке перекоса (остальные — "и ещё N")
+MAX_PLACES = 3
+
+PLAN_COLUMNS = ['category', 'source', 'source_division', 'target', 'target_division', 'qty']
+
+
+def node_level(metrics):
+    """Уровень узлов: магазины, если в отчёте есть номера магазинов, иначе подразделения"""
+    return 'store' if (metrics['store'] != '').any() else 'division'
+
+
+def node_totals(metrics, level=None):
+    """
+    Остаток и база (остаток при КОП 1.0) узлов по категориям:
+    category, node, stock, base, division
+    """
+    level = level or node_level(metrics)
+    rows = metrics[(metrics['stock'] > 0) & (metrics['kop'] > 0) & (metrics[level] != '')]
+    rows = rows.assign(base=rows['stock'] / rows['kop'])
+
+    aggregations = {'stock': ('stock', 'sum'), 'base': ('base', 'sum')}
+    if level == 'store':
+        aggregations['division'] = ('division', 'first')
+    nodes = rows.groupby(['name', level], sort=False).agg(**aggregations).reset_index()
+    nodes = nodes.rename(columns={'name': 'category', level: 'node'})
+    if level == 'division':
+        nodes['division'] = nodes['node']
+    return nodes
+
+
+def node_balance(metrics, kop_min, kop_max, min_qty=MIN_TRANSFER):
+    """
+    Баланс узлов (магазинов или подразделений) по категориям:
+    category, node, division, stock, base, kop, qty
+    qty > 0 — можно отдать, qty < 0 — нужно получить, 0 — КОП в норме
+    metrics — analytics.metrics_frame()
+    """
+    return balance_nodes(node_totals(metrics), kop_min, kop_max, min_qty)
+
+
+def balance_nodes(nodes, kop_min, kop_max, min_qty=MIN_TRANSFER):
+    """node_balance() из итогов node_totals()"""
+    nodes = nodes.copy()
+    nodes['kop'] = nodes['stock'] / nodes['base']
+
+    # Округление вверх: после перемещения КОП оказывается внутри коридора, а не на его границе
+    # (но не дальше противоположной границы у магазинов с маленькой базой)
+    stock, base = nodes['stock'], nodes['base']
+    surplus = np.minimum(np.ceil(stock - kop_max * base), np.floor(stock - kop_min * base))
+    deficit = np.minimum(np.ceil(kop_min * base - stock), np.floor(kop_max * base - stock))
+    nodes['qty'] = np.where(surplus >= min_qty, surplus,
+                            np.where(deficit >= min_qty, -deficit, 0)).astype(int)
+    return nodes
+
+
+def _segment_ends(side, cap, offset):
+    """Концы отрезков узлов на общей оси (накопленная сумма внутри категории + смещение)"""
+    within = side.groupby('category', sort=False)['qty'].cumsum()
+    ends = side['category'].map(offset) + np.minimum(within, side['category'].map(cap))
+    return ends.to_numpy(dtype=np.int64)
+
+
+def plan_transfers(balance):
+    """
+    Перемещения по всем категориям сразу
+    Возвращает DataFrame: category, source, source_division, target, target_division, qty
+    """
+    sources = balance[balance['qty'] > 0]
+    targets = balance[balance['qty'] < 0].assign(qty=lambda frame: -frame['qty'])
+
+    # Перемещается не больше, чем есть и излишков, и дефицита в категории
+    cap = pd.concat([sources.groupby('category')['qty'].sum(),
+                     targets.groupby('category')['qty'].sum()], axis=1).fillna(0).min(axis=1)
+    cap = cap[cap > 0].astype(np.int64)
+    if cap.empty:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+    offset = cap.cumsum() - cap
+
+    order = ['category', 'qty']
+    sources = sources[sources['category'].isin(cap.index)].sort_values(order, ascending=[True, False])
+    targets = targets[targets['category'].isin(cap.index)].sort_values(order, ascending=[True, False])
+    source_ends = _segment_ends(sources, cap, offset)
+    target_ends = _segment_ends(targets, cap, offset)
+
+    # Отрезки общей оси: каждый — одно перемещение источник → получатель
+    points = np.union1d(source_ends, target_ends)
+    qty = np.diff(points, prepend=0)
+    points, qty = points[qty > 0], qty[qty > 0]
+    i = np.searchsorted(source_ends, points, side='left')
+    j = np.searchsorted(target_ends, points, side='left')
+
+    return pd.DataFrame({
+        'category': sources['category'].to_numpy()[i],
+        'source': sources['node'].to_numpy()[i],
+        'source_division': sources['division'].to_numpy()[i],
+        'target': targets['node'].to_numpy()[j],
+        'target_division': targets['division'].to_numpy()[j],
+        'qty': qty,
+    })
+
+
+def apply_plan(balance, plan):
+    """Остатки и КОП узлов после перемещений (для проверки плана)"""
+    incoming = plan.groupby(['category', 'target'])['qty'].sum().rename_axis(['category', 'node'])
+    outgoing = plan.groupby(['category', 'source'])['qty'].sum().rename_axis(['category', 'node'])
+    moved = incoming.sub(outgoing, fill_value=0)
+    after = balance.join(moved.rename('moved'), on=['category', 'node'])
+    after['stock'] = after['stock'] + after['moved'].fillna(0)
+    after['kop'] = after['stock'] / after['base']
+    return after.drop(columns='moved')
+
+
+def pairs(qty):
+    """'1 пара', '3 пары', '12 пар'"""
+    if qty % 10 == 1 and qty % 100 != 11:
+        return f"{qty} пара"
+    if 2 <= qty % 10 <= 4 and not 12 <= qty % 100 <= 14:
+        return f"{qty} пары"
+    return f"{qty} пар"
+
+
+def _places(moves, division_column, node_column, limit=None):
+    """
+    Подразделения с магазинами: "Ярославское (маг. 10688, 10712)"
+    По убыванию перемещаемого количества, не больше limit подразделений
+    """
+    moves = moves.sort_values('qty', ascending=False, kind='stable')
+    volume = moves.groupby(division_column, sort=False)['qty'].sum().sort_values(ascending=False, kind='stable')
+    places = []
+    for division in volume.index[:limit]:
+        nodes = moves.loc[moves[division_column] == division, node_column]
+        stores = [node for node in pd.unique(nodes) if node != division]
+        places.append((division, stores))
+    return places, max(0, len(volume) - len(places))
+
+
+def plan_imbalances(plan, balance, categories, limit=2, max_places=MAX_PLACES):
+    """
+    Карточки перекосов для дашборда по ключевым категориям
+    categories — записи key_categories (name, share, season)
+    max_places — подразделений с каждой стороны в карточке (крупнейшие по количеству)
+    Магазины подразделения ('stores') — только в плане между магазинами
+    """
+    if plan.empty:
+        return []
+
+    grouped = balance.groupby(['category', 'division'])[['stock', 'base']].sum()
+    division_kop = (grouped['stock'] / grouped['base']).round(1)
+
+    def describe(division, stores):
+        if not stores:
+            return division
+        more = ', …' if len(stores) > 3 else ''
+        return f"{division} (маг. {', '.join(stores[:3])}{more})"
+
+    store_level = not (plan['source'].eq(plan['source_division']).all()
+                       and plan['target'].eq(plan['target_division']).all())
+
+    def place(category, division, stores):
+        entry = {'name': division, 'kop': float(division_kop[category, division])}
+        if store_level:
+            entry['stores'] = stores
+        return entry
+
+    def more(count):
+        return f" и ещё {count} подразд." if count else ''
+
+    deadlines = ['до среды', 'до пятницы']
+    imbalances = []
+    for cat in categories:
+        moves = plan[plan['category'] == cat['name']]
+        if moves.empty:
+            continue
+        surplus, surplus_more = _places(moves, 'source_division', 'source', max_places)
+        deficit, deficit_more = _places(moves, 'target_division', 'target', max_places)
+        imbalances.append({
+            'category': cat['name'],
+            'share': cat['share'],
+            'season': cat.get('season'),
+            'surplus': [place(cat['name'], *item) for item in surplus],
+            'deficit': [place(cat['name'], *item) for item in deficit],
+            'action': (f"Переместить {pairs(int(moves['qty'].sum()))} из "
+                       f"{', '.join(describe(*place) for place in surplus)}{more(surplus_more)} в "
+                       f"{', '.join(describe(*place) for place in deficit)}{more(deficit_more)}"),
+            'deadline': deadlines[min(len(imbalances), len(deadlines) - 1)],
+        })
+        if len(imbalances) >= limit:
+            break
+    return imbalances
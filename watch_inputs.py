@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Наблюдение за input/: дашборд сразу после прихода отчётов
+=========================================================
+Outlook макрос (macro_v5.txt) сохраняет вложения в подпапки input/
+обычно к середине утра, а запуск по расписанию — в понедельник 20:00.
+Наблюдатель запускается один раз (run_watch.bat) и опрашивает подпапки
+TURNOVER, REGIONS и ACCESSORIES; как только во всех трёх лежат готовые
+файлы одного периода, запускается тот же цикл, что в run_full_pipeline.bat:
+generate_dashboard.py → telegram_bot/send_dashboard.py.
+
+- Опрос, а не события ФС: без зависимостей, работает и на сетевых дисках
+- Антидребезг: генерация — только когда в подпапках ничего не менялось
+  SETTLE_SECONDS секунд (макрос сохраняет вложения по одному)
+- Недописанный файл (.xlsx — zip без оглавления в конце) и файлы
+  блокировки Excel (~$...) не считаются готовыми
+- Период каждого файла — из содержимого (period_parser), иначе из имени;
+  у всех трёх он должен совпадать (новый отчёт по регионам при старой
+  оборачиваемости — ждём); файл без распознанного периода не готов
+- Обработанный набор файлов записывается в output/watch_state.json:
+  перезапуск наблюдателя не повторяет рассылку; повторно присланный
+  отчёт того же периода — новый набор, дашборд обновляется
+- Разбирается заново только изменившийся файл: неизменные берутся из
+  кэша разбора (parse_cache.py, ключ — хэш содержимого)
+
+Запуск:
+    python watch_inputs.py [--poll 10] [--settle 60] [--no-send] [--run-now]
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+sys.path.insert(0, str(BASE_DIR / 'telegram_bot'))
+from period_parser import parse_period_from_excel, parse_period_from_filename
+
+# Подпапки input/, которые заполняет макрос (тип письма → подпапка, как GetSubFolder)
+WATCH_FOLDERS = {
+    'TURNOVER': "Обувь остатки и оборачиваемость по группам товара",
+    'REGIONS': "Отчет по приросту регионы",
+    'ACCESSORIES': "Отчет по приросту аксессуаров по магазинам",
+}
+
+INPUT_DIR = BASE_DIR / "input"
+STATE_PATH = BASE_DIR / "output" / "watch_state.json"
+LOG_DIR = BASE_DIR / "logs"
+
+# Интервал опроса и «тишина» после последнего изменения, с
+POLL_SECONDS = 10
+SETTLE_SECONDS = 60
+
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm')
+
+
+def log(msg):
+    """Логирование с временем"""
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+def is_complete(path):
+    """Файл дописан: .xlsx — zip, оглавление которого пишется последним"""
+    try:
+        return zipfile.is_zipfile(path)
+    except OSError:
+        return False
+
+
+def file_period(path):
+    """Период отчёта: из содержимого, иначе из имени файла (None — не найден)"""
+    return parse_period_from_excel(path) or parse_period_from_filename(path.name)
+
+
+def period_key(period):
+    """Период для сравнения: без года (в имени файла года нет)"""
+    return re.sub(r'\s+\d{4}$', '', period) if period else None
+
+
+class InputWatcher:
+    """Состояние наблюдения: снимок подпапок, время последнего изменения, обработанный набор"""
+
+    def __init__(self, input_dir=INPUT_DIR, folders=None, settle=SETTLE_SECONDS, state_path=STATE_PATH):
+        self.input_dir = Path(input_dir)
+        self.folders = folders or WATCH_FOLDERS
+        self.settle = settle
+        self.state_path = Path(state_path)
+        self.state = self._load_state()
+        self._snapshot = None
+        self._changed_at = None
+        self._periods = {}
+        self._waiting = None
+        self._failed = None
+
+    def _load_state(self):
+        try:
+            return json.loads(self.state_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def snapshot(self):
+        """{путь: (размер, mtime)} Excel файлов наблюдаемых подпапок"""
+        files = {}
+        for folder in self.folders.values():
+            directory = self.input_dir / folder
+            if not directory.is_dir():
+                continue
+            for path in directory.iterdir():
+                if path.suffix.lower() in EXCEL_SUFFIXES and not path.name.startswith('~$'):
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    files[str(path)] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def latest(self, snapshot):
+        """Самый свежий файл каждой подпапки: {тип: путь} (тип без файлов — нет в словаре)"""
+        latest = {}
+        for kind, folder in self.folders.items():
+            directory = str(self.input_dir / folder)
+            candidates = [Path(path) for path in snapshot if str(Path(path).parent) == directory]
+            if candidates:
+                latest[kind] = max(candidates, key=lambda path: snapshot[str(path)][1])
+        return latest
+
+    @staticmethod
+    def signature(latest, snapshot):
+        """Подпись набора: {тип: [имя, размер, mtime]} — как в watch_state.json"""
+        return {kind: [path.name, *snapshot[str(path)]] for kind, path in latest.items()}
+
+    def _period(self, path, signature):
+        """Период файла (запоминается, пока файл не изменится)"""
+        if self._periods.get(path) is None or self._periods[path][0] != signature:
+            self._periods[path] = (signature, file_period(Path(path)))
+        return self._periods[path][1]
+
+    def _wait(self, reason):
+        """Причина ожидания — в лог один раз, а не на каждом опросе"""
+        if reason != self._waiting:
+            log(f"Ждём: {reason}")
+            self._waiting = reason
+        return None
+
+    def poll(self, now=None):
+        """
+        Один опрос: набор {'period', 'files', 'signature'}, если пора генерировать, иначе None
+        now — время (time.monotonic()), в тестах задаётся явно
+        """
+        now = time.monotonic() if now is None else now
+        snapshot = self.snapshot()
+        if snapshot != self._snapshot:
+            self._snapshot = snapshot
+            self._changed_at = now
+            return None
+        if now - self._changed_at < self.settle:
+            return None
+
+        latest = self.latest(snapshot)
+        missing = [kind for kind in self.folders if kind not in latest]
+        if missing:
+            return self._wait(f"нет отчётов {', '.join(missing)}")
+
+        signature = self.signature(latest, snapshot)
+        if signature == self.state.get('signature') or signature == self._failed:
+            return None
+
+        partial = [path.name for path in latest.values() if not is_complete(path)]
+        if partial:
+            return self._wait(f"файлы ещё записываются: {', '.join(partial)}")
+
+        periods = {kind: self._period(str(path), snapshot[str(path)]) for kind, path in latest.items()}
+        # Период не распознан — совпадение не проверить, файл не готов
+        unknown = [latest[kind].name for kind, period in periods.items() if not period]
+        if unknown:
+            return self._wait(f"период не распознан: {', '.join(unknown)}")
+        if len(set(period_key(period) for period in periods.values())) > 1:
+            return self._wait("разные периоды — " + ', '.join(f"{kind}: {period}" for kind, period in periods.items()))
+
+        self._waiting = None
+        period = max(periods.values(), key=len)
+        return {'period': period, 'files': latest, 'signature': signature}
+
+    def mark_done(self, batch):
+        """Набор обработан: больше не запускается (и после перезапуска наблюдателя)"""
+        self.state = {'signature': batch['signature'], 'period': batch['period'],
+                      'generated_at': datetime.now().isoformat(timespec='seconds')}
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps(self.state, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    def mark_failed(self, batch):
+        """Набор не обработан: повтор — только когда файлы изменятся"""
+        self._failed = batch['signature']
+
+
+def run_step(title, command, cwd, log_file):
+    """Шаг цикла в отдельном процессе; вывод — в лог дня, как в run_full_pipeline.bat"""
+    log(f"{title}...")
+    started = time.perf_counter()
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write(f"[{datetime.now().isoformat(timespec='seconds')}] watch: {title}\n")
+        f.flush()
+        code = subprocess.run(command, cwd=cwd, stdout=f, stderr=subprocess.STDOUT).returncode
+    status = "OK" if code == 0 else f"ОШИБКА (код {code})"
+    log(f"  {status} за {time.perf_counter() - started:.1f} с")
+    return code == 0
+
+
+def regenerate(send=True, log_dir=LOG_DIR):
+    """generate_dashboard.py, затем send_dashboard.py; True — цикл прошёл"""
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_dir / f"pipeline_{datetime.now().strftime('%Y%m%d')}.log"
+    if not run_step("Генерация дашборда", [sys.executable, 'generate_dashboard.py'], BASE_DIR, log_file):
+        return False
+    if send:
+        return run_step("Отправка в Telegram", [sys.executable, 'send_dashboard.py'],
+                        BASE_DIR / 'telegram_bot', log_file)
+    return True
+
+
+def parse_args(argv=None):
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(description="Наблюдение за input/ и генерация дашборда")
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS, help="интервал опроса, с")
+    parser.add_argument('--settle', type=float, default=SETTLE_SECONDS,
+                        help="сколько секунд файлы не должны меняться перед генерацией")
+    parser.add_argument('--no-send', action='store_true', help="только генерация, без рассылки")
+    parser.add_argument('--run-now', action='store_true',
+                        help="обработать уже лежащие файлы (без сохранённого состояния они считаются обработанными)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Цикл наблюдения (Ctrl+C — выход)"""
+    args = parse_args(argv)
+    watcher = InputWatcher(settle=args.settle)
+
+    # Первый запуск: то, что уже лежит в input/, обработал запуск по расписанию
+    if not watcher.state and not args.run_now:
+        snapshot = watcher.snapshot()
+        current = watcher.latest(snapshot)
+        if len(current) == len(watcher.folders):
+            watcher.mark_done({'period': None, 'files': current,
+                               'signature': watcher.signature(current, snapshot)})
+            log("Текущие файлы input/ считаются обработанными (--run-now — обработать)")
+
+    log(f"Наблюдаю за {INPUT_DIR}: опрос {args.poll:.0f} с, тишина {args.settle:.0f} с")
+    try:
+        while True:
+            batch = watcher.poll()
+            if batch:
+                log(f"Все отчёты на месте (период: {batch['period'] or 'не определён'}): "
+                    + ', '.join(path.name for path in batch['files'].values()))
+                if regenerate(send=not args.no_send):
+                    watcher.mark_done(batch)
+                    log("Готово")
+                else:
+                    watcher.mark_failed(batch)
+                    log("Цикл не завершён — повтор после изменения файлов")
+            time.sleep(args.poll)
+    except KeyboardInterrupt:
+        log("Наблюдение остановлено")
+
+
+if __name__ == "__main__":
+    main()